@@ -1,6 +1,6 @@
 import os
 import sys
-from flask import Flask, jsonify, send_from_directory
+from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from dotenv import load_dotenv
@@ -25,6 +25,16 @@ def create_app():
     app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY')  # For Flask-JWT-Extended
     app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Uploads stream into spool files as they are parsed; bodies above the limit are rejected with 413
+    from .utils.uploads import UploadRequest, DEFAULT_MAX_UPLOAD_MB
+    app.request_class = UploadRequest
+    app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_MB', DEFAULT_MAX_UPLOAD_MB)) * 1024 * 1024
+    app.config['UPLOAD_SPOOL_DIR'] = os.environ.get('UPLOAD_SPOOL_DIR') # Defaults to the system temp dir
+    app.config['PDF_CACHE_DIR'] = os.environ.get('PDF_CACHE_DIR') # Defaults to a directory under the system temp dir
+    app.config['PDF_CACHE_MAX_BYTES'] = int(os.environ.get('PDF_CACHE_MAX_MB', 1024)) * 1024 * 1024
+    app.config['BCRYPT_LOG_ROUNDS'] = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12)) # Raising it upgrades hashes on login
+    app.config['AUTH_DEV_BYPASS'] = os.environ.get('AUTH_DEV_BYPASS') == '1' # Dummy user on every route; development only
+    app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE') == '1' # Let nginx/Apache send static files
 
     # --- Validation ---
     if not app.config['SECRET_KEY']:
@@ -32,6 +42,14 @@ def create_app():
     if not app.config['SQLALCHEMY_DATABASE_URI']:
         raise ValueError("A DATABASE_URL is required.")
 
+    # --- JSON Serialization ---
+    from .utils.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app) # orjson when installed, the stdlib encoder otherwise
+
+    # --- Database Engine Configuration ---
+    from .database import engine_options, configure_engine
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+
     # --- CORS Configuration ---
     # In production, no need for CORS as frontend and backend are served from same origin
     # But keep it for development where they might be on different ports
@@ -40,10 +58,34 @@ def create_app():
     # --- Initialize Extensions ---
     from .extensions import db, bcrypt, migrate, init_supabase, jwt
     db.init_app(app)
+    with app.app_context():
+        configure_engine(db.engine) # WAL and per-connection pragmas for SQLite
     bcrypt.init_app(app)
+    from .services.password_hasher import password_hasher
+    password_hasher.init_app(app) # Runs bcrypt off the request thread, with a queue limit
     migrate.init_app(app, db) # For database migrations
     jwt.init_app(app) # For JWT authentication
-    init_supabase() # For Supabase file storage
+    init_supabase() # Validates Supabase settings; the client is created on first use
+
+    from .services.progress_writer import progress_writer
+    progress_writer.init_app(app) # Batches job progress writes onto one thread
+
+    from .services.metrics import init_metrics
+    init_metrics(app) # Request latency, in-flight and per-request DB metrics
+
+    from .services.identity_cache import init_identity_cache
+    init_identity_cache() # Evicts cached identities when a user changes
+
+    from .services.pdf_cache import pdf_cache
+    pdf_cache.init_app(app) # Local disk cache for PDFs downloaded from storage
+
+    from .services.documents import init_document_refcounts
+    init_document_refcounts() # Deleting a lecture releases its shared PDF
+    from .services.search_index import init_chapter_cleanup
+    init_chapter_cleanup() # Deleting a lecture drops its chapters from the search index
+
+    from .services.profiler import init_profiling
+    init_profiling(app) # Opt-in sampling profiler; a no-op unless configured
 
     # --- Register Blueprints ---
     from .routes.auth import auth_bp
@@ -52,6 +94,9 @@ def create_app():
     from .routes.exams import exams_bp
     from .routes.ai import ai_bp
     from .routes.artifacts import artifacts_bp
+    from .routes.search import search_bp
+    from .routes.metrics import metrics_bp
+    from .routes.profiles import profiles_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(upload_bp, url_prefix='/api')
@@ -59,28 +104,33 @@ def create_app():
     app.register_blueprint(exams_bp, url_prefix='/api')
     app.register_blueprint(ai_bp, url_prefix='/api/ai')
     app.register_blueprint(artifacts_bp, url_prefix='/api/artifacts')
+    app.register_blueprint(search_bp, url_prefix='/api')
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(profiles_bp, url_prefix='/api/admin')
+
+    # --- Response Compression ---
+    from .utils.compression import init_compression
+    init_compression(app)
 
     # --- Register CLI Commands ---
     from .cli import register_cli_commands
     register_cli_commands(app)
 
     # Serve React App - catch all route to serve index.html for client-side routing
+    # The static folder is indexed once here so requests never touch the filesystem to find a file
+    from .utils.static_assets import StaticManifest
+    manifest = StaticManifest(app.static_folder, precompress=os.environ.get('STATIC_PRECOMPRESS', '1') == '1')
+
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
     def serve(path):
-        # If the path is an API route, let Flask handle it normally
-        if path.startswith('api/'):
-            return app.send_static_file('index.html')
-        
-        # For all frontend routes, serve the index.html file from the static folder
-        try:
-            if path and os.path.exists(os.path.join(app.static_folder, path)):
-                return send_from_directory(app.static_folder, path)
-            return send_from_directory(app.static_folder, 'index.html')
-        except:
-            # If in development mode without static files, return API welcome message
-            if not app.static_folder or not os.path.exists(app.static_folder):
-                return jsonify({"message": "Welcome to the EduForge API!"})
-            return app.send_static_file('index.html')
+        index = manifest.get('index.html')
+        if index is None:
+            # In development mode without static files, return API welcome message
+            return jsonify({"message": "Welcome to the EduForge API!"})
+
+        # Unknown API routes and all frontend routes get index.html for client-side routing
+        entry = manifest.get(path) if path and not path.startswith('api/') else None
+        return manifest.send(entry or index)
 
     return app
@@ -8,7 +8,12 @@ def init_db_command():
     """Clear the existing data and create new tables."""
     # Import all models here so they are registered with SQLAlchemy
     from . import models
+    from .services.search_index import ensure_index, SearchUnavailable
     db.create_all()
+    try:
+        ensure_index()
+    except SearchUnavailable:
+        click.echo('Full-text search is only available on SQLite; skipping the search index.')
     click.echo('Initialized the database.')
 
 import json
@@ -160,7 +165,246 @@ export default function {component_name}StudyGuide() {{
 }}
 """
 
+@click.command('train-artifact-dictionary')
+@click.option('--samples', default=500, help='Number of recent artifacts to train on.')
+@with_appcontext
+def train_artifact_dictionary_command(samples):
+    """Trains a new shared compression dictionary from existing artifact bodies."""
+    from .models import Artifact, ArtifactDictionary
+    from .services.artifact_blobs import train_dictionary
+
+    artifacts = Artifact.query.order_by(Artifact.id.desc()).limit(samples).all()
+    bodies = [artifact.content for artifact in artifacts if artifact.content]
+    # Always include the fallback templates, which most generated artifacts resemble.
+    bodies.append(get_fallback_study_guide_code('Sample Lecture', 'Sample content'))
+    bodies.append(get_fallback_study_guide_code('Another Lecture', 'More sample content'))
+
+    dictionary = ArtifactDictionary(data=train_dictionary(bodies))
+    db.session.add(dictionary)
+    db.session.commit()
+    click.echo(f'Trained dictionary {dictionary.id} ({len(dictionary.data)} bytes) from {len(bodies)} samples.')
+
+@click.command('pack-artifacts')
+@click.option('--batch-size', default=200, help='Number of artifacts to convert per commit.')
+@with_appcontext
+def pack_artifacts_command(batch_size):
+    """Moves inline artifact bodies into the compressed blob store."""
+    from .models import Artifact
+
+    packed = 0
+    while True:
+        artifacts = Artifact.query.filter(
+            Artifact.blob_hash.is_(None), Artifact._content.isnot(None)
+        ).limit(batch_size).all()
+        if not artifacts:
+            break
+        for artifact in artifacts:
+            artifact.content = artifact._content
+        db.session.commit()
+        packed += len(artifacts)
+    click.echo(f'Packed {packed} artifacts.')
+
+@click.command('precompress-artifact-blobs')
+@click.option('--batch-size', default=200, help='Number of blobs to encode per commit.')
+@with_appcontext
+def precompress_artifact_blobs_command(batch_size):
+    """Adds gzip/brotli encodings to blobs stored before they were precompressed."""
+    from .models import ArtifactBlob
+    from .services.artifact_blobs import add_http_encodings
+
+    encoded = 0
+    while True:
+        blobs = ArtifactBlob.query.filter(ArtifactBlob.gzip_data.is_(None)).limit(batch_size).all()
+        if not blobs:
+            break
+        for blob in blobs:
+            add_http_encodings(blob, blob.text)
+        db.session.commit()
+        encoded += len(blobs)
+    click.echo(f'Precompressed {encoded} blobs.')
+
+@click.command('gc-artifact-blobs')
+@with_appcontext
+def gc_artifact_blobs_command():
+    """Deletes artifact blobs that are no longer referenced."""
+    from .services.artifact_blobs import delete_unreferenced_blobs
+    click.echo(f'Deleted {delete_unreferenced_blobs()} unreferenced blobs.')
+
+@click.command('gc-documents')
+@with_appcontext
+def gc_documents_command():
+    """Deletes uploaded PDFs that no lecture references any more."""
+    from .services.documents import delete_unreferenced_documents
+    from .services.storage import get_storage
+    click.echo(f'Deleted {delete_unreferenced_documents(get_storage())} unreferenced documents.')
+
+@click.command('seed-scale')
+@click.option('--users', default=1000, help='Number of users to create.')
+@click.option('--lectures-per-user', default=10)
+@click.option('--artifacts-per-lecture', default=4)
+@click.option('--exams-per-lecture', default=2)
+@click.option('--questions-per-exam', default=10)
+@click.option('--attempts-per-exam', default=20)
+@click.option('--distinct-artifacts', default=50, help='Size of the pool of distinct artifact bodies.')
+@click.option('--batch-size', default=5000, help='Rows per executemany batch.')
+@click.option('--pdfs', default=0, help='Number of synthetic PDFs to write.')
+@click.option('--pdf-pages', default=300, help='Pages per synthetic PDF.')
+@click.option('--pdf-dir', default='synthetic_pdfs', type=click.Path(file_okay=False))
+@click.option('--seed', default=42, help='Random seed, for reproducible data sets.')
+@with_appcontext
+def seed_scale_command(users, lectures_per_user, artifacts_per_lecture, exams_per_lecture,
+                       questions_per_exam, attempts_per_exam, distinct_artifacts, batch_size,
+                       pdfs, pdf_pages, pdf_dir, seed):
+    """Bulk-inserts a large synthetic data set for load and scale testing."""
+    import os
+    import random
+    import time
+    from datetime import datetime
+    from .models import User, Lecture, Artifact, Exam, ExamAttempt, Question
+    from .extensions import bcrypt
+    from .utils.synthetic_data import (
+        bulk_insert, build_artifact_bodies, next_id, random_exam_questions,
+        random_sentence, random_timestamp, write_synthetic_pdf
+    )
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    started = time.perf_counter()
+
+    # Hashing is deliberately slow, so every synthetic user shares one hash
+    password = bcrypt.generate_password_hash('password').decode('utf-8')
+    blob_hashes = build_artifact_bodies(rng, distinct_artifacts)
+
+    first_user = next_id(User.__table__)
+    first_lecture = next_id(Lecture.__table__)
+    first_exam = next_id(Exam.__table__)
+    user_ids = range(first_user, first_user + users)
+    lecture_count = users * lectures_per_user
+    exam_count = lecture_count * exams_per_lecture
+
+    def lecture_owner(lecture_id):
+        return first_user + (lecture_id - first_lecture) // lectures_per_user
+
+    def exam_lecture(exam_id):
+        return first_lecture + (exam_id - first_exam) // exams_per_lecture
+
+    user_rows = ({
+        'id': user_id,
+        'username': f'loadtest_{seed}_{user_id}',
+        'password': password,
+        'created_at': random_timestamp(rng, now)
+    } for user_id in user_ids)
+
+    lecture_rows = ({
+        'id': lecture_id,
+        'user_id': lecture_owner(lecture_id),
+        'title': random_sentence(rng, 2, 6).rstrip('.'),
+        'file_path': f'{lecture_owner(lecture_id)}/{lecture_id}-synthetic.pdf',
+        'created_at': random_timestamp(rng, now)
+    } for lecture_id in range(first_lecture, first_lecture + lecture_count))
+
+    artifact_rows = ({
+        'lecture_id': lecture_id,
+        'user_id': lecture_owner(lecture_id),
+        'artifact_type': rng.choice(('study_guide', 'quiz')),
+        'blob_hash': rng.choice(blob_hashes),
+        'created_at': random_timestamp(rng, now)
+    } for lecture_id in range(first_lecture, first_lecture + lecture_count)
+      for _ in range(artifacts_per_lecture))
+
+    exam_rows = ({
+        'id': exam_id,
+        'lecture_id': exam_lecture(exam_id),
+        'user_id': lecture_owner(exam_lecture(exam_id)),
+        'title': f'Exam {exam_id}',
+        'created_at': random_timestamp(rng, now)
+    } for exam_id in range(first_exam, first_exam + exam_count))
+
+    question_rows = (
+        dict(question, exam_id=exam_id, chapter_id=None, position=position, explanation=None)
+        for exam_id in range(first_exam, first_exam + exam_count)
+        for position, question in enumerate(random_exam_questions(rng, questions_per_exam), start=1)
+    )
+
+    def attempt_rows():
+        for exam_id in range(first_exam, first_exam + exam_count):
+            for _ in range(attempts_per_exam):
+                answers = [rng.randrange(4) for _ in range(questions_per_exam)]
+                started_at = random_timestamp(rng, now)
+                yield {
+                    'exam_id': exam_id,
+                    'user_id': rng.choice(user_ids),
+                    'answers': json.dumps(answers),
+                    'score': None,
+                    'started_at': started_at,
+                    'completed_at': started_at
+                }
+
+    for name, table, rows in (
+        ('users', User.__table__, user_rows),
+        ('lectures', Lecture.__table__, lecture_rows),
+        ('artifacts', Artifact.__table__, artifact_rows),
+        ('exams', Exam.__table__, exam_rows),
+        ('questions', Question.__table__, question_rows),
+        ('exam attempts', ExamAttempt.__table__, attempt_rows()),
+    ):
+        table_started = time.perf_counter()
+        count = bulk_insert(table, rows, batch_size)
+        click.echo(f'Inserted {count} {name} in {time.perf_counter() - table_started:.1f}s')
+
+    if pdfs:
+        os.makedirs(pdf_dir, exist_ok=True)
+        for i in range(pdfs):
+            path = os.path.join(pdf_dir, f'synthetic_{seed}_{i}.pdf')
+            write_synthetic_pdf(path, pdf_pages, rng)
+            click.echo(f'Wrote {path} ({pdf_pages} pages)')
+
+    click.echo(f'Done in {time.perf_counter() - started:.1f}s.')
+
+@click.command('rebuild-exam-analytics')
+@click.option('--exam-id', type=int, default=None, help='Only rebuild this exam.')
+@with_appcontext
+def rebuild_exam_analytics_command(exam_id):
+    """Recomputes exam analytics from the stored attempts."""
+    from .models import Exam
+    from .services.exam_analytics import rebuild_exam_analytics
+
+    exam_ids = [exam_id] if exam_id is not None else [row.id for row in db.session.query(Exam.id).order_by(Exam.id)]
+    for current_id in exam_ids:
+        exam = db.session.get(Exam, current_id)
+        if exam is None:
+            raise click.ClickException(f'Exam {current_id} not found.')
+        count = rebuild_exam_analytics(exam)
+        click.echo(f'Exam {exam.id}: {count} attempts')
+
+@click.command('profile-pdf-pipeline')
+@click.argument('pdf_path')
+@click.option('--title', default='Profiled lecture', help='Title passed to the generators.')
+@with_appcontext
+def profile_pdf_pipeline_command(pdf_path, title):
+    """Runs the PDF-to-artifacts pipeline on one file under the sampling profiler."""
+    from .services.pdf_processor import PDFProcessor
+    from .services.profiler import collapsed, get_store, profile_job
+
+    with profile_job('pdf-pipeline') as profile_id:
+        result = PDFProcessor().process_pdf_for_artifacts(pdf_path, title)
+    if result.get('error'):
+        click.echo(f"Pipeline failed: {result['error']}", err=True)
+
+    # The hottest stacks, leaf last; the full profile is in the store
+    for line in collapsed(get_store().load(profile_id)).splitlines()[:10]:
+        click.echo(line)
+    click.echo(f'Saved profile {profile_id} to {get_store().directory}')
+
 def register_cli_commands(app):
     """Register CLI commands with the Flask app."""
     app.cli.add_command(init_db_command)
     app.cli.add_command(seed_db_command)
+    app.cli.add_command(train_artifact_dictionary_command)
+    app.cli.add_command(pack_artifacts_command)
+    app.cli.add_command(precompress_artifact_blobs_command)
+    app.cli.add_command(gc_artifact_blobs_command)
+    app.cli.add_command(gc_documents_command)
+    app.cli.add_command(seed_scale_command)
+    app.cli.add_command(rebuild_exam_analytics_command)
+    app.cli.add_command(profile_pdf_pipeline_command)
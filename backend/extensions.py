@@ -11,7 +11,6 @@ from flask_bcrypt import Bcrypt
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 import os
-from supabase import create_client
 
 # Create extension instances
 db = SQLAlchemy()
@@ -19,12 +18,56 @@ bcrypt = Bcrypt()
 migrate = Migrate()
 jwt = JWTManager()
 
+_supabase = None
+_supabase_pid = None
+
 def init_supabase():
-    """Initialize the Supabase client for storage operations."""
+    """
+    Checks the Supabase configuration for storage operations.
+
+    The client itself is only built by `get_supabase` on first use, so booting
+    a worker or running a CLI command never imports the Supabase SDK.
+    """
     supabase_url = os.environ.get('SUPABASE_URL')
     supabase_key = os.environ.get('SUPABASE_KEY')
     
     if not supabase_url or not supabase_key:
         raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in environment variables")
-    
-    return create_client(supabase_url, supabase_key)
+
+def _supabase_options():
+    """
+    Client options with one pooled HTTP client, so storage calls reuse
+    keep-alive connections instead of opening a TLS connection each time.
+    """
+    import httpx
+    from supabase import ClientOptions
+
+    http_client = httpx.Client(
+        timeout=float(os.environ.get('SUPABASE_TIMEOUT', 120)),
+        limits=httpx.Limits(
+            max_connections=int(os.environ.get('SUPABASE_MAX_CONNECTIONS', 20)),
+            max_keepalive_connections=int(os.environ.get('SUPABASE_MAX_KEEPALIVE', 10)),
+            keepalive_expiry=30,
+        ),
+    )
+    try:
+        return ClientOptions(httpx_client=http_client)
+    except TypeError:
+        # SDKs older than the httpx_client option keep their own persistent client
+        http_client.close()
+        return None
+
+def get_supabase():
+    """Returns the process-wide Supabase client, creating it on first call."""
+    global _supabase, _supabase_pid
+    # Pooled connections must not be shared across gunicorn's fork, so each worker builds its own
+    if _supabase is None or _supabase_pid != os.getpid():
+        from supabase import create_client
+        init_supabase()
+        options = _supabase_options()
+        if options is None:
+            _supabase = create_client(os.environ['SUPABASE_URL'], os.environ['SUPABASE_KEY'])
+        else:
+            _supabase = create_client(os.environ['SUPABASE_URL'], os.environ['SUPABASE_KEY'], options=options)
+        _supabase_pid = os.getpid()
+    return _supabase
@@ -0,0 +1,48 @@
+"""
+Gunicorn configuration.
+
+Most request time is spent waiting on Anthropic, Supabase or the database,
+so workers run on gevent by default: each worker process serves up to
+`GUNICORN_WORKER_CONNECTIONS` requests concurrently as greenlets, and a slow
+LLM call only parks its own greenlet instead of blocking a whole process.
+Set GUNICORN_WORKER_CLASS=sync to go back to one request per process.
+"""
+
+import os
+import shutil
+
+# Workers share metrics through files in this directory (see services/metrics.py).
+# It has to be in the environment before the app imports prometheus_client.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/eduforge-metrics')
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '7860')}"
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')
+workers = int(os.environ.get('GUNICORN_WORKERS', '2'))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', '500'))
+# Generation requests wait minutes on the model; with gevent the timeout only
+# catches a worker whose event loop is wedged, not a slow request.
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '300'))
+graceful_timeout = 30
+keepalive = 5
+
+def on_starting(server):
+    # Samples left over from a previous run would be added to this one's
+    metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+def post_fork(server, worker):
+    if worker_class != 'gevent':
+        return
+    # psycopg2 blocks in C and would stall every greenlet in the worker during
+    # a query unless it is told to wait on the gevent hub instead.
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        server.log.warning("psycogreen is not installed; PostgreSQL queries will block the event loop")
+        return
+    patch_psycopg()
@@ -9,34 +9,171 @@ class User(db.Model):
 
 class Lecture(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     title = db.Column(db.String(200), nullable=False)
     file_path = db.Column(db.String(1024), nullable=False) # Stores the path to the file in Supabase Storage
+    # The shared, content-addressed copy of the PDF; null for lectures uploaded before deduplication
+    document_hash = db.Column(db.String(64), db.ForeignKey('document.sha256'), nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     artifacts = db.relationship('Artifact', backref='lecture', lazy=True, cascade="all, delete-orphan")
     exams = db.relationship('Exam', backref='lecture', lazy=True, cascade="all, delete-orphan")
+    jobs = db.relationship('ProcessingJob', backref='lecture', lazy=True, cascade="all, delete-orphan")
+
+class Document(db.Model):
+    """
+    A PDF stored once per distinct content, addressed by the SHA-256 of its bytes.
+
+    Every lecture uploaded with the same bytes points here, and the extracted
+    text, chapters and generated artifacts are kept once per document.
+    """
+    sha256 = db.Column(db.String(64), primary_key=True)
+    file_path = db.Column(db.String(1024), nullable=False) # documents/<sha256>.pdf in Supabase Storage
+    size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0) # Lectures pointing at this document
+    text_content = db.deferred(db.Column(db.Text, nullable=True)) # Set by the first extraction
+    chapters = db.deferred(db.Column(db.JSON, nullable=True)) # [[title, content], ...]
+    analysis = db.Column(db.JSON, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class DocumentArtifact(db.Model):
+    """
+    A generated artifact body for a document, reused by every lecture made from it.
+
+    Bodies embed the lecture title they were generated for, so they are only
+    shared between lectures uploaded under the same title.
+    """
+    document_hash = db.Column(db.String(64), db.ForeignKey('document.sha256'), primary_key=True)
+    artifact_type = db.Column(db.String(50), primary_key=True)
+    title = db.Column(db.String(200), primary_key=True)
+    blob_hash = db.Column(db.String(64), db.ForeignKey('artifact_blob.hash'), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    blob = db.relationship('ArtifactBlob', lazy=True)
 
 class Artifact(db.Model):
+    # Artifacts are listed per lecture in creation order, so the composite index
+    # serves both the lecture_id filter and the ORDER BY.
+    __table_args__ = (db.Index('ix_artifact_lecture_id_created_at', 'lecture_id', 'created_at'),)
+
     id = db.Column(db.Integer, primary_key=True)
     lecture_id = db.Column(db.Integer, db.ForeignKey('lecture.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     artifact_type = db.Column(db.String(50), nullable=False) # e.g., 'study_guide', 'summary'
-    content = db.Column(db.Text, nullable=False)
+    _content = db.deferred(db.Column('content', db.Text, nullable=True)) # Legacy inline body, superseded by blob_hash
+    blob_hash = db.Column(db.String(64), db.ForeignKey('artifact_blob.hash'), nullable=True, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    blob = db.relationship('ArtifactBlob', lazy=True)
+
+    @property
+    def content(self):
+        """The artifact body, decompressed from its blob on first access."""
+        if self.blob_hash is not None:
+            return self.blob.text
+        return self._content
+
+    @content.setter
+    def content(self, value):
+        from .services.artifact_blobs import put_blob
+        self.blob = put_blob(value)
+        self._content = None
+
+    @property
+    def size(self):
+        """Uncompressed size of the body in bytes, or None for a legacy inline body."""
+        return self.blob.size if self.blob_hash is not None else None
+
+class ArtifactDictionary(db.Model):
+    """A shared zlib preset dictionary trained on artifact bodies."""
+    id = db.Column(db.Integer, primary_key=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ArtifactBlob(db.Model):
+    """A compressed artifact body, addressed by the SHA-256 of its uncompressed text."""
+    hash = db.Column(db.String(64), primary_key=True)
+    dictionary_id = db.Column(db.Integer, db.ForeignKey('artifact_dictionary.id'), nullable=True)
+    data = db.deferred(db.Column(db.LargeBinary, nullable=False))
+    # The same body precompressed for HTTP clients, so it can be sent without recompressing
+    gzip_data = db.deferred(db.Column(db.LargeBinary, nullable=True))
+    br_data = db.deferred(db.Column(db.LargeBinary, nullable=True))
+    size = db.Column(db.Integer, nullable=False) # Uncompressed size in bytes
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    @property
+    def text(self):
+        if not hasattr(self, '_text'):
+            from .services.artifact_blobs import decompress
+            self._text = decompress(self.data, self.dictionary_id)
+        return self._text
+
+class ProcessingJob(db.Model):
+    """A long-running generation request; clients poll or stream its progress."""
+    __tablename__ = 'processing_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    lecture_id = db.Column(db.Integer, db.ForeignKey('lecture.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    job_type = db.Column(db.String(50), nullable=False) # e.g., 'artifact_generation'
+    status = db.Column(db.String(20), nullable=False) # 'processing', 'completed' or 'failed'
+    progress = db.Column(db.Integer, nullable=True) # Percent, written by the progress writer
+    error_message = db.Column(db.Text, nullable=True)
+    result_data = db.Column(db.JSON, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class Exam(db.Model):
+    __table_args__ = (db.Index('ix_exam_lecture_id_created_at', 'lecture_id', 'created_at'),)
+
     id = db.Column(db.Integer, primary_key=True)
     lecture_id = db.Column(db.Integer, db.ForeignKey('lecture.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     title = db.Column(db.String(200), nullable=False)
-    questions = db.Column(db.Text, nullable=False) # Storing questions as JSON string
+    questions = db.Column(db.Text, nullable=True) # Legacy JSON question list, superseded by the Question table
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-class ExamAttempt(db.Model):
+class Question(db.Model):
+    __tablename__ = 'questions'
+    # Questions are always read per exam in order, and the unique index serves that too
+    __table_args__ = (db.UniqueConstraint('exam_id', 'position', name='uq_questions_exam_id_position'),)
+
     id = db.Column(db.Integer, primary_key=True)
     exam_id = db.Column(db.Integer, db.ForeignKey('exam.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    chapter_id = db.Column(db.Integer, nullable=True) # Chapter the question was generated from, if any
+    position = db.Column(db.Integer, nullable=False) # Order within the exam
+    question_text = db.Column(db.Text, nullable=False)
+    options = db.Column(db.JSON, nullable=False) # List of option strings
+    answer_index = db.Column(db.SmallInteger, nullable=False) # Index of the correct option
+    explanation = db.Column(db.Text, nullable=True)
+
+    @property
+    def correct_answer(self):
+        return self.options[self.answer_index]
+
+class ExamAttempt(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    exam_id = db.Column(db.Integer, db.ForeignKey('exam.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     score = db.Column(db.Float, nullable=True)
     answers = db.Column(db.Text, nullable=True) # Storing user answers as JSON string
     started_at = db.Column(db.DateTime, default=datetime.utcnow)
     completed_at = db.Column(db.DateTime, nullable=True)
+
+class ExamAnalytics(db.Model):
+    """Running totals over an exam's completed attempts, updated as each attempt completes."""
+    exam_id = db.Column(db.Integer, db.ForeignKey('exam.id'), primary_key=True)
+    attempt_count = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Float, nullable=False, default=0.0)
+    score_sum_sq = db.Column(db.Float, nullable=False, default=0.0) # For the standard deviation
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ExamScoreBucket(db.Model):
+    """Number of completed attempts whose score falls in a 10-point bucket (0 = 0-9, 9 = 90-100)."""
+    exam_id = db.Column(db.Integer, db.ForeignKey('exam.id'), primary_key=True)
+    bucket = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class QuestionOptionCount(db.Model):
+    """How many completed attempts picked each option of a question (-1 = unanswered)."""
+    exam_id = db.Column(db.Integer, db.ForeignKey('exam.id'), primary_key=True)
+    question_index = db.Column(db.Integer, primary_key=True)
+    option_index = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
@@ -2,166 +2,366 @@
 API routes for artifact generation and management
 """
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from ..extensions import db
-from ..services.ai_artifact_generator import AIArtifactGenerator
-import os
+from ..services.progress_writer import progress_writer
+from ..services.search_index import index_chapters, SearchUnavailable
+from ..utils.decorators import jwt_required, login_required
+from ..utils.http_cache import IMMUTABLE_CACHE_CONTROL, make_etag, not_modified, set_cache_headers
+from ..utils.json_provider import raw_json, stream_json_object
+import json
+import time
 
 artifacts_bp = Blueprint('artifacts', __name__)
-ai_artifact_generator = AIArtifactGenerator()
+_pdf_processor = None
+
+def get_pdf_processor():
+    """Builds the PDF processor and its AI client on the first generation request instead of at import."""
+    global _pdf_processor
+    if _pdf_processor is None:
+        from ..services.pdf_processor import PDFProcessor
+        _pdf_processor = PDFProcessor()
+    return _pdf_processor
+
+# Artifact types the pipeline produces, in the order they are created
+GENERATED_ARTIFACT_TYPES = ('study_guide', 'quiz')
 
 @artifacts_bp.route('/generate', methods=['POST'])
-def generate_new_artifact():
-    """Generate interactive artifacts from PDF content"""
-    from ..models import Artifact, PDF, ProcessingJob
-    
+@artifacts_bp.route('/generate/<int:lecture_id>', methods=['POST'])
+@login_required
+def generate_new_artifact(current_user, lecture_id=None):
+    """Generate interactive artifacts from a lecture's PDF"""
+    from ..models import Artifact, Lecture, ProcessingJob
+
+    data = request.get_json(silent=True) or {}
+    lecture_id = lecture_id or data.get('lecture_id')
+    artifact_types = data.get('types', list(GENERATED_ARTIFACT_TYPES))
+    regenerate = bool(data.get('regenerate')) # Skip the bodies stored for the lecture's document
+
+    if not lecture_id:
+        return jsonify({'error': 'Lecture ID is required'}), 400
+
+    lecture = Lecture.query.filter_by(id=lecture_id, user_id=current_user.id).first()
+    if not lecture:
+        return jsonify({'error': 'Lecture not found'}), 404
+
+    job = ProcessingJob(
+        job_type='artifact_generation',
+        status='processing',
+        progress=0,
+        lecture_id=lecture.id,
+        user_id=current_user.id
+    )
+    db.session.add(job)
+    db.session.commit()
+
     try:
-        data = request.get_json()
-        pdf_id = data.get('pdf_id')
-        artifact_types = data.get('types', ['study_guide', 'quiz'])
-        
-        if not pdf_id:
-            return jsonify({'error': 'PDF ID is required'}), 400
-        
-        pdf = PDF.query.get(pdf_id)
-        if not pdf:
-            return jsonify({'error': 'PDF not found'}), 404
-        
-        job = ProcessingJob(
-            job_type='artifact_generation',
-            status='processing',
-            progress=0,
-            pdf_id=pdf_id
+        # Lectures made from the same PDF share its extraction and generated bodies
+        result = get_pdf_processor().process_pdf_for_artifacts(
+            lecture.file_path, lecture.title, document_hash=lecture.document_hash, regenerate=regenerate
         )
-        db.session.add(job)
-        db.session.commit()
-        
-        try:
-            pdf_path = os.path.join('uploads', pdf.filename)
-            result = ai_artifact_generator.process_pdf_for_artifacts(pdf_path, pdf.title)
-
-            if result.get('error'):
-                job.status = 'failed'
-                job.error_message = result['error']
-                db.session.commit()
-                return jsonify({'error': result['error']}), 500
-            
-            job.progress = 50
-            db.session.commit()
-            
-            artifacts_created = []
-            
-            if 'study_guide' in artifact_types and result['artifacts'].get('study_guide'):
-                study_guide = Artifact(
-                    title=f"{pdf.title} - Interactive Study Guide",
-                    artifact_type='study_guide',
-                    react_code=result['artifacts']['study_guide'],
-                    json_metadata={
-                        'analysis': result['analysis'],
-                        'chapter_count': len(result['chapters'])
-                    },
-                    pdf_id=pdf_id
-                )
-                db.session.add(study_guide)
-                artifacts_created.append({
-                    'type': 'study_guide',
-                    'title': study_guide.title
-                })
-            
-            if 'quiz' in artifact_types and result['artifacts'].get('quiz'):
-                quiz = Artifact(
-                    title=f"{pdf.title} - Interactive Quiz",
-                    artifact_type='quiz',
-                    react_code=result['artifacts']['quiz'],
-                    json_metadata={
-                        'question_count': 5,
-                        'difficulty': result['analysis'].get('complexity_level', 'intermediate')
-                    },
-                    pdf_id=pdf_id
-                )
-                db.session.add(quiz)
-                artifacts_created.append({
-                    'type': 'quiz',
-                    'title': quiz.title
-                })
-            
-            job.status = 'completed'
-            job.progress = 100
-            job.result_data = {
-                'artifacts_created': artifacts_created,
-                'analysis': result['analysis']
-            }
-            
-            db.session.commit()
-            
-            return jsonify({
-                'success': True,
-                'job_id': job.id,
-                'artifacts_created': artifacts_created,
-                'analysis': result['analysis']
-            })
-            
-        except Exception as e:
+
+        if result.get('error'):
             job.status = 'failed'
-            job.error_message = str(e)
+            job.error_message = result['error']
             db.session.commit()
-            raise e
-            
+            return jsonify({'error': result['error']}), 500
+
+        progress_writer.submit(job.id, 50)
+
+        # Index the extracted chapters so the lecture shows up in search
+        try:
+            index_chapters(lecture.user_id, lecture.id, result['chapters'])
+        except SearchUnavailable:
+            pass
+
+        artifacts = [
+            Artifact(lecture_id=lecture.id, user_id=current_user.id, artifact_type=artifact_type,
+                     content=result['artifacts'][artifact_type])
+            for artifact_type in GENERATED_ARTIFACT_TYPES
+            if artifact_type in artifact_types and result['artifacts'].get(artifact_type)
+        ]
+        db.session.add_all(artifacts)
+        db.session.flush()
+        artifacts_created = [{'id': a.id, 'type': a.artifact_type} for a in artifacts]
+
+        job.status = 'completed'
+        job.progress = 100
+        job.result_data = {
+            'artifacts_created': artifacts_created,
+            'analysis': result['analysis']
+        }
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'job_id': job.id,
+            'artifacts_created': artifacts_created,
+            'analysis': result['analysis']
+        })
+
     except Exception as e:
+        db.session.rollback()
+        job.status = 'failed'
+        job.error_message = str(e)
+        db.session.commit()
         return jsonify({'error': f'Artifact generation failed: {str(e)}'}), 500
 
-@artifacts_bp.route('/pdf/<int:pdf_id>', methods=['GET'])
-def get_artifacts_for_pdf(pdf_id):
-    """Get all artifacts for a specific PDF"""
+# Columns that may be requested through `?fields=` on the listing endpoint.
+# The code body is intentionally absent so listings never load it; `size` is
+# the body's uncompressed size, read from the blob row without its data.
+ARTIFACT_LIST_FIELDS = {
+    'id': lambda a: a.id,
+    'type': lambda a: a.artifact_type,
+    'lecture_id': lambda a: a.lecture_id,
+    'created_at': lambda a: a.created_at.isoformat() if a.created_at else None,
+    'size': lambda a: a.size,
+}
+DEFAULT_ARTIFACT_LIST_FIELDS = ['id', 'type', 'created_at']
+
+def _artifact_list_query(fields):
+    """Selects the columns behind the requested fields, joining the blob row only for `size`."""
+    from ..models import Artifact, ArtifactBlob
+
+    columns = {
+        'id': Artifact.id,
+        'type': Artifact.artifact_type,
+        'lecture_id': Artifact.lecture_id,
+        'created_at': Artifact.created_at,
+        'size': ArtifactBlob.size,
+    }
+    # id and created_at are always needed to build the pagination cursor
+    selected = [Artifact.id, Artifact.created_at]
+    for field in fields:
+        if columns[field] not in selected:
+            selected.append(columns[field])
+    query = db.session.query(*selected)
+    if 'size' in fields:
+        query = query.outerjoin(ArtifactBlob, Artifact.blob_hash == ArtifactBlob.hash)
+    return query
+
+def parse_artifact_fields(raw, allowed=ARTIFACT_LIST_FIELDS, default=DEFAULT_ARTIFACT_LIST_FIELDS):
+    """
+    Parses a comma-separated `fields` parameter.
+
+    Raises:
+        ValueError: If a field is not in `allowed`.
+    """
+    if not raw:
+        return default
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+def list_artifact_page(lecture_id, fields, cursor=None, limit=None):
+    """
+    Loads one page of a lecture's artifacts, selecting only the columns behind `fields`.
+
+    Returns:
+        tuple: (list of artifact dicts, cursor for the next page or None)
+
+    Raises:
+        ValueError: If the cursor or page size is invalid.
+    """
     from ..models import Artifact
-    
+    from ..utils.pagination import keyset_paginate, parse_page_size
+
+    query = _artifact_list_query(fields).filter(Artifact.lecture_id == lecture_id)
+    rows, next_cursor = keyset_paginate(
+        query, Artifact.created_at, Artifact.id, cursor=cursor, limit=parse_page_size(limit)
+    )
+    return [{field: ARTIFACT_LIST_FIELDS[field](row) for field in fields} for row in rows], next_cursor
+
+@artifacts_bp.route('/pdf/<int:lecture_id>', methods=['GET'])
+def get_artifacts_for_pdf(lecture_id):
+    """Get artifacts for a specific lecture, without their code, one page at a time"""
     try:
-        artifacts = Artifact.query.filter_by(pdf_id=pdf_id).all()
-        
-        artifacts_data = []
-        for artifact in artifacts:
-            artifacts_data.append({
-                'id': artifact.id,
-                'title': artifact.title,
-                'type': artifact.artifact_type,
-                'created_at': artifact.created_at.isoformat(),
-                'json_metadata': artifact.json_metadata
-            })
+        try:
+            fields = parse_artifact_fields(request.args.get('fields'))
+            artifacts_data, next_cursor = list_artifact_page(
+                lecture_id, fields, cursor=request.args.get('cursor'), limit=request.args.get('limit')
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         return jsonify({
             'success': True,
-            'artifacts': artifacts_data
+            'artifacts': artifacts_data,
+            'next_cursor': next_cursor
         })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# The multi-get may also return code bodies, but only when `content` is asked for
+ARTIFACT_DETAIL_FIELDS = dict(ARTIFACT_LIST_FIELDS, content=lambda a: a.content)
+MAX_ARTIFACTS_PER_REQUEST = 100
+
+@artifacts_bp.route('', methods=['GET'])
+@jwt_required(load_user=False)
+def get_artifacts_by_id(current_user):
+    """
+    Get several of the caller's artifacts in one request, e.g. `?ids=3,7,9&fields=id,type,content`
+
+    Ids of other users' artifacts are reported as missing, the same as ids
+    that do not exist.
+    """
+    from sqlalchemy.orm import selectinload
+    from ..models import Artifact, ArtifactBlob
+
+    try:
+        try:
+            ids = [int(i) for i in request.args.get('ids', '').split(',') if i.strip()]
+        except ValueError:
+            return jsonify({'error': 'ids must be a comma-separated list of integers'}), 400
+        try:
+            fields = parse_artifact_fields(request.args.get('fields'), allowed=ARTIFACT_DETAIL_FIELDS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if not ids:
+            return jsonify({'error': 'ids is required'}), 400
+        if len(ids) > MAX_ARTIFACTS_PER_REQUEST:
+            return jsonify({'error': f'At most {MAX_ARTIFACTS_PER_REQUEST} ids per request'}), 400
+
+        owned = (Artifact.id.in_(ids), Artifact.user_id == current_user.id)
+        if 'content' in fields:
+            # Bodies for every requested artifact come back in one extra query, not one per artifact
+            rows = Artifact.query.options(
+                selectinload(Artifact.blob).undefer(ArtifactBlob.data)
+            ).filter(*owned).all()
+        else:
+            rows = _artifact_list_query(fields).filter(*owned).all()
+
+        by_id = {row.id: row for row in rows}
+        found = [by_id[i] for i in ids if i in by_id]
+        missing = [i for i in ids if i not in by_id]
+        if 'content' not in fields:
+            return jsonify({
+                'success': True,
+                'artifacts': [{field: ARTIFACT_DETAIL_FIELDS[field](row) for field in fields} for row in found],
+                'missing': missing
+            })
+
+        # Bodies are resolved here, so a failure is still a 500 rather than a
+        # 200 cut off mid-stream. The response can run to megabytes, so it is
+        # encoded and sent one artifact at a time rather than as one document.
+        artifacts = [{field: ARTIFACT_DETAIL_FIELDS[field](row) for field in fields} for row in found]
+        body = stream_json_object({'success': True, 'missing': missing}, 'artifacts', artifacts)
+        return Response(stream_with_context(body), mimetype='application/json')
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @artifacts_bp.route('/<int:artifact_id>', methods=['GET'])
 def get_artifact(artifact_id):
-    """Get specific artifact with React code"""
+    """Get specific artifact with its code"""
     from ..models import Artifact
+    from ..services.artifact_blobs import json_encoded_body
     
     try:
-        artifact = Artifact.query.get(artifact_id)
-        if not artifact:
+        # Resolve the ETag from the stored content hash before touching the code column
+        header = db.session.query(
+            Artifact.id, Artifact.artifact_type, Artifact.lecture_id, Artifact.created_at, Artifact.blob_hash
+        ).filter(Artifact.id == artifact_id).first()
+        if not header:
             return jsonify({'error': 'Artifact not found'}), 404
         
-        return jsonify({
+        etag = None
+        if header.blob_hash:
+            # Blobs are immutable and an artifact's other fields never change
+            etag = make_etag(artifact_id, header.blob_hash)
+            cached = not_modified(etag, IMMUTABLE_CACHE_CONTROL)
+            if cached:
+                return cached
+            content = raw_json(json_encoded_body(header.blob_hash)) # Cached, already escaped
+        else:
+            content = db.session.get(Artifact, artifact_id).content
+        response = jsonify({
             'success': True,
             'artifact': {
-                'id': artifact.id,
-                'title': artifact.title,
-                'type': artifact.artifact_type,
-                'content': artifact.react_code,
-                'json_metadata': artifact.json_metadata,
-                'created_at': artifact.created_at.isoformat(),
-                'updated_at': artifact.updated_at.isoformat()
+                'id': header.id,
+                'type': header.artifact_type,
+                'lecture_id': header.lecture_id,
+                'content': content,
+                'created_at': header.created_at.isoformat() if header.created_at else None
             }
         })
+        if etag:
+            set_cache_headers(response, etag, IMMUTABLE_CACHE_CONTROL)
+        return response
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@artifacts_bp.route('/<int:artifact_id>/code', methods=['GET'])
+def get_artifact_code(artifact_id):
+    """Get an artifact's code as text, sending the stored compressed bytes when the client accepts them"""
+    from ..models import Artifact, ArtifactBlob
+    from ..services.artifact_blobs import stored_encodings
+    from ..utils.compression import negotiate
+    
+    try:
+        header = db.session.query(
+            Artifact.blob_hash,
+            ArtifactBlob.dictionary_id,
+            ArtifactBlob.br_data.isnot(None).label('has_br'),
+            ArtifactBlob.gzip_data.isnot(None).label('has_gzip')
+        ).outerjoin(
+            ArtifactBlob, Artifact.blob_hash == ArtifactBlob.hash
+        ).filter(Artifact.id == artifact_id).first()
+        if not header:
+            return jsonify({'error': 'Artifact not found'}), 404
+        
+        if header.blob_hash is None:
+            artifact = Artifact.query.get(artifact_id)
+            response = Response(artifact.content, mimetype='text/plain')
+            response.add_etag()
+            response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+            return response.make_conditional(request)
+        
+        # The blob hash is the content hash, so the ETag needs no body access. Each
+        # encoding is a different representation and gets its own strong ETag.
+        encoding = negotiate(stored_encodings(header))
+        etag = f'{header.blob_hash}-{encoding}' if encoding else header.blob_hash
+        cached = not_modified(etag, IMMUTABLE_CACHE_CONTROL)
+        if cached:
+            cached.headers['Vary'] = 'Accept-Encoding'
+            return cached
+        
+        blob = db.session.get(ArtifactBlob, header.blob_hash)
+        if encoding == 'br':
+            response = Response(blob.br_data, mimetype='text/plain')
+        elif encoding == 'gzip':
+            response = Response(blob.gzip_data, mimetype='text/plain')
+        elif encoding:
+            response = Response(blob.data, mimetype='text/plain')
+        else:
+            response = Response(blob.text, mimetype='text/plain')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        return set_cache_headers(response, etag, IMMUTABLE_CACHE_CONTROL)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@artifacts_bp.route('/dictionaries/<int:dictionary_id>', methods=['GET'])
+def get_artifact_dictionary(dictionary_id):
+    """Get a compression dictionary so clients can decode x-zdict-<id> bodies themselves"""
+    from ..services.artifact_blobs import get_dictionary
+    
+    try:
+        data = get_dictionary(dictionary_id)
+    except KeyError:
+        return jsonify({'error': 'Dictionary not found'}), 404
+    
+    response = Response(data, mimetype='application/octet-stream')
+    # Dictionaries are never modified once written
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
 @artifacts_bp.route('/<int:artifact_id>', methods=['DELETE'])
 def delete_artifact(artifact_id):
     """Delete an artifact"""
@@ -181,12 +381,13 @@ def delete_artifact(artifact_id):
         return jsonify({'error': str(e)}), 500
 
 @artifacts_bp.route('/processing-jobs/<int:job_id>/status', methods=['GET'])
-def get_job_status(job_id):
+@jwt_required(load_user=False)
+def get_job_status(current_user, job_id):
     """Get processing job status"""
     from ..models import ProcessingJob
     
     try:
-        job = ProcessingJob.query.get(job_id)
+        job = ProcessingJob.query.filter_by(id=job_id, user_id=current_user.id).first()
         if not job:
             return jsonify({'error': 'Job not found'}), 404
         
@@ -229,11 +430,12 @@ def debug_inspect_artifacts():
         return jsonify({'error': str(e)}), 500
 
 @artifacts_bp.route('/processing-jobs/<int:job_id>', methods=['GET'])
-def get_job(job_id):
+@jwt_required(load_user=False)
+def get_job(current_user, job_id):
     """Get processing job"""
     try:
         from ..models import ProcessingJob
-        job = ProcessingJob.query.get(job_id)
+        job = ProcessingJob.query.filter_by(id=job_id, user_id=current_user.id).first()
         if not job:
             return jsonify({'error': 'Job not found'}), 404
         
@@ -253,3 +455,52 @@ def get_job(job_id):
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+# Seconds between job polls on an event stream, and how long a stream may stay open
+JOB_EVENTS_INTERVAL = 1.0
+JOB_EVENTS_TIMEOUT = 600
+
+@artifacts_bp.route('/processing-jobs/<int:job_id>/events', methods=['GET'])
+@jwt_required(load_user=False)
+def stream_job_events(current_user, job_id):
+    """
+    Streams a processing job's progress as server-sent events until it finishes.
+
+    Replaces client-side polling of the status route. Each poll reads a few
+    columns and hands the connection straight back to the pool, so a worker
+    can hold hundreds of these streams open under gevent.
+    """
+    from ..models import ProcessingJob
+
+    def job_state():
+        try:
+            return db.session.query(
+                ProcessingJob.status, ProcessingJob.progress, ProcessingJob.error_message
+            ).filter(ProcessingJob.id == job_id, ProcessingJob.user_id == current_user.id).first()
+        finally:
+            db.session.close()
+
+    if job_state() is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    def events():
+        last = None
+        deadline = time.monotonic() + JOB_EVENTS_TIMEOUT
+        while time.monotonic() < deadline:
+            state = job_state()
+            if state is None:
+                return
+            if state != last:
+                last = state
+                payload = {'status': state.status, 'progress': state.progress, 'error_message': state.error_message}
+                yield f"data: {json.dumps(payload)}\n\n"
+                if state.status in ('completed', 'failed'):
+                    return
+            else:
+                yield ": keep-alive\n\n"
+            time.sleep(JOB_EVENTS_INTERVAL)
+
+    response = Response(stream_with_context(events()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no' # Stop nginx from buffering the stream
+    return response
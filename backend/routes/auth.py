@@ -1,10 +1,17 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token
-from ..extensions import db, bcrypt
+from sqlalchemy.exc import IntegrityError
+from ..extensions import db
 from ..models import User
+from ..services.password_hasher import password_hasher, HasherBusy
 
 auth_bp = Blueprint('auth_bp', __name__, url_prefix='/api/auth')
 
+def _busy():
+    response = jsonify({'error': 'Too many sign-ins in progress, please retry'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     data = request.get_json()
@@ -14,16 +21,23 @@ def register():
     if not username or not password:
         return jsonify({'error': 'Username and password are required'}), 400
 
-    if User.query.filter_by(username=username).first():
+    if db.session.query(User.id).filter_by(username=username).first():
         return jsonify({'error': 'Username already exists'}), 409
 
-    hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+    try:
+        hashed_password = password_hasher.hash(password)
+    except HasherBusy:
+        return _busy()
     new_user = User(username=username, password=hashed_password)
     
     try:
         db.session.add(new_user)
         db.session.commit()
         return jsonify({'message': 'User registered successfully'}), 201
+    except IntegrityError:
+        # Lost a race with a concurrent registration; the UNIQUE constraint caught it
+        db.session.rollback()
+        return jsonify({'error': 'Username already exists'}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Database error: {str(e)}'}), 500
@@ -39,9 +53,22 @@ def login():
 
     user = User.query.filter_by(username=username).first()
 
-    if user and bcrypt.check_password_hash(user.password, password):
+    try:
+        valid = user is not None and password_hasher.verify(user.password, password)
+    except HasherBusy:
+        return _busy()
+
+    if valid and password_hasher.needs_rehash(user.password):
+        # Upgrade hashes made with an older cost factor while the password is at hand
+        try:
+            user.password = password_hasher.hash(password)
+            db.session.commit()
+        except HasherBusy:
+            pass # Upgraded on a later login instead
+
+    if valid:
         # Create the JWT token with Flask-JWT-Extended
-        access_token = create_access_token(identity=user.id)
+        access_token = create_access_token(identity=str(user.id)) # JWT subjects must be strings
         return jsonify(access_token=access_token)
     
     return jsonify({'error': 'Invalid username or password'}), 401
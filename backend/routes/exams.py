@@ -1,24 +1,26 @@
 from flask import Blueprint, jsonify, request
 from ..extensions import db
 from ..utils.decorators import jwt_required
+from ..utils.http_cache import conditional
+from ..utils.authorization import get_owned_exam, get_owned_exam_questions, user_owns_exam
 
 exams_bp = Blueprint('exams_bp', __name__, url_prefix='/api')
 
-@exams_bp.route('/lectures/<int:pdf_id>/exams', methods=['POST'])
+@exams_bp.route('/lectures/<int:lecture_id>/exams', methods=['POST'])
 @jwt_required
-def create_exam(current_user, pdf_id):
-    from ..models import PDF, Exam
+def create_exam(current_user, lecture_id):
+    from ..models import Lecture, Exam
     data = request.get_json()
     title = data.get('title')
 
     if not title:
         return jsonify({'message': 'Exam title is required'}), 400
 
-    pdf = PDF.query.filter_by(id=pdf_id, user_id=current_user.id).first()
-    if not pdf:
+    lecture = db.session.query(Lecture.id).filter_by(id=lecture_id, user_id=current_user.id).first()
+    if not lecture:
         return jsonify({'message': 'Lecture not found or access denied'}), 404
 
-    new_exam = Exam(title=title, pdf_id=pdf.id)
+    new_exam = Exam(title=title, lecture_id=lecture.id, user_id=current_user.id)
     db.session.add(new_exam)
     db.session.commit()
 
@@ -31,15 +33,16 @@ def create_exam(current_user, pdf_id):
         }
     }), 201
 
-@exams_bp.route('/lectures/<int:pdf_id>/exams', methods=['GET'])
-@jwt_required
-def get_exams(current_user, pdf_id):
-    from ..models import PDF, Exam
-    pdf = PDF.query.filter_by(id=pdf_id, user_id=current_user.id).first()
-    if not pdf:
+@exams_bp.route('/lectures/<int:lecture_id>/exams', methods=['GET'])
+@conditional
+@jwt_required(load_user=False)
+def get_exams(current_user, lecture_id):
+    from ..models import Lecture, Exam
+    lecture = db.session.query(Lecture.id).filter_by(id=lecture_id, user_id=current_user.id).first()
+    if not lecture:
         return jsonify({'message': 'Lecture not found or access denied'}), 404
 
-    exams = Exam.query.filter_by(pdf_id=pdf.id).order_by(Exam.created_at.desc()).all()
+    exams = Exam.query.filter_by(lecture_id=lecture.id).order_by(Exam.created_at.desc()).all()
     
     exams_data = [
         {
@@ -53,18 +56,18 @@ def get_exams(current_user, pdf_id):
     return jsonify(exams_data), 200
 
 @exams_bp.route('/exams/<int:exam_id>', methods=['GET'])
-@jwt_required
+@conditional
+@jwt_required(load_user=False)
 def get_exam_details(current_user, exam_id):
-    from ..models import Exam
-    exam = Exam.query.get(exam_id)
-    if not exam or exam.pdf.user_id != current_user.id:
+    exam = get_owned_exam(exam_id, current_user.id)
+    if not exam:
         return jsonify({'message': 'Exam not found or access denied'}), 404
 
     exam_data = {
         'id': exam.id,
         'title': exam.title,
         'created_at': exam.created_at.isoformat(),
-        'pdf_id': exam.pdf_id
+        'lecture_id': exam.lecture_id
     }
 
     return jsonify(exam_data), 200
@@ -72,6 +75,7 @@ def get_exam_details(current_user, exam_id):
 @exams_bp.route('/exams/<int:exam_id>/questions', methods=['POST'])
 @jwt_required
 def add_question_to_exam(current_user, exam_id):
+    from ..services.question_store import answer_index, append_question
     data = request.get_json()
     question_text = data.get('question_text')
     options = data.get('options')
@@ -80,17 +84,15 @@ def add_question_to_exam(current_user, exam_id):
     if not all([question_text, options, correct_answer]):
         return jsonify({'message': 'Missing data for question'}), 400
 
-    exam = Exam.query.get(exam_id)
-    if not exam or exam.pdf.user_id != current_user.id:
+    try:
+        correct_index = answer_index(options, correct_answer)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    if not user_owns_exam(exam_id, current_user.id):
         return jsonify({'message': 'Exam not found or access denied'}), 404
 
-    new_question = Question(
-        question_text=question_text,
-        options=options,
-        correct_answer=correct_answer,
-        exam_id=exam.id
-    )
-    db.session.add(new_question)
+    new_question = append_question(exam_id, question_text, options, correct_index)
     db.session.commit()
 
     return jsonify({
@@ -102,22 +104,94 @@ def add_question_to_exam(current_user, exam_id):
     }), 201
 
 @exams_bp.route('/exams/<int:exam_id>/questions', methods=['GET'])
-@jwt_required
+@conditional
+@jwt_required(load_user=False)
 def get_exam_questions(current_user, exam_id):
-    exam = Exam.query.get(exam_id)
-    if not exam or exam.pdf.user_id != current_user.id:
+    from ..services.question_store import DEFAULT_PAGE_SIZE, serialize_question
+    try:
+        after = request.args.get('after', type=int)
+        limit = max(1, min(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), 500))
+    except ValueError:
+        return jsonify({'message': 'limit must be an integer'}), 400
+
+    questions = get_owned_exam_questions(exam_id, current_user.id, after_position=after, limit=limit + 1)
+    if questions is None:
         return jsonify({'message': 'Exam not found or access denied'}), 404
 
-    questions = Question.query.filter_by(exam_id=exam.id).all()
-    
-    questions_data = [
-        {
-            'id': q.id,
-            'question_text': q.question_text,
-            'options': q.options,
-            'correct_answer': q.correct_answer
-        }
-        for q in questions
-    ]
+    next_position = None
+    if len(questions) > limit:
+        questions = questions[:limit]
+        next_position = questions[-1].position
+
+    response = jsonify([serialize_question(q) for q in questions])
+    if next_position is not None:
+        # Pass as ?after= to fetch the next page
+        response.headers['X-Next-Position'] = str(next_position)
+    return response, 200
+
+@exams_bp.route('/exams/<int:exam_id>/grade-all', methods=['POST'])
+@jwt_required
+def grade_all_attempts(current_user, exam_id):
+    from ..services.grading import grade_exam
+
+    exam = get_owned_exam(exam_id, current_user.id)
+    if not exam:
+        return jsonify({'message': 'Exam not found or access denied'}), 404
+
+    summary = grade_exam(exam)
+    return jsonify({'message': f"{summary['graded']} attempts graded", **summary}), 200
+
+@exams_bp.route('/exams/<int:exam_id>/attempts', methods=['POST'])
+@jwt_required
+def submit_attempt(current_user, exam_id):
+    import json
+    from datetime import datetime
+    from ..models import ExamAttempt
+    from ..services.grading import AnswerKey, score_answers
+    from ..services.exam_analytics import record_attempt
+
+    data = request.get_json()
+    answers = data.get('answers')
+    if answers is None:
+        return jsonify({'message': 'Answers are required'}), 400
+
+    exam = get_owned_exam(exam_id, current_user.id)
+    if not exam:
+        return jsonify({'message': 'Exam not found or access denied'}), 404
+
+    key = AnswerKey.from_exam(exam)
+    try:
+        key.validate_answers(answers)
+        started_at = datetime.fromisoformat(data['started_at']) if data.get('started_at') else None
+    except (TypeError, ValueError) as e:
+        return jsonify({'message': str(e)}), 400
+
+    raw_answers = json.dumps(answers)
+    answer_row = key.decode_answers(raw_answers)
+    score = float(score_answers(key, answer_row.reshape(1, -1))[0])
+
+    attempt = ExamAttempt(
+        exam_id=exam.id,
+        user_id=current_user.id,
+        answers=raw_answers,
+        score=score,
+        completed_at=datetime.utcnow()
+    )
+    if started_at:
+        attempt.started_at = started_at
+    db.session.add(attempt)
+    record_attempt(exam.id, key.option_counts, answer_row, score) # Keeps the exam's analytics current
+    db.session.commit()
+
+    return jsonify({'id': attempt.id, 'score': score}), 201
+
+@exams_bp.route('/exams/<int:exam_id>/analytics', methods=['GET'])
+@jwt_required(load_user=False)
+def exam_analytics(current_user, exam_id):
+    from ..services.exam_analytics import get_exam_analytics
+
+    exam = get_owned_exam(exam_id, current_user.id)
+    if not exam:
+        return jsonify({'message': 'Exam not found or access denied'}), 404
 
-    return jsonify(questions_data), 200
+    return jsonify(get_exam_analytics(exam)), 200
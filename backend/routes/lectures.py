@@ -1,68 +1,136 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from ..utils.decorators import jwt_required
-import datetime
+from ..utils.http_cache import conditional
 
 lectures_bp = Blueprint('lectures_bp', __name__, url_prefix='/api')
 
-# Dummy data
-dummy_lectures_data = [
-    {
-        'id': 1,
-        'title': 'Introduction to Quantum Computing',
-        'filename': 'quantum_computing_intro.pdf',
-        'created_at': datetime.datetime.utcnow().isoformat() + 'Z',
-        'size': '2.5 MB',
-        'status': 'completed'
-    },
-    {
-        'id': 2,
-        'title': 'Advanced Neural Networks',
-        'filename': 'ann_deep_dive.pdf',
-        'created_at': (datetime.datetime.utcnow() - datetime.timedelta(days=1)).isoformat() + 'Z',
-        'size': '5.1 MB',
-        'status': 'completed'
-    },
-    {
-        'id': 3,
-        'title': 'The Art of Prompt Engineering',
-        'filename': 'prompt_engineering_guide.pdf',
-        'created_at': (datetime.datetime.utcnow() - datetime.timedelta(days=2)).isoformat() + 'Z',
-        'size': '1.8 MB',
-        'status': 'processing'
+def _format_size(size):
+    if size is None:
+        return None # Uploaded before documents were tracked
+    return f'{size / (1024 * 1024):.1f} MB'
+
+def _owned_lectures_query(user_id):
+    """Lecture rows as the dashboard lists them: size from the document and the latest job's status."""
+    from ..extensions import db
+    from ..models import Document, Lecture, ProcessingJob
+
+    latest_status = db.session.query(ProcessingJob.status).filter(
+        ProcessingJob.lecture_id == Lecture.id
+    ).order_by(ProcessingJob.id.desc()).limit(1).correlate(Lecture).scalar_subquery()
+    return db.session.query(
+        Lecture.id, Lecture.title, Lecture.created_at, Document.size, latest_status.label('status')
+    ).outerjoin(Document, Lecture.document_hash == Document.sha256).filter(Lecture.user_id == user_id)
+
+def _serialize_lecture(row):
+    return {
+        'id': row.id,
+        'title': row.title,
+        'filename': row.title, # Lectures are titled after the uploaded file
+        'created_at': row.created_at,
+        'size': _format_size(row.size),
+        'status': row.status
     }
-]
-
-dummy_chapters_data = {
-    1: [
-        {'id': 1, 'title': 'Chapter 1: The Qubit', 'content': 'Content for the first chapter about qubits.'},
-        {'id': 2, 'title': 'Chapter 2: Superposition and Entanglement', 'content': 'Content for the second chapter about quantum phenomena.'}
-    ],
-    2: [
-        {'id': 3, 'title': 'Chapter 1: Perceptrons', 'content': 'Content for the chapter on perceptrons.'},
-        {'id': 4, 'title': 'Chapter 2: Convolutional Neural Networks', 'content': 'Content for the chapter on CNNs.'}
-    ]
-}
 
 @lectures_bp.route('/lectures', methods=['GET'])
+@conditional
 @jwt_required
 def get_lectures(current_user):
-    # This route now returns a hardcoded list of lectures for frontend development.
-    # The database query has been bypassed.
-    return jsonify(dummy_lectures_data), 200
+    from ..models import Lecture
+    rows = _owned_lectures_query(current_user.id).order_by(Lecture.created_at.desc()).all()
+    return jsonify([_serialize_lecture(row) for row in rows]), 200
 
-@lectures_bp.route('/lectures/<int:pdf_id>', methods=['GET'])
+@lectures_bp.route('/lectures/<int:lecture_id>', methods=['GET'])
+@conditional
 @jwt_required
-def get_lecture(current_user, pdf_id):
-    lecture = next((lec for lec in dummy_lectures_data if lec['id'] == pdf_id), None)
-    if lecture:
-        return jsonify(lecture), 200
+def get_lecture(current_user, lecture_id):
+    from ..models import Lecture
+    row = _owned_lectures_query(current_user.id).filter(Lecture.id == lecture_id).first()
+    if row:
+        return jsonify(_serialize_lecture(row)), 200
     return jsonify({'message': 'Lecture not found'}), 404
 
-@lectures_bp.route('/lectures/<int:pdf_id>/chapters', methods=['GET'])
+@lectures_bp.route('/lectures/<int:lecture_id>/chapters', methods=['GET'])
+@conditional
 @jwt_required
-def get_chapters(current_user, pdf_id):
-    chapters = dummy_chapters_data.get(pdf_id)
-    if chapters:
-        return jsonify(chapters), 200
-    # Return empty list if no chapters are defined for this lecture ID
-    return jsonify([]), 200
+def get_chapters(current_user, lecture_id):
+    from ..extensions import db
+    from ..models import Document, Lecture
+    from ..services.search_index import chapter_id
+
+    row = db.session.query(Lecture.id, Document.chapters).outerjoin(
+        Document, Lecture.document_hash == Document.sha256
+    ).filter(Lecture.id == lecture_id, Lecture.user_id == current_user.id).first()
+    if not row:
+        return jsonify({'message': 'Lecture not found'}), 404
+    # Empty until the lecture's document has been processed
+    return jsonify([
+        {'id': chapter_id(lecture_id, index), 'title': title, 'content': content}
+        for index, (title, content) in enumerate(row.chapters or [])
+    ]), 200
+
+BUNDLE_PARTS = ('lecture', 'chapters', 'exams', 'artifacts')
+
+@lectures_bp.route('/lectures/<int:lecture_id>/bundle', methods=['GET'])
+@conditional
+@jwt_required(load_user=False)
+def get_lecture_bundle(current_user, lecture_id):
+    """
+    Everything the lecture page shows, in one request.
+
+    `?include=` picks parts (default: all of BUNDLE_PARTS) and `?artifact_fields=`
+    picks artifact columns; code bodies are never part of the bundle. The token
+    is checked once, and the owned lecture (with its chapters), its exams and
+    the first artifact page are one query each.
+    """
+    from ..extensions import db
+    from ..models import Document, Exam, Lecture
+    from ..services.search_index import chapter_id
+    from .artifacts import list_artifact_page, parse_artifact_fields
+
+    include = BUNDLE_PARTS
+    if request.args.get('include'):
+        include = [part.strip() for part in request.args['include'].split(',') if part.strip()]
+        unknown = [part for part in include if part not in BUNDLE_PARTS]
+        if unknown:
+            return jsonify({'message': f"Unknown parts: {', '.join(unknown)}"}), 400
+
+    # Chapters live in the shared document and are only joined in when asked for
+    query = db.session.query(Lecture.id, Lecture.title, Lecture.created_at).filter(
+        Lecture.id == lecture_id, Lecture.user_id == current_user.id
+    )
+    if 'chapters' in include:
+        query = query.outerjoin(Document, Lecture.document_hash == Document.sha256).add_columns(Document.chapters)
+    lecture = query.first()
+    if not lecture:
+        return jsonify({'message': 'Lecture not found or access denied'}), 404
+
+    bundle = {}
+    if 'lecture' in include:
+        bundle['lecture'] = {
+            'id': lecture.id,
+            'title': lecture.title,
+            'filename': lecture.title, # Lectures are titled after the uploaded file
+            'created_at': lecture.created_at
+        }
+    if 'chapters' in include:
+        bundle['chapters'] = [
+            {'id': chapter_id(lecture_id, index), 'title': title, 'content': content}
+            for index, (title, content) in enumerate(lecture.chapters or [])
+        ]
+
+    if 'exams' in include:
+        exams = db.session.query(Exam.id, Exam.title, Exam.created_at).filter(
+            Exam.lecture_id == lecture_id
+        ).order_by(Exam.created_at.desc()).all()
+        bundle['exams'] = [{'id': exam.id, 'title': exam.title, 'created_at': exam.created_at} for exam in exams]
+
+    if 'artifacts' in include:
+        try:
+            fields = parse_artifact_fields(request.args.get('artifact_fields'))
+            bundle['artifacts'], bundle['artifacts_next_cursor'] = list_artifact_page(
+                lecture_id, fields, limit=request.args.get('artifact_limit')
+            )
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+
+    return jsonify(bundle), 200
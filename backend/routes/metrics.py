@@ -0,0 +1,23 @@
+import hmac
+import os
+from flask import Blueprint, Response, jsonify, request
+from ..services.metrics import render_metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Prometheus scrape endpoint. Requires `Authorization: Bearer $METRICS_TOKEN`;
+    without a configured token it is closed unless METRICS_PUBLIC=1.
+    """
+    token = os.environ.get('METRICS_TOKEN')
+    if not token and os.environ.get('METRICS_PUBLIC') != '1':
+        return jsonify({'error': 'Metrics are disabled; set METRICS_TOKEN'}), 404
+    if token:
+        provided = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(provided, token):
+            return jsonify({'error': 'Unauthorized'}), 401
+
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
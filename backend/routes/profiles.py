@@ -0,0 +1,31 @@
+from flask import Blueprint, Response, jsonify, request
+from ..services.profiler import collapsed, get_store, is_profiling_admin, speedscope
+
+profiles_bp = Blueprint('profiles', __name__)
+
+@profiles_bp.before_request
+def require_profiling_admin():
+    # Stacks expose file paths and code structure, so only token holders may read them
+    if not is_profiling_admin(request):
+        return jsonify({'error': 'Not found'}), 404
+
+@profiles_bp.route('/profiles', methods=['GET'])
+def list_profiles():
+    return jsonify({'profiles': get_store().list()})
+
+@profiles_bp.route('/profiles/<profile_id>', methods=['GET'])
+def download_profile(profile_id):
+    """Downloads a profile as collapsed stacks (default) or with `?format=speedscope`."""
+    try:
+        counts = get_store().load(profile_id)
+    except KeyError:
+        return jsonify({'error': 'Profile not found'}), 404
+
+    if request.args.get('format') == 'speedscope':
+        response = jsonify(speedscope(profile_id, counts))
+        filename = f'{profile_id}.speedscope.json'
+    else:
+        response = Response(collapsed(counts), mimetype='text/plain')
+        filename = f'{profile_id}.folded'
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,27 @@
+from flask import Blueprint, request, jsonify
+from ..utils.decorators import login_required
+from ..services.search_index import search_chapters, SearchIndexMissing, SearchUnavailable
+
+search_bp = Blueprint('search_bp', __name__, url_prefix='/api')
+
+@search_bp.route('/search', methods=['GET'])
+@login_required(load_user=False)
+def search(current_user):
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'A search query (q) is required'}), 400
+
+    try:
+        limit = max(1, min(int(request.args.get('limit', 20)), 100))
+        offset = max(0, int(request.args.get('offset', 0)))
+    except ValueError:
+        return jsonify({'error': 'limit and offset must be integers'}), 400
+
+    try:
+        results = search_chapters(current_user.id, query, limit=limit, offset=offset)
+    except SearchIndexMissing as e:
+        return jsonify({'error': str(e)}), 503
+    except SearchUnavailable as e:
+        return jsonify({'error': str(e)}), 501
+
+    return jsonify({'query': query, 'results': results}), 200
@@ -1,62 +1,63 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
+from werkzeug.exceptions import RequestEntityTooLarge
 from ..models import db, Lecture
 from ..utils.decorators import login_required
-import os
-from ..extensions import supabase
+from ..services.pdf_cache import pdf_cache
+from ..services.storage import get_storage
 from werkzeug.utils import secure_filename
-import time
-from supabase.lib.client_options import ClientOptions
 
-bp = Blueprint('upload', __name__, url_prefix='/api/upload')
+upload_bp = Blueprint('upload', __name__)
 
-@bp.route('', methods=['POST'])
+@upload_bp.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    limit_mb = (request.max_content_length or 0) // (1024 * 1024)
+    return jsonify({'error': f'File is too large (limit {limit_mb} MB)'}), 413
+
+@upload_bp.route('/upload', methods=['POST'])
 @login_required
 def upload_file(current_user):
+    # Parsing streams the file part into a HashingSpool (see utils/uploads.py):
+    # at most UPLOAD_SPOOL_THRESHOLD bytes stay in memory and MAX_CONTENT_LENGTH
+    # is enforced while reading, before the whole body has arrived.
     if 'file' not in request.files:
         return jsonify({'error': 'No file part'}), 400
-    
+
     file = request.files['file']
     if file.filename == '':
         return jsonify({'error': 'No selected file'}), 400
 
     if file and file.filename.endswith('.pdf'):
+        spool = file.stream
         try:
+            from ..services.documents import acquire_document
             filename = secure_filename(file.filename)
-            # Create a unique path for the file to prevent overwrites
-            file_path_in_bucket = f"{current_user.id}/{int(time.time())}-{filename}"
-            
-            bucket_name = os.environ.get("SUPABASE_BUCKET_NAME")
-            if not bucket_name:
-                 return jsonify({'error': 'Supabase bucket name not configured'}), 500
 
-            # --- UPDATED SECTION ---
-            # Check if the bucket exists. If not, create it.
-            # The new way to make a bucket public is with FileOptions.
-            try:
-                supabase.storage.get_bucket(bucket_name)
-            except Exception:
-                # If get_bucket fails, it likely doesn't exist. Let's create it.
-                supabase.storage.create_bucket(
-                    name=bucket_name,
-                    options=ClientOptions(public=True) # Correct way to make a bucket public
-                )
-            # --- END UPDATED SECTION ---
+            # One pooled client per worker; the bucket is checked on its first upload only
+            storage = get_storage()
 
-            # Upload to Supabase Storage
-            file_content = file.read()
-            file.seek(0) # Reset file pointer after reading
+            def store(path):
+                # A spooled file is passed by path so the client streams it from
+                # disk in chunks instead of loading it. Upsert, because a concurrent
+                # upload of the same bytes may have written the same object.
+                storage.put_object(path, spool.path if spool.path else spool.getvalue(), upsert=True)
 
-            supabase.storage.from_(bucket_name).upload(
-                path=file_path_in_bucket,
-                file=file_content,
-                file_options={"content-type": "application/pdf"}
-            )
+            # Files are stored once per content hash; a PDF already uploaded by
+            # anyone is only referenced, and its extraction and artifacts reused.
+            document, _ = acquire_document(spool.sha256, spool.size, store)
+
+            # Processing usually follows an upload, so seed the local cache with
+            # the bytes at hand instead of downloading them back
+            try:
+                pdf_cache.put(document.file_path, spool.path if spool.path else spool.getvalue())
+            except OSError as e:
+                current_app.logger.warning('Could not pre-warm the PDF cache: %s', e)
 
             # Create a new lecture record in the database
             new_lecture = Lecture(
                 user_id=current_user.id,
                 title=filename,
-                file_path=file_path_in_bucket
+                file_path=document.file_path,
+                document_hash=document.sha256
             )
             db.session.add(new_lecture)
             db.session.commit()
@@ -64,10 +65,15 @@ def upload_file(current_user):
             return jsonify({
                 'id': new_lecture.id,
                 'title': new_lecture.title,
-                'file_path': new_lecture.file_path
+                'file_path': new_lecture.file_path,
+                'size': spool.size,
+                'sha256': spool.sha256
             }), 201
 
         except Exception as e:
+            db.session.rollback() # Also undoes the reference taken on the document
             return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+        finally:
+            spool.close() # Removes the spool file, if there is one
 
     return jsonify({'error': 'Invalid file type, only PDF is allowed'}), 400
@@ -1,13 +1,19 @@
 import json
+import logging
 import re
-import anthropic
-from jinja2 import Template
+from typing import Optional
+from .metrics import record_failure
+
+logger = logging.getLogger(__name__)
 
 class AIArtifactGenerator:
     """Generate interactive educational artifacts using AI"""
 
     def __init__(self, anthropic_api_key: str = None):
-        self.anthropic_client = anthropic.Anthropic(api_key=anthropic_api_key) if anthropic_api_key else None
+        self.anthropic_client = None
+        if anthropic_api_key:
+            import anthropic # Only needed when a key is configured
+            self.anthropic_client = anthropic.Anthropic(api_key=anthropic_api_key)
         self.system_prompt = """
         You are an expert in creating educational tools. Your task is to generate a single, self-contained React component file based on the provided text. Follow these rules precisely:
 
@@ -20,8 +26,13 @@ class AIArtifactGenerator:
         7.  **Output**: Return ONLY the raw React component code, inside a single ```jsx block. Do not include any explanation or extra text outside the code block.
         """
 
-    def generate_study_guide(self, content: str, title: str) -> str:
-        """Generate interactive React study guide component"""
+    def generate_study_guide(self, content: str, title: str, fallback: bool = True) -> Optional[str]:
+        """
+        Generate interactive React study guide component
+
+        Without an LLM, or if the call fails, returns a template-based demo
+        component, or None when `fallback` is off.
+        """
         prompt = f"Create a comprehensive, interactive study guide from the following text. The guide should include sections, key terms, and summaries. The component name should be {self._sanitize_component_name(title)}StudyGuide. Text: {content}"
         try:
             if self.anthropic_client:
@@ -32,13 +43,14 @@ class AIArtifactGenerator:
                     messages=[{"role": "user", "content": prompt}]
                 ).content[0].text
                 return self._extract_react_code(response)
-            return self._generate_fallback_study_guide(title, content)
+            return self._generate_fallback_study_guide(title, content) if fallback else None
         except Exception as e:
-            print(f"Error generating study guide: {e}")
-            return self._generate_fallback_study_guide(title, content)
+            logger.warning('Study guide generation failed: %s', e)
+            record_failure('generate_study_guide')
+            return self._generate_fallback_study_guide(title, content) if fallback else None
 
-    def generate_quiz(self, content: str, title: str, num_questions: int = 5) -> str:
-        """Generate interactive quiz component"""
+    def generate_quiz(self, content: str, title: str, num_questions: int = 5, fallback: bool = True) -> Optional[str]:
+        """Generate interactive quiz component; see `generate_study_guide` for `fallback`"""
         prompt = f"Create an interactive multiple-choice quiz with {num_questions} questions from the following text. Include questions, options, and a way to check answers. The component name should be {self._sanitize_component_name(title)}Quiz. Text: {content}"
         try:
             if self.anthropic_client:
@@ -49,10 +61,17 @@ class AIArtifactGenerator:
                     messages=[{"role": "user", "content": prompt}]
                 ).content[0].text
                 return self._extract_react_code(response)
-            return self._generate_fallback_quiz(title)
+            return self._generate_fallback_quiz(title) if fallback else None
         except Exception as e:
-            print(f"Error generating quiz: {e}")
+            logger.warning('Quiz generation failed: %s', e)
+            record_failure('generate_quiz')
+            return self._generate_fallback_quiz(title) if fallback else None
+
+    def generate_fallback(self, artifact_type: str, content: str, title: str) -> str:
+        """Returns the template-based demo component used when no LLM output is available"""
+        if artifact_type == 'quiz':
             return self._generate_fallback_quiz(title)
+        return self._generate_fallback_study_guide(title, content)
 
     def _generate_fallback_study_guide(self, title: str, content: str) -> str:
         """Generate a basic study guide component for demo using Jinja2"""
@@ -158,6 +177,7 @@ export default function {{ component_name }}StudyGuide() {
   );
 }
 """
+        from jinja2 import Template
         template = Template(template_str)
         return template.render(component_name=component_name, title=title, content=safe_content)
 
@@ -301,6 +321,7 @@ export default function {{ component_name }}Quiz() {
   );
 }
 """
+        from jinja2 import Template
         template = Template(template_str)
         return template.render(component_name=component_name, title=title)
 
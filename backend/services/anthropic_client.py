@@ -1,5 +1,4 @@
 import os
-import anthropic
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,4 +9,5 @@ def get_anthropic_client():
     if not api_key:
         print("Warning: ANTHROPIC_API_KEY not found in .env file. AI features will be disabled.")
         return None
+    import anthropic # Imported on first use; the SDK is slow to import
     return anthropic.Anthropic(api_key=api_key)
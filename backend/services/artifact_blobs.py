@@ -0,0 +1,161 @@
+"""
+Content-addressed, compressed storage for artifact bodies
+"""
+
+import hashlib
+import zlib
+from collections import Counter
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from ..extensions import db
+from ..utils.compression import precompress
+
+# zlib only looks back 32 KB, so a larger preset dictionary would be wasted.
+MAX_DICTIONARY_SIZE = 32 * 1024
+COMPRESSION_LEVEL = 9
+
+# Dictionaries never change once written, so they are cached for the process lifetime.
+_dictionary_cache = {}
+
+def content_hash(text: str) -> str:
+    """Returns the SHA-256 hex digest used as the blob's address."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def train_dictionary(samples: Iterable[str]) -> bytes:
+    """
+    Builds a zlib preset dictionary from sample artifact bodies.
+
+    Lines that recur across several samples (imports, inline SVG icons, Tailwind
+    class strings) are kept. The most common lines are placed last because zlib
+    encodes nearby matches more cheaply.
+    """
+    counts = Counter()
+    for sample in samples:
+        counts.update(set(line for line in sample.splitlines() if line.strip()))
+
+    dictionary = b''
+    for line, count in sorted(counts.items(), key=lambda item: (item[1], len(item[0]))):
+        if count < 2:
+            continue
+        encoded = (line + '\n').encode('utf-8')
+        if len(dictionary) + len(encoded) > MAX_DICTIONARY_SIZE:
+            # Drop the least common lines first to make room for more common ones.
+            dictionary = dictionary[len(dictionary) + len(encoded) - MAX_DICTIONARY_SIZE:]
+        dictionary += encoded
+    return dictionary
+
+def get_dictionary(dictionary_id: int) -> bytes:
+    """Loads a stored compression dictionary by id, raising KeyError if it does not exist."""
+    if dictionary_id not in _dictionary_cache:
+        from ..models import ArtifactDictionary
+        dictionary = db.session.get(ArtifactDictionary, dictionary_id)
+        if dictionary is None:
+            raise KeyError(dictionary_id)
+        _dictionary_cache[dictionary_id] = dictionary.data
+    return _dictionary_cache[dictionary_id]
+
+def current_dictionary_id() -> Optional[int]:
+    """Returns the newest dictionary id, or None if no dictionary has been trained yet."""
+    from ..models import ArtifactDictionary
+    return db.session.query(db.func.max(ArtifactDictionary.id)).scalar()
+
+def compress(text: str, dictionary_id: Optional[int] = None) -> bytes:
+    """Compresses a body into a zlib stream, primed with the given dictionary."""
+    if dictionary_id is None:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL)
+    else:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zdict=get_dictionary(dictionary_id))
+    return compressor.compress(text.encode('utf-8')) + compressor.flush()
+
+def decompress(data: bytes, dictionary_id: Optional[int] = None) -> str:
+    """Inverse of `compress`."""
+    if dictionary_id is None:
+        decompressor = zlib.decompressobj()
+    else:
+        decompressor = zlib.decompressobj(zdict=get_dictionary(dictionary_id))
+    return (decompressor.decompress(data) + decompressor.flush()).decode('utf-8')
+
+def content_encoding(blob) -> str:
+    """
+    Returns the HTTP content-coding of a blob's stored bytes.
+
+    Blobs compressed without a dictionary are plain zlib streams, which is what
+    HTTP calls `deflate`. Dictionary-compressed blobs use a private coding that
+    names the dictionary, so a client that has fetched it can decode them.
+    """
+    if blob.dictionary_id is None:
+        return 'deflate'
+    return f'x-zdict-{blob.dictionary_id}'
+
+def put_blob(text: str):
+    """
+    Stores a body and returns its blob, reusing an existing blob with the same hash.
+
+    The caller is responsible for committing the session.
+    """
+    from ..models import ArtifactBlob
+
+    digest = content_hash(text)
+    blob = db.session.get(ArtifactBlob, digest)
+    if blob is None:
+        dictionary_id = current_dictionary_id()
+        blob = ArtifactBlob(
+            hash=digest,
+            dictionary_id=dictionary_id,
+            data=compress(text, dictionary_id),
+            size=len(text.encode('utf-8'))
+        )
+        add_http_encodings(blob, text)
+        db.session.add(blob)
+    return blob
+
+def add_http_encodings(blob, text: str):
+    """Stores gzip (and, if available, brotli) encodings of a blob's body for serving."""
+    encoded = precompress(text.encode('utf-8'))
+    blob.gzip_data = encoded['gzip']
+    blob.br_data = encoded.get('br')
+
+def stored_encodings(row) -> list:
+    """
+    Content-codings a blob can be served in without compressing at request
+    time, most compact first.
+
+    Takes a row with `has_br`, `has_gzip` and `dictionary_id` columns, so the
+    choice can be made before any blob bytes are loaded.
+    """
+    encodings = []
+    if row.has_br:
+        encodings.append('br')
+    if row.has_gzip:
+        encodings.append('gzip')
+    encodings.append(content_encoding(row))
+    return encodings
+
+@lru_cache(maxsize=256)
+def json_encoded_body(blob_hash: str) -> bytes:
+    """
+    Returns a blob's body encoded as a JSON string, raising KeyError if the blob does not exist.
+
+    Blobs never change, so the escaped form is cached per hash and responses
+    splice it in with `raw_json` instead of decompressing and escaping the
+    JSX again on every request.
+    """
+    from sqlalchemy.orm import undefer
+    from ..models import ArtifactBlob
+    from ..utils.json_provider import encode
+
+    blob = db.session.get(ArtifactBlob, blob_hash, options=[undefer(ArtifactBlob.data)])
+    if blob is None:
+        raise KeyError(blob_hash)
+    return encode(blob.text)
+
+def delete_unreferenced_blobs() -> int:
+    """Deletes blobs no artifact or shared document artifact points at any more. Returns the number deleted."""
+    from ..models import Artifact, ArtifactBlob, DocumentArtifact
+
+    referenced = db.session.query(Artifact.id).filter(Artifact.blob_hash == ArtifactBlob.hash)
+    shared = db.session.query(DocumentArtifact.blob_hash).filter(DocumentArtifact.blob_hash == ArtifactBlob.hash)
+    deleted = ArtifactBlob.query.filter(~referenced.exists(), ~shared.exists()).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
@@ -0,0 +1,177 @@
+"""
+Content-addressed PDF storage shared across users
+"""
+
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy.exc import IntegrityError
+from ..extensions import db
+
+STORAGE_PREFIX = 'documents'
+
+# How often an upload re-checks a document that `gc-documents` is deleting,
+# and how long it waits in between
+ACQUIRE_ATTEMPTS = 50
+COLLECTING_WAIT = 0.1
+
+def storage_path(sha256: str) -> str:
+    """Returns the storage path of a document; the same bytes always land on the same object."""
+    return f'{STORAGE_PREFIX}/{sha256}.pdf'
+
+def acquire_document(sha256: str, size: int, upload: Callable[[str], None]):
+    """
+    Returns the document for an upload's content hash and takes a reference on it.
+
+    `upload(path)` is only called when no earlier upload stored the same
+    bytes, so a PDF every student in a class uploads is stored once.
+
+    Returns:
+        tuple: (document, created) where `created` is False for a duplicate.
+
+    The caller is responsible for committing the session.
+    """
+    from ..models import Document
+
+    created = False
+    for _ in range(ACQUIRE_ATTEMPTS):
+        ref_count = db.session.query(Document.ref_count).filter_by(sha256=sha256).scalar()
+        if ref_count is not None and ref_count < 0:
+            # `gc-documents` is deleting it and its object may already be gone;
+            # wait for the row to disappear, then store the bytes again
+            time.sleep(COLLECTING_WAIT)
+            continue
+
+        if ref_count is None:
+            path = storage_path(sha256)
+            upload(path)
+            try:
+                with db.session.begin_nested():
+                    db.session.add(Document(sha256=sha256, file_path=path, size=size, ref_count=0))
+                created = True
+            except IntegrityError:
+                pass # A concurrent upload of the same file won; its object has the same bytes
+
+        # Counted in SQL so concurrent uploads cannot lose an increment. A
+        # document claimed by `gc-documents` since the read above is not taken.
+        taken = Document.query.filter(Document.sha256 == sha256, Document.ref_count >= 0).update(
+            {Document.ref_count: Document.ref_count + 1}, synchronize_session=False
+        )
+        if taken:
+            document = db.session.get(Document, sha256)
+            db.session.refresh(document, ['ref_count'])
+            return document, created
+    raise RuntimeError(f'Document {sha256} was removed while being uploaded')
+
+def _release_document(mapper, connection, lecture):
+    # Runs in the deleting transaction, so the count and the lecture row change together
+    if lecture.document_hash is not None:
+        from ..models import Document
+        table = Document.__table__
+        connection.execute(
+            table.update().where(table.c.sha256 == lecture.document_hash).values(ref_count=table.c.ref_count - 1)
+        )
+
+def init_document_refcounts():
+    """Drops a lecture's reference on its document whenever the lecture is deleted."""
+    from sqlalchemy import event
+    from ..models import Lecture
+
+    if not event.contains(Lecture, 'after_delete', _release_document):
+        event.listen(Lecture, 'after_delete', _release_document)
+
+def get_extraction(sha256: str) -> Optional[Tuple[str, Dict, List[Tuple[str, str]]]]:
+    """Returns a document's stored (text, analysis, chapters), or None if it has not been extracted yet."""
+    from sqlalchemy.orm import undefer
+    from ..models import Document
+
+    document = db.session.get(Document, sha256, options=[undefer(Document.text_content), undefer(Document.chapters)])
+    if document is None or document.text_content is None:
+        return None
+    return document.text_content, document.analysis, [tuple(chapter) for chapter in document.chapters or []]
+
+def save_extraction(sha256: str, text_content: str, analysis: Dict, chapters: List[Tuple[str, str]]):
+    """
+    Stores a document's extraction for every other lecture made from it.
+
+    The caller is responsible for committing the session.
+    """
+    from ..models import Document
+
+    Document.query.filter_by(sha256=sha256).update({
+        Document.text_content: text_content,
+        Document.analysis: analysis,
+        Document.chapters: [list(chapter) for chapter in chapters],
+    }, synchronize_session=False)
+
+def get_shared_artifact(sha256: str, artifact_type: str, title: str) -> Optional[str]:
+    """
+    Returns a document's stored artifact body of the given type, or None if none has been generated yet.
+
+    Generated bodies name the lecture they were made for, so they are keyed by
+    `title` as well and one user's file name never shows up in another's artifact.
+    """
+    from ..models import DocumentArtifact
+
+    shared = db.session.get(DocumentArtifact, (sha256, artifact_type, title))
+    return shared.blob.text if shared is not None else None
+
+def store_shared_artifact(sha256: str, artifact_type: str, title: str, body: str, replace: bool = False):
+    """
+    Stores a generated body for every later lecture made from the document, and commits.
+
+    Meant to run after generation, so the write transaction only lasts for
+    the insert. Bodies go through the blob store, so each lecture's own
+    Artifact row can point at the same blob. With `replace`, an existing
+    body is overwritten; otherwise the first one stored is kept.
+    """
+    from ..models import DocumentArtifact
+    from .artifact_blobs import put_blob
+
+    try:
+        with db.session.begin_nested():
+            shared = db.session.get(DocumentArtifact, (sha256, artifact_type, title))
+            if shared is None:
+                db.session.add(DocumentArtifact(
+                    document_hash=sha256, artifact_type=artifact_type, title=title, blob=put_blob(body)
+                ))
+            elif replace:
+                shared.blob = put_blob(body)
+    except IntegrityError:
+        pass # Generated concurrently for another lecture; either body will do
+    db.session.commit()
+
+def delete_unreferenced_documents(storage) -> int:
+    """
+    Deletes documents no lecture points at any more, with their stored PDFs
+    and shared artifacts. Returns the number deleted. Search index rows left
+    by lectures deleted without the ORM are removed as well.
+
+    Each document is first claimed by setting its ref_count to -1 in a
+    committed, re-checked UPDATE. `acquire_document` neither references nor
+    re-creates a claimed document, so an upload of the same bytes racing the
+    deletion cannot end up pointing at the removed object; it waits for the
+    row to go and stores the PDF again.
+    """
+    from ..models import Document, DocumentArtifact
+
+    deleted = 0
+    for sha256, file_path in db.session.query(Document.sha256, Document.file_path).filter(Document.ref_count <= 0).all():
+        # Re-checked in the UPDATE so a document re-acquired since the scan is kept
+        claimed = Document.query.filter(Document.sha256 == sha256, Document.ref_count <= 0).update(
+            {Document.ref_count: -1}, synchronize_session=False
+        )
+        db.session.commit()
+        if not claimed:
+            continue
+
+        # A failure here leaves the claim in place, and the next run retries
+        storage.delete_file(file_path)
+        DocumentArtifact.query.filter_by(document_hash=sha256).delete(synchronize_session=False)
+        Document.query.filter_by(sha256=sha256).delete(synchronize_session=False)
+        db.session.commit()
+        deleted += 1
+
+    from .search_index import delete_orphaned_chapters
+    delete_orphaned_chapters()
+    db.session.commit()
+    return deleted
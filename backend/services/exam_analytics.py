@@ -0,0 +1,218 @@
+"""
+Incrementally maintained exam analytics
+"""
+
+import math
+from typing import Dict, List
+
+import numpy as np
+
+from ..extensions import db
+
+HISTOGRAM_BUCKETS = 10
+
+def score_bucket(scores):
+    """Maps percentage scores to histogram buckets, with 100 falling into the top bucket."""
+    return np.minimum((np.asarray(scores) // (100 / HISTOGRAM_BUCKETS)).astype(np.int64), HISTOGRAM_BUCKETS - 1)
+
+def _insert(table):
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+def _upsert_add(model, rows: List[Dict], add_columns):
+    """
+    Inserts rows, or adds their values onto existing rows with the same primary key.
+
+    The addition happens in the database, so concurrent workers recording
+    attempts for the same exam never lose an update.
+    """
+    if not rows:
+        return
+    table = model.__table__
+    statement = _insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[column.name for column in table.primary_key.columns],
+        set_={column: table.c[column] + statement.excluded[column] for column in add_columns}
+    )
+    db.session.execute(statement, rows)
+
+class AnalyticsAccumulator:
+    """Collects aggregates for a set of graded attempts in memory before writing them."""
+
+    def __init__(self, option_counts: List[int]):
+        """
+        Args:
+            option_counts: Number of options of each question, e.g. `AnswerKey.option_counts`.
+        """
+        self.attempt_count = 0
+        self.score_sum = 0.0
+        self.score_sum_sq = 0.0
+        self.buckets = np.zeros(HISTOGRAM_BUCKETS, dtype=np.int64)
+        self.option_limits = np.asarray(option_counts, dtype=np.int64)
+        # Column 0 counts unanswered questions, column k + 1 counts option k.
+        width = int(self.option_limits.max()) + 1 if len(self.option_limits) else 1
+        self.option_counts = np.zeros((len(self.option_limits), width), dtype=np.int64)
+
+    def add(self, answers: np.ndarray, scores: np.ndarray):
+        """
+        Adds a batch of graded attempts.
+
+        Args:
+            answers: (attempts x questions) matrix of chosen option indices, -1 if unanswered.
+                     Indices outside a question's options are counted as unanswered.
+            scores: Percentage score of each attempt.
+        """
+        self.attempt_count += len(scores)
+        self.score_sum += float(np.sum(scores))
+        self.score_sum_sq += float(np.sum(np.square(scores)))
+        self.buckets += np.bincount(score_bucket(scores), minlength=HISTOGRAM_BUCKETS)
+
+        if answers.size:
+            answers = answers.astype(np.int64)
+            valid = (answers >= 0) & (answers < self.option_limits)
+            shifted = np.where(valid, answers + 1, 0)
+            question_numbers = np.broadcast_to(np.arange(answers.shape[1]), answers.shape)
+            np.add.at(self.option_counts, (question_numbers.ravel(), shifted.ravel()), 1)
+
+    def write(self, exam_id):
+        """Adds the accumulated totals onto the exam's stored analytics."""
+        from ..models import ExamAnalytics, ExamScoreBucket, QuestionOptionCount
+
+        if not self.attempt_count:
+            return
+        _upsert_add(ExamAnalytics, [{
+            'exam_id': exam_id,
+            'attempt_count': self.attempt_count,
+            'score_sum': self.score_sum,
+            'score_sum_sq': self.score_sum_sq
+        }], ['attempt_count', 'score_sum', 'score_sum_sq'])
+        _upsert_add(ExamScoreBucket, [
+            {'exam_id': exam_id, 'bucket': bucket, 'count': int(count)}
+            for bucket, count in enumerate(self.buckets) if count
+        ], ['count'])
+        questions, options = np.nonzero(self.option_counts)
+        _upsert_add(QuestionOptionCount, [
+            {
+                'exam_id': exam_id,
+                'question_index': int(question),
+                'option_index': int(option) - 1,
+                'count': int(self.option_counts[question, option])
+            }
+            for question, option in zip(questions, options)
+        ], ['count'])
+
+def record_attempt(exam_id, option_counts: List[int], answers: np.ndarray, score: float):
+    """
+    Adds one completed attempt to the exam's analytics.
+
+    The caller is responsible for committing the session, in the same
+    transaction that stores the attempt.
+    """
+    accumulator = AnalyticsAccumulator(option_counts)
+    accumulator.add(answers.reshape(1, -1), np.array([score]))
+    accumulator.write(exam_id)
+
+def _lock_exam_analytics(exam_id):
+    """
+    Locks the exam's totals row until the session commits.
+
+    Adding zero is a no-op for the totals, but like every `record_attempt`
+    it writes the row, so concurrent submissions wait here instead of
+    adding onto totals that are about to be replaced.
+    """
+    from ..models import ExamAnalytics
+    _upsert_add(ExamAnalytics, [{'exam_id': exam_id, 'attempt_count': 0, 'score_sum': 0.0, 'score_sum_sq': 0.0}],
+                ['attempt_count', 'score_sum', 'score_sum_sq'])
+
+def reset_exam_analytics(exam_id):
+    """Deletes an exam's analytics so they can be recomputed from scratch."""
+    from ..models import ExamAnalytics, ExamScoreBucket, QuestionOptionCount
+
+    for model in (ExamAnalytics, ExamScoreBucket, QuestionOptionCount):
+        model.query.filter_by(exam_id=exam_id).delete(synchronize_session=False)
+
+def _add_attempts(accumulator, exam, key, batch_size, **attempt_range) -> AnalyticsAccumulator:
+    from .grading import iter_attempt_batches, score_answers
+
+    for rows, answers in iter_attempt_batches(exam, key, batch_size, completed_only=True, **attempt_range):
+        accumulator.add(answers, score_answers(key, answers))
+    return accumulator
+
+def rebuild_exam_analytics(exam, batch_size: int = 5000) -> int:
+    """
+    Recomputes an exam's analytics from all of its completed attempts.
+
+    The attempts are scanned first, with no write transaction open, so
+    submissions are not held up by a large exam. The stored analytics are
+    then replaced in one short transaction that locks the exam's totals and
+    only scans what changed meanwhile: attempts submitted during the scan,
+    and the whole range again in the rare case an older attempt was
+    completed under it. Every attempt is counted exactly once; later
+    submissions wait on the lock and add onto the rebuilt totals.
+
+    Returns:
+        int: The number of attempts counted.
+    """
+    from ..models import ExamAttempt
+    from .grading import AnswerKey
+
+    key = AnswerKey.from_exam(exam)
+    exam_id = exam.id
+    db.session.commit() # Nothing stays locked across the scan
+    scanned_through = db.session.query(db.func.max(ExamAttempt.id)).filter_by(exam_id=exam_id).scalar() or 0
+    accumulator = _add_attempts(AnalyticsAccumulator(key.option_counts), exam, key, batch_size,
+                                through_id=scanned_through)
+
+    _lock_exam_analytics(exam_id)
+    completed = db.session.query(db.func.count(ExamAttempt.id)).filter(
+        ExamAttempt.exam_id == exam_id, ExamAttempt.completed_at.isnot(None), ExamAttempt.id <= scanned_through
+    ).scalar()
+    if completed != accumulator.attempt_count:
+        # An older attempt was completed or committed while it was being scanned
+        accumulator = _add_attempts(AnalyticsAccumulator(key.option_counts), exam, key, batch_size,
+                                    through_id=scanned_through)
+    _add_attempts(accumulator, exam, key, batch_size, after_id=scanned_through) # Submitted during the scan
+
+    reset_exam_analytics(exam_id)
+    accumulator.write(exam_id)
+    db.session.commit()
+    return accumulator.attempt_count
+
+def get_exam_analytics(exam) -> Dict:
+    """
+    Reads an exam's analytics. The cost depends on the number of questions and
+    options, never on the number of attempts.
+    """
+    from ..models import ExamAnalytics, ExamScoreBucket, QuestionOptionCount
+    from .grading import AnswerKey
+
+    totals = db.session.get(ExamAnalytics, exam.id)
+    count = totals.attempt_count if totals else 0
+    mean = totals.score_sum / count if count else None
+    stddev = math.sqrt(max(totals.score_sum_sq / count - mean * mean, 0.0)) if count else None
+
+    histogram = [0] * HISTOGRAM_BUCKETS
+    for bucket in ExamScoreBucket.query.filter_by(exam_id=exam.id):
+        histogram[bucket.bucket] = bucket.count
+
+    key = AnswerKey.from_exam(exam)
+    questions = [{'index': i, 'option_counts': {}, 'difficulty': None} for i in range(len(key))]
+    for row in QuestionOptionCount.query.filter_by(exam_id=exam.id):
+        if row.question_index < len(questions):
+            questions[row.question_index]['option_counts'][str(row.option_index)] = row.count
+    for question in questions:
+        correct_option = int(key.correct[question['index']])
+        correct = question['option_counts'].get(str(correct_option), 0) if correct_option >= 0 else 0
+        question['difficulty'] = correct / count if count else None
+
+    return {
+        'exam_id': exam.id,
+        'attempt_count': count,
+        'mean_score': mean,
+        'stddev_score': stddev,
+        'histogram': histogram,
+        'questions': questions
+    }
@@ -0,0 +1,209 @@
+"""
+Batch grading of exam attempts
+"""
+
+import json
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import bindparam, func
+
+from ..extensions import db
+
+UNANSWERED = -1
+
+class AnswerKey:
+    """
+    An exam's answer key decoded once into arrays.
+
+    Attributes:
+        correct: int16 array with the index of the correct option for each question.
+        option_index: One dict per question mapping option text to its index,
+                      used to decode attempts that stored the chosen text.
+    """
+
+    def __init__(self, questions: List[Dict]):
+        self.option_index = [
+            {str(option): i for i, option in enumerate(question.get('options', []))}
+            for question in questions
+        ]
+        self.correct = np.array([
+            self._option_to_index(i, question.get('correct_answer', question.get('answer')))
+            for i, question in enumerate(questions)
+        ], dtype=np.int16)
+
+    @classmethod
+    def from_exam(cls, exam):
+        """Builds the key from the exam's question rows, falling back to the legacy JSON list."""
+        from ..models import Question
+
+        rows = db.session.query(Question.options, Question.answer_index).filter(
+            Question.exam_id == exam.id
+        ).order_by(Question.position).all()
+        if rows:
+            return cls([{'options': row.options, 'correct_answer': row.answer_index} for row in rows])
+        return cls(json.loads(exam.questions or '[]'))
+
+    def __len__(self):
+        return len(self.correct)
+
+    @property
+    def option_counts(self) -> List[int]:
+        """Number of options of each question."""
+        return [len(options) for options in self.option_index]
+
+    def _option_to_index(self, question_number, value) -> int:
+        """Accepts either an option index or the option text. Anything else is unanswered."""
+        if value is None or question_number >= len(self.option_index):
+            return UNANSWERED
+        if isinstance(value, bool):
+            return UNANSWERED
+        options = self.option_index[question_number]
+        if isinstance(value, str) and value.isdigit() and value not in options:
+            value = int(value)
+        if isinstance(value, int):
+            return value if 0 <= value < len(options) else UNANSWERED
+        return options.get(str(value), UNANSWERED)
+
+    def validate_answers(self, answers):
+        """
+        Checks submitted answers before they are stored.
+
+        Answers are a list in question order or a dict keyed by question index,
+        and each answer is an option index or UNANSWERED.
+
+        Raises:
+            ValueError: If the answers have another shape or an index is out of range.
+        """
+        if isinstance(answers, list):
+            items = enumerate(answers)
+        elif isinstance(answers, dict):
+            items = answers.items()
+        else:
+            raise ValueError('Answers must be a list or an object keyed by question index')
+
+        for key, value in items:
+            try:
+                question_number = int(key)
+            except (TypeError, ValueError):
+                raise ValueError(f'Invalid question index: {key!r}')
+            if not 0 <= question_number < len(self):
+                raise ValueError(f'Question {question_number} does not exist')
+            option_count = len(self.option_index[question_number])
+            if isinstance(value, bool) or not isinstance(value, int) or not UNANSWERED <= value < option_count:
+                raise ValueError(
+                    f'The answer to question {question_number} must be an option index '
+                    f'from 0 to {option_count - 1}, or {UNANSWERED} to leave it unanswered'
+                )
+
+    def decode_answers(self, raw: Optional[str]) -> np.ndarray:
+        """
+        Decodes an attempt's JSON answers into a row of option indices.
+
+        Answers may be a list in question order or a dict keyed by question
+        index, and each answer may be an option index or option text.
+        """
+        row = np.full(len(self), UNANSWERED, dtype=np.int16)
+        if not raw:
+            return row
+        try:
+            answers = json.loads(raw)
+        except (TypeError, ValueError):
+            return row
+
+        items = answers.items() if isinstance(answers, dict) else enumerate(answers)
+        for key, value in items:
+            try:
+                question_number = int(key)
+            except (TypeError, ValueError):
+                continue
+            if 0 <= question_number < len(self):
+                row[question_number] = self._option_to_index(question_number, value)
+        return row
+
+def score_answers(key: AnswerKey, answers: np.ndarray) -> np.ndarray:
+    """Scores an (attempts x questions) answer matrix against the key, as percentages."""
+    if not len(key):
+        return np.zeros(answers.shape[0])
+    correct = (answers == key.correct) & (answers != UNANSWERED)
+    return correct.mean(axis=1) * 100.0
+
+def iter_attempt_batches(exam, key: AnswerKey, batch_size: int, completed_only: bool = False,
+                         after_id: int = 0, through_id: Optional[int] = None):
+    """
+    Yields an exam's attempts in id-ordered batches as (rows, answer matrix).
+
+    Only the id and answers columns are loaded, and batches are fetched by
+    keyset so memory stays bounded however many attempts the exam has.
+    `after_id` and `through_id` limit the scan to a range of attempt ids.
+    """
+    from ..models import ExamAttempt
+
+    last_id = after_id
+    while True:
+        query = db.session.query(ExamAttempt.id, ExamAttempt.answers).filter(
+            ExamAttempt.exam_id == exam.id, ExamAttempt.id > last_id
+        )
+        if through_id is not None:
+            query = query.filter(ExamAttempt.id <= through_id)
+        if completed_only:
+            query = query.filter(ExamAttempt.completed_at.isnot(None))
+        batch = query.order_by(ExamAttempt.id).limit(batch_size).all()
+        if not batch:
+            return
+        last_id = batch[-1].id
+
+        answers = np.vstack([key.decode_answers(row.answers) for row in batch])
+        yield batch, answers
+
+def grade_exam(exam, batch_size: int = 5000, now: Optional[datetime] = None) -> Dict:
+    """
+    Scores every attempt of an exam and writes the results back in bulk.
+
+    Each batch of attempts becomes an (attempts x questions) matrix that is
+    compared against the key in one vectorised operation. Scores are
+    percentages. Attempts that were never submitted get `completed_at` set to
+    `now`. Since that completes attempts behind the analytics' back, they are
+    rebuilt afterwards.
+
+    Returns:
+        dict: Number of attempts graded, the mean score and, per question, the
+              fraction of attempts that answered it correctly (item difficulty).
+    """
+    from ..models import ExamAttempt
+    from .exam_analytics import rebuild_exam_analytics
+
+    key = AnswerKey.from_exam(exam)
+    now = now or datetime.utcnow()
+    table = ExamAttempt.__table__
+    update = table.update().where(table.c.id == bindparam('attempt_id')).values(
+        score=bindparam('new_score'),
+        completed_at=func.coalesce(table.c.completed_at, bindparam('now'))
+    )
+    graded = 0
+    score_sum = 0.0
+    correct_per_question = np.zeros(len(key), dtype=np.int64)
+
+    for batch, answers in iter_attempt_batches(exam, key, batch_size):
+        scores = score_answers(key, answers)
+        if len(key):
+            correct_per_question += ((answers == key.correct) & (answers != UNANSWERED)).sum(axis=0)
+        graded += len(batch)
+        score_sum += float(np.sum(scores))
+
+        db.session.execute(update, [
+            {'attempt_id': row.id, 'new_score': float(score), 'now': now}
+            for row, score in zip(batch, scores)
+        ])
+        db.session.commit()
+
+    # Attempts submitted while grading ran already updated the analytics, so
+    # the totals are rebuilt under the analytics lock rather than from this pass.
+    rebuild_exam_analytics(exam, batch_size)
+
+    return {
+        'graded': graded,
+        'mean_score': score_sum / graded if graded else None,
+        'item_difficulty': (correct_per_question / graded).tolist() if graded else []
+    }
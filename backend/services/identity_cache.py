@@ -0,0 +1,98 @@
+"""
+Per-process cache of authenticated identities
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .metrics import IDENTITY_CACHE_LOOKUPS
+
+class Identity:
+    """
+    The parts of a user that authenticated routes read.
+
+    Cached instead of the `User` row itself, which is bound to the session
+    that loaded it and cannot be shared between requests.
+    """
+    __slots__ = ('id', 'username')
+
+    def __init__(self, id, username=None):
+        self.id = id
+        self.username = username
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.username)
+
+class IdentityCache:
+    """
+    A TTL LRU of identities keyed by (user_id, token issued-at).
+
+    Keying on the issued-at claim means a freshly issued token always gets
+    one database check of its own. Changes to a user evict that user's
+    entries in this process; other worker processes pick the change up when
+    their entries expire after `ttl` seconds.
+    """
+
+    def __init__(self, maxsize=10000, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict() # (user_id, iat) -> (identity, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, user_id, iat):
+        key = (user_id, iat)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                IDENTITY_CACHE_LOOKUPS.labels('hit').inc()
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+        IDENTITY_CACHE_LOOKUPS.labels('miss').inc()
+        return None
+
+    def put(self, user_id, iat, identity):
+        with self._lock:
+            self._entries[(user_id, iat)] = (identity, time.monotonic() + self.ttl)
+            self._entries.move_to_end((user_id, iat))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+identity_cache = IdentityCache(
+    maxsize=int(os.environ.get('IDENTITY_CACHE_SIZE', 10000)),
+    ttl=float(os.environ.get('IDENTITY_CACHE_TTL', 60)),
+)
+
+def _evict_user(mapper, connection, user):
+    identity_cache.invalidate(user.id)
+
+def init_identity_cache():
+    """Evicts a user's cached identities whenever the row is updated or deleted in this process."""
+    from sqlalchemy import event
+    from ..models import User
+
+    if not event.contains(User, 'after_update', _evict_user):
+        event.listen(User, 'after_update', _evict_user)
+        event.listen(User, 'after_delete', _evict_user)
@@ -0,0 +1,169 @@
+"""
+Request, database and pipeline metrics in Prometheus format
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest,
+)
+from sqlalchemy import event
+
+# With PROMETHEUS_MULTIPROC_DIR set (see gunicorn.conf.py) every worker writes
+# its samples to memory-mapped files in that directory and /metrics sums them,
+# so a scrape sees the whole server rather than whichever worker answered it.
+MULTIPROCESS = bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by route.',
+    ['blueprint', 'endpoint', 'method', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'Requests currently being handled.',
+    ['blueprint'], multiprocess_mode='livesum',
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    'db_queries_per_request', 'Database statements executed while handling a request.',
+    ['endpoint'], buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    'db_query_duration_seconds_per_request', 'Time spent in database statements per request.',
+    ['endpoint'], buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+PIPELINE_STAGE_DURATION = Histogram(
+    'pipeline_stage_duration_seconds', 'Duration of PDF and AI pipeline stages.',
+    ['stage'], buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+PIPELINE_STAGE_FAILURES = Counter(
+    'pipeline_stage_failures_total', 'Pipeline stages that failed or fell back.', ['stage'],
+)
+STORAGE_OPERATION_DURATION = Histogram(
+    'storage_operation_duration_seconds', 'Latency of object storage calls.',
+    ['operation'], buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+STORAGE_OPERATION_FAILURES = Counter(
+    'storage_operation_failures_total', 'Object storage calls that raised.', ['operation'],
+)
+PDF_CACHE_LOOKUPS = Counter(
+    'pdf_cache_lookups_total', 'Local PDF cache lookups by result; misses are downloads.', ['result'],
+)
+IDENTITY_CACHE_LOOKUPS = Counter(
+    'auth_identity_cache_lookups_total', 'Authenticated requests by identity cache result.', ['result'],
+)
+
+# Endpoints whose requests are not measured
+UNMEASURED_ENDPOINTS = {'metrics.metrics', 'static'}
+
+# Resolving label values takes a dict lookup and a lock inside prometheus_client,
+# so the per-route children are cached here and the hot path is one dict get.
+_children = {}
+
+def _child(metric, *labels):
+    key = (metric, labels)
+    child = _children.get(key)
+    if child is None:
+        child = _children[key] = metric.labels(*labels)
+    return child
+
+@contextmanager
+def timed_stage(stage):
+    """Times a pipeline stage and counts it as failed if it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        _child(PIPELINE_STAGE_FAILURES, stage).inc()
+        raise
+    finally:
+        _child(PIPELINE_STAGE_DURATION, stage).observe(time.perf_counter() - start)
+
+@contextmanager
+def timed_storage_operation(operation):
+    """Times one call to object storage and counts it as failed if it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        _child(STORAGE_OPERATION_FAILURES, operation).inc()
+        raise
+    finally:
+        _child(STORAGE_OPERATION_DURATION, operation).observe(time.perf_counter() - start)
+
+def record_failure(stage):
+    """Counts a stage failure that was handled (e.g. by falling back) rather than raised."""
+    _child(PIPELINE_STAGE_FAILURES, stage).inc()
+
+# Per-request state lives in one list on `g` (start, blueprint, endpoint, method,
+# status, db queries, db seconds): every proxied attribute access costs about a
+# microsecond, which is most of this module's per-request budget.
+START, BLUEPRINT, ENDPOINT, METHOD, STATUS, DB_QUERIES, DB_TIME = range(7)
+
+def _before_request():
+    req = request._get_current_object()
+    endpoint = req.endpoint
+    if endpoint in UNMEASURED_ENDPOINTS:
+        return
+    blueprint = req.blueprint or ''
+    _child(REQUESTS_IN_FLIGHT, blueprint).inc()
+    g.metrics = [time.perf_counter(), blueprint, endpoint or 'unmatched', req.method, 500, 0, 0.0]
+
+def _after_request(response):
+    state = g.get('metrics')
+    if state is not None:
+        state[STATUS] = response.status_code
+    return response
+
+def _teardown_request(exc):
+    state = g.pop('metrics', None)
+    if state is None:
+        return
+    elapsed = time.perf_counter() - state[START]
+    blueprint, endpoint = state[BLUEPRINT], state[ENDPOINT]
+    _child(REQUESTS_IN_FLIGHT, blueprint).dec()
+    _child(REQUEST_LATENCY, blueprint, endpoint, state[METHOD], str(state[STATUS])).observe(elapsed)
+    _child(DB_QUERIES_PER_REQUEST, endpoint).observe(state[DB_QUERIES])
+    _child(DB_TIME_PER_REQUEST, endpoint).observe(state[DB_TIME])
+
+def _instrument_engine(engine):
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start'].pop()
+        # Statements from background threads (e.g. the progress writer) have no request to charge
+        if has_request_context():
+            state = g.get('metrics')
+            if state is not None:
+                state[DB_QUERIES] += 1
+                state[DB_TIME] += elapsed
+
+def init_metrics(app):
+    """Registers the request hooks and the database listeners."""
+    from ..extensions import db
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    with app.app_context():
+        _instrument_engine(db.engine)
+
+def render_metrics():
+    """
+    Returns the current samples in Prometheus text format.
+
+    Returns:
+        tuple: (body, content type)
+    """
+    if MULTIPROCESS:
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
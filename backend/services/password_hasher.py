@@ -0,0 +1,89 @@
+"""
+Bounded off-thread password hashing
+"""
+
+import os
+import threading
+
+class HasherBusy(Exception):
+    """Raised when too many hashes are already queued and the caller should retry later."""
+
+def _make_executor(workers):
+    # Under gevent, concurrent.futures would run on greenlets of the same OS
+    # thread and bcrypt would still stall the hub, so use gevent's real threads.
+    try:
+        from gevent import monkey
+        if monkey.is_module_patched('threading'):
+            from gevent.threadpool import ThreadPoolExecutor
+            return ThreadPoolExecutor(max_workers=workers)
+    except ImportError:
+        pass
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small thread pool, with a cap on queued work.
+
+    bcrypt releases the GIL, so hashing on pool threads leaves the worker free
+    to serve other requests (other greenlets under gevent). The cap keeps a
+    login storm from queueing unbounded CPU work: once `max_pending` hashes are
+    waiting, further callers wait up to `wait_timeout` seconds and then get
+    HasherBusy instead of piling up behind them.
+    """
+
+    def __init__(self):
+        self.rounds = 12
+        self.workers = os.cpu_count() or 2
+        self.max_pending = self.workers * 4
+        self.wait_timeout = 5.0
+        self._bcrypt = None
+        self._executor = None
+        self._pending = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        from ..extensions import bcrypt
+
+        self._bcrypt = bcrypt
+        self.rounds = app.config.get('BCRYPT_LOG_ROUNDS', self.rounds)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', self.workers)
+        self.max_pending = app.config.get('PASSWORD_HASH_MAX_PENDING', self.workers * 4)
+        self.wait_timeout = app.config.get('PASSWORD_HASH_WAIT_TIMEOUT', self.wait_timeout)
+        with self._lock:
+            self._pid = None # Rebuilt with these settings on first use
+
+    def _pool(self):
+        # Pools do not survive gunicorn's fork, so each worker builds its own.
+        # Under the lock, so concurrent first calls in a new worker share one.
+        with self._lock:
+            if self._pid != os.getpid():
+                self._executor = _make_executor(self.workers)
+                self._pending = threading.BoundedSemaphore(self.max_pending)
+                self._pid = os.getpid()
+            return self._executor, self._pending
+
+    def _submit(self, fn, *args):
+        executor, pending = self._pool()
+        if not pending.acquire(timeout=self.wait_timeout):
+            raise HasherBusy()
+        try:
+            return executor.submit(fn, *args).result()
+        finally:
+            pending.release()
+
+    def hash(self, password) -> str:
+        return self._submit(self._bcrypt.generate_password_hash, password, self.rounds).decode('utf-8')
+
+    def verify(self, password_hash, password) -> bool:
+        return self._submit(self._bcrypt.check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash) -> bool:
+        """True if the hash was made with fewer rounds than currently configured."""
+        try:
+            return int(password_hash.split('$')[2]) < self.rounds # $2b$<rounds>$<salt+hash>
+        except (IndexError, ValueError):
+            return True
+
+password_hasher = PasswordHasher()
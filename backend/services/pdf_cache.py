@@ -0,0 +1,191 @@
+"""
+Local read-through disk cache for PDFs kept in object storage
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from .metrics import PDF_CACHE_LOOKUPS
+
+try:
+    import fcntl
+except ImportError:  # No cross-process locking on Windows; fine for the single-process dev server
+    fcntl = None
+
+# Files read within this many seconds are never evicted, so a PDF another
+# worker has just been handed is not removed before it is opened.
+EVICTION_GRACE = 60
+# Leftovers from writers that died mid-download are removed after this long
+STALE_TEMP_AGE = 3600
+# Download locks are striped by key prefix, so the lock files stay a fixed set
+LOCK_STRIPES = 256
+
+class PDFCache:
+    """
+    Keeps downloaded PDFs on local disk, keyed by storage path.
+
+    Stored PDFs are never overwritten in place: document paths are derived
+    from the content hash, and legacy per-user paths carry an upload
+    timestamp. So the path alone identifies the bytes, and an entry written
+    by the upload route is the one text extraction later reads.
+
+    Entries are written to a temporary file and renamed into place, so
+    readers only ever see complete files. A per-key file lock makes
+    concurrent misses in different workers download once, and the least
+    recently used entries are evicted once the directory grows past
+    `max_bytes`. Entry mtimes double as the LRU clock, so the order is
+    shared by every process using the directory.
+    """
+
+    def __init__(self):
+        self.directory = os.path.join(tempfile.gettempdir(), 'eduforge-pdf-cache')
+        self.max_bytes = 1024 * 1024 * 1024
+
+    def init_app(self, app):
+        self.directory = app.config.get('PDF_CACHE_DIR') or self.directory
+        self.max_bytes = app.config.get('PDF_CACHE_MAX_BYTES', self.max_bytes)
+
+    def _entry(self, storage_path):
+        key = hashlib.sha256(storage_path.encode('utf-8')).hexdigest()
+        return key, os.path.join(self.directory, f'{key}.pdf')
+
+    @contextmanager
+    def _locked(self, name, blocking=True):
+        """Holds an exclusive lock file in the cache directory. Yields False if `blocking` is off and it is taken."""
+        if fcntl is None:
+            yield True
+            return
+        lock_dir = os.path.join(self.directory, '.locks')
+        os.makedirs(lock_dir, exist_ok=True)
+        with open(os.path.join(lock_dir, name), 'a') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _stripe(self, key):
+        return f'{int(key[:4], 16) % LOCK_STRIPES}.lock'
+
+    def _write(self, path, fill):
+        """Creates an entry atomically; `fill(temp_path)` writes the bytes."""
+        fd, temp_path = tempfile.mkstemp(prefix='.tmp-', suffix='.pdf', dir=self.directory)
+        os.close(fd)
+        try:
+            fill(temp_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def get(self, storage_path, fetch=None) -> str:
+        """
+        Returns a local path holding the PDF, downloading it on a miss.
+
+        Args:
+            storage_path: Path of the PDF in object storage.
+            fetch: `fetch(storage_path, local_path)` downloads a miss; defaults
+                to the shared storage service.
+        """
+        key, path = self._entry(storage_path)
+        if self._touch(path):
+            PDF_CACHE_LOOKUPS.labels('hit').inc()
+            return path
+
+        os.makedirs(self.directory, exist_ok=True)
+        with self._locked(self._stripe(key)):
+            # Another worker may have downloaded it while this one waited for the lock
+            if self._touch(path):
+                PDF_CACHE_LOOKUPS.labels('hit').inc()
+                return path
+            PDF_CACHE_LOOKUPS.labels('miss').inc()
+            if fetch is None:
+                from .storage import get_storage
+                fetch = lambda source, local_path: get_storage().download_file(source, local_path)
+            self._write(path, lambda temp_path: fetch(storage_path, temp_path))
+        self.evict()
+        return path
+
+    def put(self, storage_path, source):
+        """
+        Pre-warms the cache with a PDF that is already at hand, e.g. right after upload.
+
+        `source` is the file's bytes or a local path to copy from.
+        """
+        key, path = self._entry(storage_path)
+        os.makedirs(self.directory, exist_ok=True)
+
+        def fill(temp_path):
+            if isinstance(source, (bytes, bytearray, memoryview)):
+                with open(temp_path, 'wb') as f:
+                    f.write(source)
+            else:
+                shutil.copyfile(source, temp_path)
+
+        with self._locked(self._stripe(key)):
+            if not self._touch(path):
+                self._write(path, fill)
+        self.evict()
+
+    def _touch(self, path):
+        """Marks an entry as just used. False if it is not cached."""
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits in `max_bytes`."""
+        with self._locked('evict.lock', blocking=False) as acquired:
+            if not acquired:
+                return # Another worker is already evicting
+
+            now = time.time()
+            entries = []
+            total = 0
+            with os.scandir(self.directory) as scan:
+                for item in scan:
+                    if not item.is_file():
+                        continue
+                    try:
+                        stat = item.stat()
+                    except FileNotFoundError:
+                        continue
+                    if item.name.startswith('.tmp-'):
+                        if now - stat.st_mtime > STALE_TEMP_AGE:
+                            self._remove(item.path)
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, item.path))
+                    total += stat.st_size
+
+            for mtime, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if now - mtime < EVICTION_GRACE:
+                    break # Everything from here on is in use
+                try:
+                    if os.stat(path).st_mtime != mtime:
+                        continue # Read again since the scan
+                except FileNotFoundError:
+                    pass
+                self._remove(path)
+                total -= size
+
+    def _remove(self, path):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+pdf_cache = PDFCache()
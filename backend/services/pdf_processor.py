@@ -2,14 +2,14 @@
 PDF processing service for extracting text and analyzing content
 """
 
+import logging
 import os
-import fitz  # PyMuPDF
-import pdfplumber
 from typing import Dict, List, Tuple
 import re
-import tempfile
 from .ai_artifact_generator import AIArtifactGenerator
-from .storage import SupabaseStorage
+from .metrics import record_failure, timed_stage
+
+logger = logging.getLogger(__name__)
 
 class PDFProcessor:
     """Process PDF files and extract content for AI analysis"""
@@ -22,24 +22,17 @@ class PDFProcessor:
         """Extract text content from PDF file"""
         
         text_content = ""
-        temp_file = None
         
         try:
             # Check if path is a storage reference (user_id/filename)
             if not os.path.exists(pdf_path) and '/' in pdf_path:
-                # It's likely a Supabase storage path - download to temp file
-                storage = SupabaseStorage()
-                pdf_data = storage.download_file(pdf_path)
-                
-                # Create a temporary file
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-                temp_file.write(pdf_data)
-                temp_file.close()
-                
-                # Use the temp file path instead
-                pdf_path = temp_file.name
+                # It's likely a Supabase storage path - read it through the local
+                # cache, which only downloads it the first time
+                from .pdf_cache import pdf_cache
+                pdf_path = pdf_cache.get(pdf_path)
             
             # Try with pdfplumber first (better for structured text)
+            import pdfplumber
             with pdfplumber.open(pdf_path) as pdf:
                 for page in pdf.pages:
                     page_text = page.extract_text()
@@ -48,6 +41,7 @@ class PDFProcessor:
             
             # If pdfplumber didn't extract much, try PyMuPDF
             if len(text_content.strip()) < 100:
+                import fitz  # PyMuPDF
                 doc = fitz.open(pdf_path)
                 text_content = ""
                 for page_num in range(doc.page_count):
@@ -56,12 +50,9 @@ class PDFProcessor:
                 doc.close()
                 
         except Exception as e:
-            print(f"Error extracting text from PDF: {e}")
+            logger.warning('Text extraction failed: %s', e)
+            record_failure('extract_text')
             return ""
-        finally:
-            # Clean up temp file if it exists
-            if temp_file and os.path.exists(temp_file.name):
-                os.unlink(temp_file.name)
         
         return text_content.strip()
     
@@ -140,24 +131,68 @@ class PDFProcessor:
         else:
             return "beginner"
     
-    def process_pdf_for_artifacts(self, pdf_path: str, title: str) -> Dict:
-        """Complete PDF processing pipeline for artifact generation"""
+    def process_pdf_for_artifacts(self, pdf_path: str, title: str, document_hash: str = None, regenerate: bool = False) -> Dict:
+        """
+        Complete PDF processing pipeline for artifact generation
+
+        With a `document_hash`, the extraction and generated artifacts are shared
+        with every other lecture made from the same PDF: whichever lecture is
+        processed first pays for them, and later ones read them back. The
+        session is committed after the extraction and after each stored body,
+        so no write transaction stays open while the LLM is called. Template
+        fallbacks are returned but never stored, and `regenerate` calls the
+        LLM again even if a body is stored, replacing it.
+        """
         
         try:
-            # Extract text
-            text_content = self.extract_text_from_pdf(pdf_path)
-            if not text_content:
-                return {"error": "Could not extract text from PDF"}
-            
-            # Analyze structure
-            analysis = self.analyze_content_structure(text_content)
-            
-            # Split into chapters
-            chapters = self.split_into_chapters(text_content)
+            extraction = None
+            if document_hash:
+                from .documents import get_extraction
+                extraction = get_extraction(document_hash)
+
+            if extraction:
+                text_content, analysis, chapters = extraction
+            else:
+                # Extract text
+                with timed_stage('extract_text'):
+                    text_content = self.extract_text_from_pdf(pdf_path)
+                if not text_content:
+                    return {"error": "Could not extract text from PDF"}
+                
+                # Analyze structure
+                with timed_stage('analyze'):
+                    analysis = self.analyze_content_structure(text_content)
+                
+                # Split into chapters
+                with timed_stage('split_chapters'):
+                    chapters = self.split_into_chapters(text_content)
+
+                if document_hash:
+                    from .documents import save_extraction
+                    save_extraction(document_hash, text_content, analysis, chapters)
+            if document_hash:
+                from ..extensions import db
+                db.session.commit() # Nothing may hold the write lock through the LLM calls
             
             # Generate artifacts
-            study_guide_code = self.ai_generator.generate_study_guide(text_content, title)
-            quiz_code = self.ai_generator.generate_quiz(text_content, title)
+            def generate(artifact_type, generator):
+                if document_hash and not regenerate:
+                    from .documents import get_shared_artifact
+                    body = get_shared_artifact(document_hash, artifact_type, title)
+                    if body is not None:
+                        return body
+
+                with timed_stage(f'generate_{artifact_type}'):
+                    body = generator(text_content, title, fallback=False)
+                if body is None:
+                    return self.ai_generator.generate_fallback(artifact_type, text_content, title)
+                if document_hash:
+                    from .documents import store_shared_artifact
+                    store_shared_artifact(document_hash, artifact_type, title, body, replace=regenerate)
+                return body
+
+            study_guide_code = generate('study_guide', self.ai_generator.generate_study_guide)
+            quiz_code = generate('quiz', self.ai_generator.generate_quiz)
             
             return {
                 "success": True,
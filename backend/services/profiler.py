@@ -0,0 +1,233 @@
+"""
+On-demand statistical profiling of requests and background jobs
+"""
+
+import hmac
+import os
+import random
+import re
+import sys
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+DEFAULT_INTERVAL = 0.005 # seconds between samples
+DEFAULT_MAX_PROFILES = 200
+PROFILE_ID = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+def _original(module, name):
+    """
+    Returns the unpatched stdlib function when running under gevent.
+
+    The sampler has to be a real OS thread that sleeps without yielding to
+    the hub, or it would only ever run when the profiled request is idle.
+    """
+    try:
+        from gevent import monkey
+        return monkey.get_original(module, name)
+    except ImportError:
+        return getattr(sys.modules[module], name)
+
+def _frame_label(code):
+    path = code.co_filename.replace(os.sep, '/')
+    short = '/'.join(path.rsplit('/', 2)[-2:])
+    return f'{code.co_name} ({short}:{code.co_firstlineno})'
+
+class SamplingProfiler:
+    """
+    Samples one thread's Python stack at a fixed interval and counts identical stacks.
+
+    Sampling costs the profiled thread nothing beyond the GIL hand-offs; the
+    counts are the collapsed-stack ("folded") format flamegraph tools read.
+    Under gevent the sampled thread is the worker's hub thread, so samples
+    can include other greenlets that ran during the request.
+    """
+
+    def __init__(self, thread_id=None, interval=DEFAULT_INTERVAL):
+        self.thread_id = thread_id or _original('_thread', 'get_ident')()
+        self.interval = interval
+        self.counts = Counter()
+        self.started_at = None
+        self.duration = 0.0
+        self._running = False
+
+    def start(self):
+        self._running = True
+        self.started_at = time.time()
+        start_new_thread = _original('_thread', 'start_new_thread')
+        start_new_thread(self._run, ())
+        return self
+
+    def stop(self):
+        self._running = False
+        self.duration = time.time() - self.started_at
+        return self.counts
+
+    def _run(self):
+        sleep = _original('time', 'sleep')
+        while self._running:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                self.counts[';'.join(reversed(stack))] += 1
+            sleep(self.interval)
+
+def collapsed(counts):
+    return ''.join(f'{stack} {count}\n' for stack, count in counts.most_common())
+
+def speedscope(profile_id, counts, interval=DEFAULT_INTERVAL):
+    """Converts collapsed stacks to a speedscope "sampled" profile."""
+    frames, index, samples, weights = [], {}, [], []
+    for stack, count in counts.items():
+        sample = []
+        for name in stack.split(';'):
+            if name not in index:
+                index[name] = len(frames)
+                frames.append({'name': name})
+            sample.append(index[name])
+        samples.append(sample)
+        weights.append(count * interval)
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled', 'name': profile_id, 'unit': 'seconds',
+            'startValue': 0, 'endValue': sum(weights),
+            'samples': samples, 'weights': weights,
+        }],
+        'name': profile_id,
+        'exporter': 'eduforge',
+    }
+
+class ProfileStore:
+    """Profiles on disk as `<id>.folded` files, pruned to the newest `max_profiles`."""
+
+    def __init__(self, directory, max_profiles=DEFAULT_MAX_PROFILES):
+        self.directory = directory
+        self.max_profiles = max_profiles
+
+    def _path(self, profile_id):
+        if not PROFILE_ID.match(profile_id):
+            raise KeyError(profile_id)
+        return os.path.join(self.directory, f'{profile_id}.folded')
+
+    def save(self, profile_id, counts):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(profile_id)
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'w') as f:
+            f.write(collapsed(counts))
+        os.replace(temporary, path)
+        self._prune()
+
+    def load(self, profile_id):
+        """
+        Raises:
+            KeyError: If there is no profile with this id.
+        """
+        try:
+            with open(self._path(profile_id)) as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            raise KeyError(profile_id)
+        counts = Counter()
+        for line in lines:
+            stack, _, count = line.rpartition(' ')
+            counts[stack] += int(count)
+        return counts
+
+    def list(self):
+        try:
+            entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith('.folded')]
+        except FileNotFoundError:
+            return []
+        entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        return [{
+            'id': entry.name[:-len('.folded')],
+            'created_at': entry.stat().st_mtime,
+            'size': entry.stat().st_size,
+        } for entry in entries]
+
+    def _prune(self):
+        for stale in self.list()[self.max_profiles:]:
+            try:
+                os.unlink(self._path(stale['id']))
+            except OSError:
+                pass
+
+_store = None
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = ProfileStore(
+            os.environ.get('PROFILE_DIR', '/tmp/eduforge-profiles'),
+            int(os.environ.get('PROFILE_MAX_PROFILES', DEFAULT_MAX_PROFILES)),
+        )
+    return _store
+
+def profiling_token():
+    return os.environ.get('PROFILING_TOKEN')
+
+def is_profiling_admin(request):
+    """Checks the request's X-Profile header against PROFILING_TOKEN."""
+    token = profiling_token()
+    provided = request.headers.get('X-Profile')
+    return bool(token and provided and hmac.compare_digest(provided, token))
+
+@contextmanager
+def profile_job(name):
+    """
+    Profiles a block of work outside a request (a CLI command, a background job).
+
+    Yields:
+        str: The id the profile is stored under.
+    """
+    profile_id = f'{name}-{uuid.uuid4().hex[:12]}'
+    profiler = SamplingProfiler().start()
+    try:
+        yield profile_id
+    finally:
+        get_store().save(profile_id, profiler.stop())
+
+def init_profiling(app):
+    """
+    Profiles requests that carry `X-Profile: $PROFILING_TOKEN`, plus a random
+    PROFILE_SAMPLE_RATE fraction of all requests.
+
+    Nothing is registered unless one of the two is configured, so a disabled
+    profiler costs nothing per request.
+    """
+    from flask import g, request
+
+    token = profiling_token()
+    sample_rate = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+    if not token and sample_rate <= 0:
+        return
+    interval = float(os.environ.get('PROFILE_INTERVAL', DEFAULT_INTERVAL))
+
+    @app.before_request
+    def start_profiler():
+        g.profile_admin = is_profiling_admin(request)
+        if not (g.profile_admin or (sample_rate > 0 and random.random() < sample_rate)):
+            return
+        # Always generated here: an id taken from the client could overwrite another profile
+        g.profile_id = uuid.uuid4().hex
+        g.profiler = SamplingProfiler(interval=interval).start()
+
+    @app.after_request
+    def add_profile_header(response):
+        # Sampled requests from ordinary clients are profiled silently
+        if 'profiler' in g and g.profile_admin:
+            response.headers['X-Profile-Id'] = g.profile_id
+        return response
+
+    @app.teardown_request
+    def save_profile(exc):
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            get_store().save(g.profile_id, profiler.stop())
@@ -0,0 +1,81 @@
+"""
+Single-writer queue for processing job progress updates
+"""
+
+import atexit
+import os
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import text
+
+class ProgressWriter:
+    """
+    Coalesces job progress updates and writes them from one background thread.
+
+    Progress ticks are frequent and only the latest value matters, so instead of
+    every request thread committing its own transaction (and competing with
+    readers for the SQLite write lock) updates are collected in memory and
+    written in a single batched transaction every `flush_interval` seconds.
+    """
+
+    def __init__(self, flush_interval=0.25):
+        self.flush_interval = flush_interval
+        self._engine = None
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def init_app(self, app):
+        from ..extensions import db
+
+        self.flush_interval = app.config.get('PROGRESS_FLUSH_INTERVAL', self.flush_interval)
+        with app.app_context():
+            self._engine = db.engine
+        atexit.register(self.flush)
+
+    def submit(self, job_id, progress):
+        """Queues a progress value for a job. Lower values than one already queued are ignored."""
+        with self._lock:
+            self._pending[job_id] = max(progress, self._pending.get(job_id, progress))
+            self._ensure_thread()
+
+    def flush(self):
+        """Writes all queued progress values in one transaction."""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch or self._engine is None:
+            return
+
+        now = datetime.utcnow()
+        # The guard keeps a late flush from overwriting a job the request thread
+        # has already finished (or moved further along).
+        statement = text(
+            "UPDATE processing_jobs SET progress = :progress, updated_at = :now "
+            "WHERE id = :id AND status = 'processing' AND (progress IS NULL OR progress < :progress)"
+        )
+        with self._engine.begin() as connection:
+            connection.execute(statement, [
+                {'id': job_id, 'progress': progress, 'now': now}
+                for job_id, progress in batch.items()
+            ])
+
+    def _ensure_thread(self):
+        # Gunicorn forks workers after the app is created, and threads do not
+        # survive a fork, so each worker process starts its own writer lazily.
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name='progress-writer', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error writing job progress: {e}")
+
+progress_writer = ProgressWriter()
@@ -0,0 +1,119 @@
+"""
+Storage for exam questions, one row per question
+"""
+
+from typing import Callable, Dict, List
+
+from sqlalchemy.exc import IntegrityError
+
+from ..extensions import db
+
+DEFAULT_PAGE_SIZE = 50
+# Attempts at appending before giving up when concurrent appends keep taking the same positions
+POSITION_RETRIES = 5
+
+def answer_index(options: List[str], correct_answer) -> int:
+    """
+    Resolves the correct answer to an option index.
+
+    Accepts an index or the text of one of the options.
+
+    Raises:
+        ValueError: If the answer does not match any option.
+    """
+    if isinstance(correct_answer, int) and not isinstance(correct_answer, bool):
+        if 0 <= correct_answer < len(options):
+            return correct_answer
+    elif correct_answer in options:
+        return options.index(correct_answer)
+    raise ValueError('The correct answer must be one of the options')
+
+def next_position(exam_id) -> int:
+    """Returns the position the next question appended to an exam should take."""
+    from ..models import Question
+    return (db.session.query(db.func.max(Question.position)).filter(
+        Question.exam_id == exam_id
+    ).scalar() or 0) + 1
+
+def _append(exam_id, insert: Callable[[int], object]):
+    """
+    Runs `insert(first_position)` in a savepoint, retrying with fresh positions on conflict.
+
+    Two requests appending to the same exam can read the same max(position);
+    the unique (exam_id, position) index rejects the second one, which then
+    reads the new maximum and tries again.
+    """
+    for attempt in range(POSITION_RETRIES):
+        try:
+            with db.session.begin_nested():
+                return insert(next_position(exam_id))
+        except IntegrityError:
+            if attempt == POSITION_RETRIES - 1:
+                raise
+
+def append_question(exam_id, question_text: str, options: List[str], correct_index: int, explanation=None):
+    """
+    Adds one question at the end of an exam.
+
+    Returns:
+        Question: The new row, already flushed. The caller commits the session.
+    """
+    from ..models import Question
+
+    def insert(position):
+        question = Question(
+            exam_id=exam_id,
+            position=position,
+            question_text=question_text,
+            options=options,
+            answer_index=correct_index,
+            explanation=explanation
+        )
+        db.session.add(question)
+        return question
+    return _append(exam_id, insert)
+
+def bulk_insert_questions(exam_id, questions: List[Dict], chapter_id=None) -> int:
+    """
+    Appends a set of questions to an exam with a single executemany.
+
+    Args:
+        exam_id: The exam to add the questions to.
+        questions: Dicts with `question_text` (or `text`), `options`,
+                   `correct_answer` (index or option text) and optionally `explanation`.
+        chapter_id: The chapter the questions were generated from, if any.
+
+    Returns:
+        int: The number of questions inserted. The caller commits the session.
+    """
+    from ..models import Question
+
+    if not questions:
+        return 0
+
+    rows = [{
+        'exam_id': exam_id,
+        'chapter_id': chapter_id,
+        'question_text': question.get('question_text') or question.get('text'),
+        'options': question['options'],
+        'answer_index': answer_index(question['options'], question['correct_answer']),
+        'explanation': question.get('explanation')
+    } for question in questions]
+
+    def insert(first_position):
+        db.session.execute(Question.__table__.insert(), [
+            dict(row, position=first_position + i) for i, row in enumerate(rows)
+        ])
+        return len(rows)
+    return _append(exam_id, insert)
+
+def serialize_question(question) -> Dict:
+    return {
+        'id': question.id,
+        'position': question.position,
+        'question_text': question.question_text,
+        'options': question.options,
+        'answer_index': question.answer_index,
+        'correct_answer': question.correct_answer,
+        'explanation': question.explanation
+    }
@@ -0,0 +1,173 @@
+"""
+Full-text search over extracted lecture chapters, backed by SQLite FTS5
+"""
+
+import re
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from ..extensions import db
+
+# Chapters are stored with rowid = lecture_id * MAX_CHAPTERS_PER_LECTURE + index,
+# so re-indexing a lecture deletes a rowid range instead of scanning the table.
+MAX_CHAPTERS_PER_LECTURE = 10000
+
+CREATE_INDEX_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS chapter_search USING fts5("
+    "title, content, owner, lecture_id UNINDEXED, chapter_index UNINDEXED, "
+    "tokenize='porter unicode61')"
+)
+
+def chapter_id(lecture_id, index) -> int:
+    """A chapter's id, which is also its rowid in the search index."""
+    return lecture_id * MAX_CHAPTERS_PER_LECTURE + index
+
+def split_chapter_id(chapter_id) -> Tuple[int, int]:
+    """Returns the (lecture_id, index) a chapter id was built from."""
+    return divmod(chapter_id, MAX_CHAPTERS_PER_LECTURE)
+
+class SearchUnavailable(Exception):
+    """Raised when the configured database has no FTS5 support."""
+
+class SearchIndexMissing(SearchUnavailable):
+    """Raised when the database supports FTS5 but the index table was never created."""
+
+@contextmanager
+def _index_table():
+    """Turns the error for a missing `chapter_search` table into SearchIndexMissing."""
+    try:
+        yield
+    except OperationalError as e:
+        if 'no such table: chapter_search' not in str(e.orig):
+            raise
+        raise SearchIndexMissing("The search index has not been created; run 'flask db upgrade' or 'flask init-db'") from e
+
+def _require_sqlite():
+    if db.engine.dialect.name != 'sqlite':
+        raise SearchUnavailable('Full-text search requires a SQLite database with FTS5')
+
+def _owner_token(user_id) -> str:
+    # Ownership is an indexed token so per-user filtering happens inside the
+    # full-text lookup rather than after it.
+    return f'u{user_id}'
+
+def build_match_query(user_id, query: str) -> str:
+    """
+    Turns free text into a safe FTS5 MATCH expression scoped to one user.
+
+    Every word is quoted, so FTS5 operators typed by the user are treated as
+    plain text. A trailing `*` on a word is kept as a prefix search.
+    """
+    terms = []
+    for word in re.findall(r'[\w\-\']+\*?', query):
+        prefix = word.endswith('*')
+        word = word.rstrip('*').replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ('*' if prefix else ''))
+    if not terms:
+        return ''
+    return f'owner : "{_owner_token(user_id)}" AND {{title content}} : ({" AND ".join(terms)})'
+
+def ensure_index():
+    """Creates the FTS5 table if it does not exist yet."""
+    _require_sqlite()
+    db.session.execute(text(CREATE_INDEX_SQL))
+    db.session.commit()
+
+def index_chapters(user_id, lecture_id, chapters: List[Tuple[str, str]]):
+    """
+    Replaces the indexed chapters of one lecture.
+
+    Args:
+        user_id: Owner of the lecture.
+        lecture_id: The lecture the chapters were extracted from.
+        chapters: (title, content) tuples as returned by the chapter splitter.
+
+    The caller is responsible for committing the session.
+    """
+    _require_sqlite()
+    first_rowid = lecture_id * MAX_CHAPTERS_PER_LECTURE
+    with _index_table():
+        db.session.execute(
+            text("DELETE FROM chapter_search WHERE rowid BETWEEN :first AND :last"),
+            {'first': first_rowid, 'last': first_rowid + MAX_CHAPTERS_PER_LECTURE - 1}
+        )
+    rows = [{
+        'rowid': chapter_id(lecture_id, index),
+        'title': title,
+        'content': content,
+        'owner': _owner_token(user_id),
+        'lecture_id': lecture_id,
+        'chapter_index': index
+    } for index, (title, content) in enumerate(chapters[:MAX_CHAPTERS_PER_LECTURE])]
+    if rows:
+        db.session.execute(text(
+            "INSERT INTO chapter_search (rowid, title, content, owner, lecture_id, chapter_index) "
+            "VALUES (:rowid, :title, :content, :owner, :lecture_id, :chapter_index)"
+        ), rows)
+
+def _index_exists(connection) -> bool:
+    return connection.dialect.name == 'sqlite' and connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'chapter_search'")
+    ).first() is not None
+
+def _remove_lecture_chapters(mapper, connection, lecture):
+    # Runs in the deleting transaction, so the chapters go with the lecture row
+    if _index_exists(connection):
+        first_rowid = lecture.id * MAX_CHAPTERS_PER_LECTURE
+        connection.execute(
+            text("DELETE FROM chapter_search WHERE rowid BETWEEN :first AND :last"),
+            {'first': first_rowid, 'last': first_rowid + MAX_CHAPTERS_PER_LECTURE - 1}
+        )
+
+def init_chapter_cleanup():
+    """Removes a lecture's indexed chapters whenever the lecture is deleted."""
+    from sqlalchemy import event
+    from ..models import Lecture
+
+    if not event.contains(Lecture, 'after_delete', _remove_lecture_chapters):
+        event.listen(Lecture, 'after_delete', _remove_lecture_chapters)
+
+def delete_orphaned_chapters() -> int:
+    """
+    Removes indexed chapters whose lecture no longer exists, such as those of
+    lectures deleted in bulk, which skips the ORM delete event. Returns the
+    number removed.
+
+    The caller is responsible for committing the session.
+    """
+    if not _index_exists(db.session.connection()):
+        return 0
+    return db.session.execute(text(
+        "DELETE FROM chapter_search WHERE lecture_id NOT IN (SELECT id FROM lecture)"
+    )).rowcount
+
+def search_chapters(user_id, query: str, limit: int = 20, offset: int = 0) -> List[Dict]:
+    """
+    Ranks a user's chapters against a query.
+
+    Title matches weigh five times as much as body matches (BM25). Each hit
+    carries a snippet of the body with the matched terms wrapped in <mark>.
+    """
+    _require_sqlite()
+    match = build_match_query(user_id, query)
+    if not match:
+        return []
+
+    with _index_table():
+        rows = db.session.execute(text(
+            "SELECT lecture_id, chapter_index, title, "
+            "snippet(chapter_search, 1, '<mark>', '</mark>', '…', 24) AS snippet, "
+            "bm25(chapter_search, 5.0, 1.0, 0.0) AS rank "
+            "FROM chapter_search WHERE chapter_search MATCH :match "
+            "ORDER BY rank LIMIT :limit OFFSET :offset"
+        ), {'match': match, 'limit': limit, 'offset': offset}).all()
+
+    return [{
+        'lecture_id': row.lecture_id,
+        'chapter_index': row.chapter_index,
+        'title': row.title,
+        'snippet': row.snippet,
+        'score': -row.rank
+    } for row in rows]
@@ -3,36 +3,68 @@ Supabase storage service for EduForge
 """
 
 import os
+import threading
 import time
 from pathlib import Path
-from supabase import create_client, Client
 from dotenv import load_dotenv
+from .metrics import timed_storage_operation
 
 load_dotenv()
 
 class SupabaseStorage:
-    """Handles file storage operations with Supabase"""
+    """
+    Handles file storage operations with Supabase
+
+    Use `get_storage()` rather than constructing one: the shared instance
+    reuses the process's pooled client and checks the bucket only once.
+    """
     
-    def __init__(self):
-        """Initialize Supabase client"""
-        supabase_url = os.environ.get("SUPABASE_URL")
-        supabase_key = os.environ.get("SUPABASE_KEY")
-        
-        if not supabase_url or not supabase_key:
-            raise ValueError("Supabase URL and key must be set in .env file")
-            
-        self.supabase: Client = create_client(supabase_url, supabase_key)
+    def __init__(self, client=None):
+        """Initialize on the shared Supabase client, or on `client` if given"""
+        if client is None:
+            from ..extensions import get_supabase
+            client = get_supabase()
+        self.supabase = client
         self.bucket_name = os.environ.get("SUPABASE_BUCKET_NAME", "eduforge-pdfs")
-        self._ensure_bucket_exists()
+        self._bucket_ready = False
+        self._bucket_lock = threading.Lock()
     
+    def ensure_bucket(self):
+        """Ensure the storage bucket exists, checking at most once per instance"""
+        if self._bucket_ready:
+            return
+        with self._bucket_lock:
+            if not self._bucket_ready:
+                self._ensure_bucket_exists()
+                self._bucket_ready = True
+
     def _ensure_bucket_exists(self):
         """Ensure the storage bucket exists"""
         try:
             # Try to get bucket info - if it doesn't exist, this will raise an exception
-            self.supabase.storage.get_bucket(self.bucket_name)
+            with timed_storage_operation('get_bucket'):
+                self.supabase.storage.get_bucket(self.bucket_name)
         except:
             # Create the bucket if it doesn't exist
-            self.supabase.storage.create_bucket(self.bucket_name, public=False)
+            with timed_storage_operation('create_bucket'):
+                self.supabase.storage.create_bucket(self.bucket_name, options={'public': False})
+    
+    def put_object(self, file_path, file, content_type="application/pdf", upsert=False):
+        """
+        Store a file at an exact path in the bucket
+        
+        Args:
+            file_path: Path of the object in the bucket
+            file: Bytes, or a local file path, which the client streams from disk
+            content_type: MIME type to store with the object
+            upsert: Overwrite an existing object instead of failing
+        """
+        self.ensure_bucket()
+        file_options = {"content-type": content_type}
+        if upsert:
+            file_options["upsert"] = "true"
+        with timed_storage_operation('upload'):
+            self.supabase.storage.from_(self.bucket_name).upload(path=file_path, file=file, file_options=file_options)
     
     def upload_file(self, file_content, file_name, user_id):
         """
@@ -52,10 +84,12 @@ class SupabaseStorage:
         file_path = f"{user_id}/{safe_filename}_{timestamp}.pdf"
         
         # Upload file to Supabase storage
-        self.supabase.storage.from_(self.bucket_name).upload(
-            file_path,
-            file_content
-        )
+        self.ensure_bucket()
+        with timed_storage_operation('upload'):
+            self.supabase.storage.from_(self.bucket_name).upload(
+                file_path,
+                file_content
+            )
         
         return file_path
     
@@ -71,7 +105,8 @@ class SupabaseStorage:
             bytes: File content if local_path is None, else None
         """
         # Get file from storage
-        file_content = self.supabase.storage.from_(self.bucket_name).download(file_path)
+        with timed_storage_operation('download'):
+            file_content = self.supabase.storage.from_(self.bucket_name).download(file_path)
         
         # Save to local path if provided
         if local_path:
@@ -92,10 +127,11 @@ class SupabaseStorage:
         Returns:
             str: Signed URL
         """
-        return self.supabase.storage.from_(self.bucket_name).create_signed_url(
-            file_path, 
-            expires_in
-        )
+        with timed_storage_operation('create_signed_url'):
+            return self.supabase.storage.from_(self.bucket_name).create_signed_url(
+                file_path, 
+                expires_in
+            )
     
     def delete_file(self, file_path):
         """
@@ -108,7 +144,23 @@ class SupabaseStorage:
             bool: Success status
         """
         try:
-            self.supabase.storage.from_(self.bucket_name).remove(file_path)
+            with timed_storage_operation('remove'):
+                self.supabase.storage.from_(self.bucket_name).remove([file_path])
             return True
         except Exception:
             return False
+
+_storage = None
+_storage_lock = threading.Lock()
+
+def get_storage() -> SupabaseStorage:
+    """Returns the process-wide storage service, creating it on first call."""
+    global _storage
+    from ..extensions import get_supabase
+    client = get_supabase()
+    # A forked worker gets a new client from get_supabase, and with it a new service
+    if _storage is None or _storage.supabase is not client:
+        with _storage_lock:
+            if _storage is None or _storage.supabase is not client:
+                _storage = SupabaseStorage(client)
+    return _storage
@@ -0,0 +1,103 @@
+from collections import namedtuple
+from sqlalchemy.orm import aliased, contains_eager
+from ..extensions import db
+
+# Every check below resolves ownership through the lecture in the same
+# statement that loads the target row, so a route never issues a second query
+# (or a lazy load of `.lecture`) just to compare user ids.
+
+# Chapters are not rows of their own: they live in the lecture's document as
+# (title, content) pairs, addressed by `search_index.chapter_id`.
+OwnedChapter = namedtuple('OwnedChapter', ['id', 'lecture_id', 'index', 'title', 'content'])
+
+def exam_owned_clause(exam_id, user_id):
+    """
+    Returns an EXISTS expression that is true when the user owns the exam.
+
+    Useful for embedding the check into a query that loads something else.
+    """
+    from ..models import Exam, Lecture
+    # Aliased so the subquery is not correlated against a Lecture in the outer query
+    exam_lecture = aliased(Lecture)
+    return db.session.query(Exam.id).join(exam_lecture, Exam.lecture_id == exam_lecture.id).filter(
+        Exam.id == exam_id, exam_lecture.user_id == user_id
+    ).exists()
+
+def user_owns_exam(exam_id, user_id):
+    """Checks exam ownership with a single EXISTS query, without loading any rows."""
+    return db.session.query(exam_owned_clause(exam_id, user_id)).scalar()
+
+def get_owned_exam(exam_id, user_id):
+    """
+    Loads an exam together with its lecture if the user owns it.
+
+    Returns:
+        Exam: The exam with `.lecture` already populated, or None if it does
+              not exist or belongs to another user.
+    """
+    from ..models import Exam, Lecture
+    return Exam.query.join(Lecture, Exam.lecture_id == Lecture.id).options(contains_eager(Exam.lecture)).filter(
+        Exam.id == exam_id, Lecture.user_id == user_id
+    ).first()
+
+def get_owned_exam_questions(exam_id, user_id, after_position=None, limit=None):
+    """
+    Loads the questions of an exam the user owns in one round-trip.
+
+    Args:
+        after_position (int): Only return questions after this position.
+        limit (int): Maximum number of questions to return.
+
+    Returns:
+        list: The exam's questions in order, or None if the exam does not
+              exist or belongs to another user.
+    """
+    from ..models import Exam, Lecture, Question
+    # The position filter goes into the join condition so an exam with no
+    # (remaining) questions still returns its row and passes the ownership check.
+    join_condition = Question.exam_id == Exam.id
+    if after_position is not None:
+        join_condition = db.and_(join_condition, Question.position > after_position)
+
+    query = db.session.query(Exam.id, Question).join(Lecture, Exam.lecture_id == Lecture.id).outerjoin(
+        Question, join_condition
+    ).filter(Exam.id == exam_id, Lecture.user_id == user_id).order_by(Question.position)
+    if limit is not None:
+        query = query.limit(limit)
+    rows = query.all()
+
+    if not rows:
+        return None
+    return [question for _, question in rows if question is not None]
+
+def get_owned_chapter(chapter_id, user_id, exam_id=None):
+    """
+    Loads a chapter of a lecture the user owns.
+
+    Args:
+        chapter_id (int): The chapter to load.
+        user_id (int): The requesting user.
+        exam_id (int): Optionally also check ownership of this exam in the same query.
+
+    Returns:
+        OwnedChapter, or (OwnedChapter, bool) when `exam_id` is given. The
+        chapter is None if it does not exist or belongs to another user.
+    """
+    from ..models import Document, Lecture
+    from ..services.search_index import split_chapter_id
+
+    lecture_id, index = split_chapter_id(chapter_id)
+    query = db.session.query(Document.chapters).select_from(Lecture).join(
+        Document, Lecture.document_hash == Document.sha256
+    ).filter(Lecture.id == lecture_id, Lecture.user_id == user_id)
+    if exam_id is not None:
+        query = query.add_columns(exam_owned_clause(exam_id, user_id))
+    row = query.first()
+
+    chapter = None
+    if row is not None and index < len(row[0] or []):
+        title, content = row[0][index]
+        chapter = OwnedChapter(chapter_id, lecture_id, index, title, content)
+    if exam_id is None:
+        return chapter
+    return chapter, bool(row is not None and row[1])
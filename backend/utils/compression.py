@@ -0,0 +1,110 @@
+import gzip
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; without it responses fall back to gzip
+    brotli = None
+
+# Responses smaller than this are sent as-is: the savings would not cover the CPU and header cost.
+DEFAULT_MIN_SIZE = 1024
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/javascript', 'text/plain', 'text/html',
+    'text/css', 'text/javascript', 'image/svg+xml',
+}
+
+def available_encodings():
+    """Content-codings this process can produce, in order of preference."""
+    return ['br', 'gzip'] if brotli else ['gzip']
+
+def gzip_compress(data: bytes, level: int = 9) -> bytes:
+    # mtime=0 keeps the output deterministic, so equal bodies give equal bytes
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+def brotli_compress(data: bytes, quality: int = 11) -> bytes:
+    return brotli.compress(data, quality=quality)
+
+def precompress(data: bytes) -> dict:
+    """Compresses a body once at maximum quality with every available encoding."""
+    encoded = {'gzip': gzip_compress(data)}
+    if brotli:
+        encoded['br'] = brotli_compress(data)
+    return encoded
+
+# Codings a wildcard `Accept-Encoding: *` stands for. Anything else, such as the
+# blob store's x-zdict-<id> or deflate, is only sent to clients that name it.
+WILDCARD_ENCODINGS = {'br', 'gzip', 'identity'}
+
+def negotiate(offered):
+    """Picks the client's preferred encoding among `offered`, or None for identity."""
+    accept = request.accept_encodings
+    best, best_quality = None, 0
+    for encoding in offered or ():
+        if encoding in WILDCARD_ENCODINGS:
+            quality = accept[encoding]
+        else:
+            quality = max((q for value, q in accept if value.lower() == encoding), default=0)
+        if quality > best_quality: # Ties go to the earlier, server-preferred encoding
+            best, best_quality = encoding, quality
+    return best
+
+def _stream_gzip(chunks, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 writes a gzip container
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def init_compression(app):
+    """
+    Compresses dynamic responses on the fly.
+
+    Responses that already carry a Content-Encoding (such as precompressed
+    artifact bodies) are left alone, and so are files sent as they are
+    (direct_passthrough or X-Sendfile): compressing those on every request
+    would also change their ETag, so they could never be revalidated.
+    Streamed responses are compressed chunk by chunk with gzip, so they are
+    never buffered in full.
+    """
+    min_size = app.config.get('COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE)
+    gzip_level = app.config.get('COMPRESSION_GZIP_LEVEL', 6)
+    brotli_quality = app.config.get('COMPRESSION_BROTLI_QUALITY', 5)
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code < 200 or response.status_code >= 300 or response.status_code == 204
+                or 'Content-Encoding' in response.headers
+                or response.direct_passthrough or 'X-Sendfile' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES
+                or request.method == 'HEAD'):
+            return response
+
+        if response.is_streamed:
+            if negotiate(['gzip']) != 'gzip':
+                return response
+            response.response = _stream_gzip(response.response, gzip_level)
+            response.headers.pop('Content-Length', None)
+            encoding = 'gzip'
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            encoding = negotiate(available_encodings())
+            if encoding == 'br':
+                response.set_data(brotli_compress(data, brotli_quality))
+            elif encoding == 'gzip':
+                response.set_data(gzip_compress(data, gzip_level))
+            else:
+                return response
+
+        response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        # A strong ETag names one exact byte sequence, so it must differ per encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(f'{etag}-{encoding}')
+        return response
@@ -0,0 +1,63 @@
+import hashlib
+from functools import wraps
+from flask import request, make_response
+
+# Artifacts are never edited once generated, so browsers may reuse them without revalidating.
+IMMUTABLE_CACHE_CONTROL = 'private, max-age=86400, immutable'
+# Everything else is cached but revalidated with If-None-Match on every use.
+REVALIDATE_CACHE_CONTROL = 'private, no-cache'
+
+def make_etag(*parts):
+    """Builds a strong ETag value from the parts that determine a representation."""
+    return hashlib.sha256('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:32]
+
+# Suffixes the compression layer appends to strong ETags of encoded responses
+ENCODING_SUFFIXES = ('-gzip', '-br')
+
+def etag_matches(etag):
+    """Checks If-None-Match against an ETag and its per-encoding variants."""
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return False
+    if if_none_match.star_tag or etag in if_none_match:
+        return True
+    return any(etag + suffix in if_none_match for suffix in ENCODING_SUFFIXES)
+
+def not_modified(etag, cache_control=REVALIDATE_CACHE_CONTROL):
+    """
+    Returns a 304 response if the client already holds this ETag, otherwise None.
+
+    Meant to be called before the expensive part of a view, so a cache hit
+    never loads the response body from the database.
+    """
+    if not etag_matches(etag):
+        return None
+    response = make_response('', 304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def set_cache_headers(response, etag, cache_control=REVALIDATE_CACHE_CONTROL):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def conditional(f):
+    """
+    Adds a content-derived ETag to a view's successful responses and turns
+    requests whose If-None-Match matches it into 304s.
+
+    This saves bandwidth for views that are cheap to compute but whose
+    responses are re-fetched on every page visit.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        response = make_response(f(*args, **kwargs))
+        if response.status_code == 200 and request.method in ('GET', 'HEAD'):
+            response.add_etag()
+            response.headers.setdefault('Cache-Control', REVALIDATE_CACHE_CONTROL)
+            etag, _ = response.get_etag()
+            if etag_matches(etag):
+                return not_modified(etag, response.headers['Cache-Control'])
+        return response
+    return decorated
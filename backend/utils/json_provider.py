@@ -0,0 +1,78 @@
+import json
+from flask import current_app, has_app_context
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; without it the stdlib encoder is used
+    orjson = None
+
+# Fragments (pre-encoded JSON spliced into a document) need orjson 3.9+
+Fragment = getattr(orjson, 'Fragment', None)
+
+def raw_json(encoded):
+    """
+    Wraps already-encoded JSON so it is embedded as-is instead of re-encoded.
+
+    Falls back to decoding it when the installed encoder cannot splice fragments.
+    """
+    if Fragment is not None:
+        return Fragment(encoded)
+    return json.loads(encoded)
+
+def encode(obj) -> bytes:
+    """Encodes a value to compact JSON bytes with the app's conventions, including its `sort_keys`."""
+    sort_keys = has_app_context() and getattr(current_app.json, 'sort_keys', False)
+    if orjson is not None:
+        options = FastJSONProvider.orjson_options | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=options)
+    return json.dumps(obj, default=DefaultJSONProvider.default, separators=(',', ':'), sort_keys=sort_keys).encode('utf-8')
+
+def stream_json_object(fields, list_key, items, encode_item=encode):
+    """
+    Streams `{**fields, list_key: [items...]}` one list item at a time.
+
+    Large lists (such as artifacts with their code) are never held in memory
+    as one encoded document, and the first bytes go out before the last item
+    is encoded.
+    """
+    head = encode(fields)
+    yield head[:-1] + (b',' if fields else b'') + encode(list_key) + b':['
+    for i, item in enumerate(items):
+        yield (b',' if i else b'') + encode_item(item)
+    yield b']}'
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    A JSON provider backed by orjson when it is installed.
+
+    orjson encodes datetimes (naive ones as UTC, in RFC 3339), dataclasses
+    and UUIDs natively and escapes large strings such as JSX bodies several
+    times faster than the stdlib encoder. Calls with stdlib-specific keyword
+    arguments, and installs without orjson, use the default provider.
+    """
+    orjson_options = (orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        options = self._options()
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            options |= orjson.OPT_INDENT_2 # Readable output for debugging, as the default provider does
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=options), mimetype=self.mimetype
+        )
+
+    def _options(self):
+        return self.orjson_options | (orjson.OPT_SORT_KEYS if self.sort_keys else 0)
@@ -0,0 +1,82 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(created_at, row_id):
+    """
+    Encodes the position of the last row on a page into an opaque cursor string.
+
+    Args:
+        created_at (datetime): The `created_at` value of the last row returned.
+        row_id (int): The primary key of the last row returned.
+
+    Returns:
+        str: A URL-safe cursor that can be passed back as `?cursor=`.
+    """
+    payload = json.dumps([created_at.isoformat() if created_at else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    Decodes a cursor produced by `encode_cursor`.
+
+    Returns:
+        tuple: (created_at, row_id)
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return (datetime.fromisoformat(created_at) if created_at else None), int(row_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+def parse_page_size(value):
+    """Clamps a `?limit=` query value to the allowed page size range."""
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        return max(1, min(int(value), MAX_PAGE_SIZE))
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+
+def keyset_paginate(query, created_at_col, id_col, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Applies keyset (seek) pagination ordered by `(created_at, id)` to a query.
+
+    Unlike OFFSET pagination the database seeks straight to the cursor position,
+    so fetching a late page costs the same as fetching the first one.
+
+    Args:
+        query: A SQLAlchemy query selecting at least `created_at_col` and `id_col`.
+        created_at_col: The timestamp column used as the primary sort key.
+        id_col: The primary key column used as the tie-breaker.
+        cursor (str): Optional cursor returned with the previous page.
+        limit (int): Maximum number of rows to return.
+
+    Returns:
+        tuple: (rows, next_cursor) where `next_cursor` is None on the last page.
+    """
+    if cursor:
+        after_created_at, after_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            created_at_col > after_created_at,
+            and_(created_at_col == after_created_at, id_col > after_id)
+        ))
+
+    # Fetch one extra row to find out whether another page exists.
+    rows = query.order_by(created_at_col.asc(), id_col.asc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, created_at_col.key), getattr(last, id_col.key))
+
+    return rows, next_cursor
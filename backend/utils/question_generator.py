@@ -1,10 +1,14 @@
+import logging
 import os
-import openai
 from ..services.anthropic_client import get_anthropic_client
+from ..services.metrics import record_failure, timed_stage
+
+logger = logging.getLogger(__name__)
 
 def generate_questions_from_text(text, chapter_id, exam_id):
     """Generates questions from a given text using an AI model."""
-    from ..models import db, Question, Chapter, Exam # Defer import
+    from ..models import db # Defer import
+    from ..services.question_store import bulk_insert_questions
 
     try:
         client = get_anthropic_client()
@@ -31,33 +35,27 @@ Format your response as a list of questions, like this:
 - 6
 """
 
-        message = client.messages.create(
-            model="claude-3-haiku-20240307",
-            max_tokens=1024,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
+        with timed_stage('generate_questions'):
+            message = client.messages.create(
+                model="claude-3-haiku-20240307",
+                max_tokens=1024,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ]
+            )
 
         generated_text = message.content[0].text
         questions_data = parse_generated_questions(generated_text)
 
-        for q_data in questions_data:
-            question = Question(
-                text=q_data['text'],
-                options=q_data['options'],
-                correct_answer=q_data['correct_answer'],
-                chapter_id=chapter_id,
-                exam_id=exam_id
-            )
-            db.session.add(question)
-        
+        # Drop questions the model left without a marked answer, then insert the rest in one statement
+        questions_data = [q for q in questions_data if q['correct_answer'] in q['options']]
+        bulk_insert_questions(exam_id, questions_data, chapter_id=chapter_id)
         db.session.commit()
         return questions_data
 
     except Exception as e:
-        # In a real app, you'd want more robust error handling and logging
-        print(f"Error generating questions: {e}")
+        logger.warning('Question generation failed: %s', e)
+        record_failure('generate_questions')
         return []
 
 def parse_generated_questions(text):
@@ -0,0 +1,114 @@
+import mimetypes
+import os
+import re
+from datetime import datetime, timezone
+from flask import Response, current_app, request
+from werkzeug.http import http_date, quote_etag
+from werkzeug.wsgi import wrap_file
+from .compression import COMPRESSIBLE_MIMETYPES, brotli, brotli_compress, gzip_compress, negotiate
+
+# Vite writes build output as assets/<name>-<content hash>.<ext>, so those URLs never change content
+HASHED_ASSET = re.compile(r'(^|/)assets/.+-[A-Za-z0-9_-]{8,}\.[a-z0-9]+$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+VARIANT_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+class StaticFile:
+    __slots__ = ('path', 'size', 'mtime', 'etag', 'mimetype', 'cache_control', 'variants')
+
+    def __init__(self, path, size, mtime, mimetype, cache_control):
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.etag = f'{int(mtime):x}-{size:x}'
+        self.mimetype = mimetype
+        self.cache_control = cache_control
+        self.variants = {} # encoding -> (path, size)
+
+class StaticManifest:
+    """
+    An index of the built frontend, taken once at startup.
+
+    Requests are answered from this index alone: the only filesystem access
+    per request is opening the file being sent (none with X-Sendfile).
+    """
+
+    def __init__(self, root, precompress=True):
+        self.root = root
+        self.files = {}
+        if root and os.path.isdir(root):
+            self._scan(precompress)
+
+    def _scan(self, precompress):
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith(('.br', '.gz')):
+                    continue
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, self.root).replace(os.sep, '/')
+                stat = os.stat(path)
+                mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+                cache_control = IMMUTABLE if HASHED_ASSET.search(name) else REVALIDATE
+                entry = StaticFile(path, stat.st_size, stat.st_mtime, mimetype, cache_control)
+                if mimetype in COMPRESSIBLE_MIMETYPES or mimetype.startswith('text/'):
+                    self._add_variants(entry, precompress)
+                self.files[name] = entry
+
+    def _add_variants(self, entry, precompress):
+        for encoding, suffix in VARIANT_SUFFIXES.items():
+            variant_path = entry.path + suffix
+            if not os.path.exists(variant_path) and precompress:
+                self._write_variant(entry.path, variant_path, encoding)
+            if os.path.exists(variant_path):
+                size = os.path.getsize(variant_path)
+                if size < entry.size:
+                    entry.variants[encoding] = (variant_path, size)
+
+    @staticmethod
+    def _write_variant(source, target, encoding):
+        if encoding == 'br' and brotli is None:
+            return
+        try:
+            with open(source, 'rb') as f:
+                data = f.read()
+            data = brotli_compress(data) if encoding == 'br' else gzip_compress(data)
+            # Several workers may build the manifest at once, so write atomically
+            temporary = f'{target}.{os.getpid()}.tmp'
+            with open(temporary, 'wb') as f:
+                f.write(data)
+            os.replace(temporary, target)
+        except OSError:
+            pass # A read-only static folder just means no precompressed variant
+
+    def get(self, name):
+        return self.files.get(name)
+
+    def send(self, entry):
+        """Builds the response for a manifest entry, honouring If-None-Match and Accept-Encoding."""
+        encoding = negotiate(list(entry.variants))
+        etag = f'{entry.etag}-{encoding}' if encoding else entry.etag
+
+        headers = {
+            'ETag': quote_etag(etag),
+            'Last-Modified': http_date(datetime.fromtimestamp(entry.mtime, tz=timezone.utc)),
+            'Cache-Control': entry.cache_control,
+        }
+        if entry.variants:
+            headers['Vary'] = 'Accept-Encoding'
+        if etag in request.if_none_match:
+            return Response(status=304, headers=headers)
+
+        path, size = entry.variants[encoding] if encoding else (entry.path, entry.size)
+        if encoding:
+            headers['Content-Encoding'] = encoding
+
+        if current_app.config.get('USE_X_SENDFILE'):
+            # The front-end server (nginx, Apache) streams the file itself
+            response = Response(mimetype=entry.mimetype, headers=headers)
+            response.headers['X-Sendfile'] = path
+        else:
+            # wsgi.file_wrapper lets the server use sendfile() where it can
+            response = Response(wrap_file(request.environ, open(path, 'rb')),
+                                mimetype=entry.mimetype, headers=headers, direct_passthrough=True)
+        response.content_length = size
+        return response
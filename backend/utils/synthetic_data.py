@@ -0,0 +1,99 @@
+import json
+import random
+from datetime import datetime, timedelta
+from itertools import islice
+
+WORDS = (
+    'algorithm analysis array binary boolean cache class compiler complexity data database '
+    'derivative entropy equation function gradient graph hash heap integral interface kernel '
+    'lambda lattice logic matrix memory network node object operator optimization parser pointer '
+    'probability process protocol proof queue recursion register regression schema semantic set '
+    'signal stack state system theorem thread topology tree type variable vector'
+).split()
+
+def random_sentence(rng, min_words=6, max_words=16):
+    words = rng.choices(WORDS, k=rng.randint(min_words, max_words))
+    return ' '.join(words).capitalize() + '.'
+
+def random_paragraph(rng, sentences=5):
+    return ' '.join(random_sentence(rng) for _ in range(sentences))
+
+def random_timestamp(rng, now, days=180):
+    return now - timedelta(seconds=rng.randint(0, days * 86400))
+
+def next_id(table):
+    """Returns the first free primary key so ids can be assigned up front instead of read back."""
+    from ..extensions import db
+    return (db.session.query(db.func.max(table.c.id)).scalar() or 0) + 1
+
+def bulk_insert(table, rows, batch_size):
+    """
+    Inserts rows from an iterator with one executemany per batch.
+
+    Only one batch is held in memory at a time, so arbitrarily large row counts
+    can be streamed in.
+
+    Returns:
+        int: The number of rows inserted.
+    """
+    from ..extensions import db
+
+    rows = iter(rows)
+    total = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return total
+        db.session.execute(table.insert(), batch)
+        db.session.commit()
+        total += len(batch)
+
+def build_artifact_bodies(rng, count):
+    """
+    Stores a pool of distinct artifact bodies and returns their blob hashes.
+
+    Generated artifacts are mostly near-identical fallback components, so
+    seeded artifacts reference a small pool of bodies the way real ones do.
+    """
+    from ..extensions import db
+    from ..cli import get_fallback_study_guide_code
+    from ..services.artifact_blobs import put_blob
+
+    hashes = []
+    for i in range(count):
+        body = get_fallback_study_guide_code(f'Lecture {i}', random_paragraph(rng, sentences=40))
+        hashes.append(put_blob(body).hash)
+    db.session.commit()
+    return hashes
+
+def random_exam_questions(rng, count):
+    questions = []
+    for _ in range(count):
+        options = [random_sentence(rng, 2, 5) for _ in range(4)]
+        questions.append({
+            'question_text': random_sentence(rng).rstrip('.') + '?',
+            'options': options,
+            'answer_index': rng.randrange(4)
+        })
+    return questions
+
+def write_synthetic_pdf(path, pages, rng, pages_per_chapter=20):
+    """
+    Writes a text PDF with chapter headings every `pages_per_chapter` pages.
+
+    The headings follow the patterns recognised by the chapter splitter, so the
+    file exercises the whole extraction pipeline.
+    """
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    for page_number in range(pages):
+        page = doc.new_page()
+        lines = []
+        if page_number % pages_per_chapter == 0:
+            lines.append(f'Chapter {page_number // pages_per_chapter + 1}: {random_sentence(rng, 2, 4)}')
+        while len(lines) < 45:
+            lines.append(random_sentence(rng, 8, 12))
+        page.insert_text((50, 60), '\n'.join(lines), fontsize=9)
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
@@ -0,0 +1,99 @@
+import hashlib
+import io
+import os
+import tempfile
+from flask import Request, current_app
+
+# Upload bodies are kept in memory up to this size and spooled to disk beyond it,
+# so a worker holds at most this much of any one upload.
+DEFAULT_SPOOL_THRESHOLD = 1024 * 1024
+DEFAULT_MAX_UPLOAD_MB = 250
+
+class HashingSpool(io.RawIOBase):
+    """
+    A write-then-read buffer for one uploaded file that hashes what is written to it.
+
+    Starts in memory and moves to a named temporary file once it passes
+    `threshold` bytes. The form parser writes the part to it as it arrives
+    from the socket, so by the time the view runs the SHA-256 and size are
+    already known and the body never has to be read into memory again.
+    """
+
+    def __init__(self, threshold=DEFAULT_SPOOL_THRESHOLD, directory=None):
+        super().__init__()
+        self.threshold = threshold
+        self.directory = directory
+        self.size = 0
+        self.path = None # Set once spooled to disk
+        self._sha256 = hashlib.sha256()
+        self._file = io.BytesIO()
+
+    @property
+    def sha256(self):
+        return self._sha256.hexdigest()
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def write(self, data):
+        self._sha256.update(data)
+        self.size += len(data)
+        if self.path is None and self._file.tell() + len(data) > self.threshold:
+            self._roll_over()
+        return self._file.write(data)
+
+    def _roll_over(self):
+        spooled = tempfile.NamedTemporaryFile(prefix='upload-', suffix='.part', dir=self.directory, delete=False)
+        spooled.write(self._file.getbuffer())
+        self._file = spooled
+        self.path = spooled.name
+
+    def read(self, size=-1):
+        return self._file.read(size)
+
+    def readinto(self, buffer):
+        return self._file.readinto(buffer)
+
+    def readline(self, size=-1):
+        return self._file.readline(size)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._file.seek(offset, whence)
+
+    def tell(self):
+        return self._file.tell()
+
+    def flush(self):
+        self._file.flush()
+
+    def getvalue(self):
+        """The whole body, for uploads small enough to have stayed in memory."""
+        if self.path is not None:
+            raise ValueError('Upload was spooled to disk; read it from `path`')
+        return self._file.getvalue()
+
+    def close(self):
+        if self.closed:
+            return
+        super().close() # Flushes first
+        self._file.close()
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+class UploadRequest(Request):
+    """Request class whose multipart file parts stream into HashingSpool buffers."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return HashingSpool(
+            current_app.config.get('UPLOAD_SPOOL_THRESHOLD', DEFAULT_SPOOL_THRESHOLD),
+            current_app.config.get('UPLOAD_SPOOL_DIR'),
+        )
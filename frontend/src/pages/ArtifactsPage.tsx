@@ -7,12 +7,14 @@ import ArtifactRenderer from '@/components/ArtifactRenderer';
 
 interface Artifact {
   id: string;
-  title: string;
   type: string;
-  content: string;
+  content?: string;
   created_at: string;
 }
 
+// The multi-get accepts at most this many ids per request
+const MAX_ARTIFACTS_PER_REQUEST = 100;
+
 const ArtifactsPage: React.FC = () => {
   const { lectureId } = useParams<{ lectureId: string }>();
   const navigate = useNavigate();
@@ -23,6 +25,26 @@ const ArtifactsPage: React.FC = () => {
   const [error, setError] = useState<string | null>(null);
   const [isGenerating, setIsGenerating] = useState(false);
   const [isFetchingContent, setIsFetchingContent] = useState(false);
+  // Code bodies loaded through the multi-get, by artifact id
+  const [contents, setContents] = useState<Record<string, string>>({});
+
+  const fetchContents = async (ids: string[]): Promise<Record<string, string>> => {
+    const response = await fetch(`/api/artifacts?ids=${ids.join(',')}&fields=id,content`, {
+      headers: {
+        'Authorization': `Bearer ${localStorage.getItem('token')}`
+      }
+    });
+    if (!response.ok) {
+      throw new Error('Failed to fetch artifact content');
+    }
+    const data = await response.json();
+    const fetched: Record<string, string> = {};
+    for (const artifact of data.artifacts as Artifact[]) {
+      fetched[artifact.id] = artifact.content ?? '';
+    }
+    setContents(prev => ({ ...prev, ...fetched }));
+    return fetched;
+  };
 
   const fetchArtifacts = async (): Promise<Artifact[] | undefined> => {
     if (!lectureId) return;
@@ -103,22 +125,22 @@ const ArtifactsPage: React.FC = () => {
     }
   };
 
-  const handleSelectArtifact = async (artifact: Artifact) => {
+  const handleSelectArtifact = async (artifact: Artifact, known: Record<string, string> = contents) => {
     if (selectedArtifact?.id === artifact.id) return;
 
+    if (artifact.id in known) {
+      setSelectedArtifact({ ...artifact, content: known[artifact.id] });
+      return;
+    }
+
     setIsFetchingContent(true);
     setError(null);
     try {
-      const response = await fetch(`/api/artifacts/${artifact.id}`, {
-        headers: {
-          'Authorization': `Bearer ${localStorage.getItem('token')}`
-        }
-      });
-      if (!response.ok) {
+      const fetched = await fetchContents([artifact.id]);
+      if (!(artifact.id in fetched)) {
         throw new Error('Failed to fetch artifact content');
       }
-      const fullArtifact = await response.json();
-      setSelectedArtifact(fullArtifact.artifact);
+      setSelectedArtifact({ ...artifact, content: fetched[artifact.id] });
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to load artifact content');
       setSelectedArtifact(null); 
@@ -129,10 +151,19 @@ const ArtifactsPage: React.FC = () => {
 
   useEffect(() => {
     if (lectureId) {
-      fetchArtifacts().then((initialArtifacts) => {
-        if (initialArtifacts && initialArtifacts.length > 0) {
-          handleSelectArtifact(initialArtifacts[0]);
+      fetchArtifacts().then(async (initialArtifacts) => {
+        if (!initialArtifacts || initialArtifacts.length === 0) return;
+        // One request for the bodies of the whole first page, so switching between them is instant
+        let known: Record<string, string> = {};
+        setIsFetchingContent(true);
+        try {
+          known = await fetchContents(initialArtifacts.slice(0, MAX_ARTIFACTS_PER_REQUEST).map(a => a.id));
+        } catch (err) {
+          setError(err instanceof Error ? err.message : 'Failed to load artifact content');
+        } finally {
+          setIsFetchingContent(false);
         }
+        handleSelectArtifact(initialArtifacts[0], known);
       });
     }
   }, [lectureId]);
@@ -213,8 +244,7 @@ const ArtifactsPage: React.FC = () => {
                     >
                       <div className="flex items-start justify-between">
                         <div>
-                          <h3 className="font-medium text-white">{artifact.title}</h3>
-                          <p className="text-sm text-slate-400 capitalize">{artifact.type.replace(/_/g, ' ')}</p>
+                          <h3 className="font-medium text-white capitalize">{artifact.type.replace(/_/g, ' ')}</h3>
                           <p className="text-xs text-slate-500 mt-1">
                             {new Date(artifact.created_at).toLocaleDateString('de-DE')}
                           </p>
@@ -247,8 +277,8 @@ const ArtifactsPage: React.FC = () => {
             ) : selectedArtifact ? (
               <ArtifactRenderer
                 key={selectedArtifact.id}
-                reactCode={selectedArtifact.content}
-                title={selectedArtifact.title}
+                reactCode={selectedArtifact.content ?? ''}
+                title={selectedArtifact.type.replace(/_/g, ' ')}
                 type={selectedArtifact.type}
                 onError={(message) => setError(message)}
               />
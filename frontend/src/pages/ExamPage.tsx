@@ -33,7 +33,7 @@ interface Question {
 interface Exam {
     id: number;
     title: string;
-    pdf_id: number;
+    lecture_id: number;
 }
 
 interface Chapter {
@@ -44,10 +44,10 @@ interface Chapter {
 // Dummy data for testing when backend is not available
 const getDummyExamData = (examId: string) => {
   const exams = {
-    '1': { id: 1, title: 'ML Fundamentals Quiz', pdf_id: 1 },
-    '2': { id: 2, title: 'Algorithm Comparison Test', pdf_id: 1 },
-    '3': { id: 3, title: 'React Patterns Assessment', pdf_id: 2 },
-    '4': { id: 4, title: 'Database Design Quiz', pdf_id: 3 }
+    '1': { id: 1, title: 'ML Fundamentals Quiz', lecture_id: 1 },
+    '2': { id: 2, title: 'Algorithm Comparison Test', lecture_id: 1 },
+    '3': { id: 3, title: 'React Patterns Assessment', lecture_id: 2 },
+    '4': { id: 4, title: 'Database Design Quiz', lecture_id: 3 }
   };
 
   const questions = {
@@ -93,7 +93,7 @@ const getDummyExamData = (examId: string) => {
 
   const exam = exams[examId as keyof typeof exams] || null;
   const examQuestions = questions[examId as keyof typeof questions] || [];
-  const examChapters = exam ? chapters[exam.pdf_id.toString() as keyof typeof chapters] || [] : [];
+  const examChapters = exam ? chapters[exam.lecture_id.toString() as keyof typeof chapters] || [] : [];
 
   return { exam, questions: examQuestions, chapters: examChapters };
 };
@@ -133,8 +133,8 @@ const ExamPage = () => {
           setExam(examData);
           setQuestions(questionsData);
 
-          if (examData.pdf_id) {
-            const chaptersResponse = await fetch(`http://localhost:5001/api/lectures/${examData.pdf_id}/chapters`, {
+          if (examData.lecture_id) {
+            const chaptersResponse = await fetch(`http://localhost:5001/api/lectures/${examData.lecture_id}/chapters`, {
               headers: { Authorization: `Bearer ${token}` },
             });
             if (chaptersResponse.ok) {
@@ -28,7 +28,6 @@ interface Exam {
 
 interface Artifact {
   id: number;
-  title: string;
   type: string;
   created_at: string;
 }
@@ -58,29 +57,21 @@ const LecturePage = () => {
 
       setLoading(true);
       try {
-        const responses = await Promise.all([
-          fetch(`/api/lectures/${id}`, { headers: { Authorization: `Bearer ${token}` } }),
-          fetch(`/api/lectures/${id}/chapters`, { headers: { Authorization: `Bearer ${token}` } }),
-          fetch(`/api/lectures/${id}/exams`, { headers: { Authorization: `Bearer ${token}` } }),
-          fetch(`/api/artifacts/pdf/${id}`, { headers: { Authorization: `Bearer ${token}` } })
-        ]);
-
-        const allOk = responses.every(res => res.ok);
-        if (!allOk) {
-          for (const res of responses) {
-              if (!res.ok) {
-                  console.error(`Request to ${res.url} failed with status ${res.status}`);
-              }
-          }
-          throw new Error('One or more API requests failed. Check network tab for details.');
+        // One request for the whole page: lecture, chapters, exams and the artifact list (without code)
+        const response = await fetch(
+          `/api/lectures/${id}/bundle?artifact_fields=id,type,created_at`,
+          { headers: { Authorization: `Bearer ${token}` } }
+        );
+        if (!response.ok) {
+          throw new Error(`Request to ${response.url} failed with status ${response.status}`);
         }
 
-        const [lectureData, chaptersData, examsData, artifactsResponse] = await Promise.all(responses.map(res => res.json()));
+        const bundle = await response.json();
         
-        setLecture(lectureData.lecture || lectureData);
-        setChapters(chaptersData.chapters || []);
-        setExams(examsData.exams || []);
-        setArtifacts(artifactsResponse.artifacts || []);
+        setLecture(bundle.lecture);
+        setChapters(bundle.chapters || []);
+        setExams(bundle.exams || []);
+        setArtifacts(bundle.artifacts || []);
 
       } catch (err: any) {
         console.error('Failed to fetch lecture details:', err);
@@ -162,8 +153,8 @@ const LecturePage = () => {
                   {artifacts.map((artifact) => (
                     <li key={artifact.id} className="flex justify-between items-center p-3 bg-gray-700/50 rounded-md">
                       <div>
-                        <p className="font-semibold">{artifact.title}</p>
-                        <p className="text-xs text-gray-400">Type: {artifact.type.replace('_', ' ')}</p>
+                        <p className="font-semibold capitalize">{artifact.type.replace(/_/g, ' ')}</p>
+                        <p className="text-xs text-gray-400">{new Date(artifact.created_at).toLocaleDateString()}</p>
                       </div>
                       <Link to={`/artifacts/${id}`}>
                         <Button size="sm" className="bg-purple-600 hover:bg-purple-700">View Artifact</Button>
@@ -0,0 +1,49 @@
+"""Add incrementally maintained exam analytics tables
+
+Revision ID: 3b9e6f1d7a24
+Revises: e81b5d3c0f92
+Create Date: 2026-10-19 14:21:50.662190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b9e6f1d7a24'
+down_revision = 'e81b5d3c0f92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('exam_analytics',
+    sa.Column('exam_id', sa.Integer(), nullable=False),
+    sa.Column('attempt_count', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Float(), nullable=False),
+    sa.Column('score_sum_sq', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['exam_id'], ['exam.id'], ),
+    sa.PrimaryKeyConstraint('exam_id')
+    )
+    op.create_table('exam_score_bucket',
+    sa.Column('exam_id', sa.Integer(), nullable=False),
+    sa.Column('bucket', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['exam_id'], ['exam.id'], ),
+    sa.PrimaryKeyConstraint('exam_id', 'bucket')
+    )
+    op.create_table('question_option_count',
+    sa.Column('exam_id', sa.Integer(), nullable=False),
+    sa.Column('question_index', sa.Integer(), nullable=False),
+    sa.Column('option_index', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['exam_id'], ['exam.id'], ),
+    sa.PrimaryKeyConstraint('exam_id', 'question_index', 'option_index')
+    )
+
+
+def downgrade():
+    op.drop_table('question_option_count')
+    op.drop_table('exam_score_bucket')
+    op.drop_table('exam_analytics')
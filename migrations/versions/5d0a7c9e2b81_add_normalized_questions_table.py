@@ -0,0 +1,77 @@
+"""Move exam questions into their own table
+
+Revision ID: 5d0a7c9e2b81
+Revises: 3b9e6f1d7a24
+Create Date: 2026-10-19 15:02:11.384950
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d0a7c9e2b81'
+down_revision = '3b9e6f1d7a24'
+branch_labels = None
+depends_on = None
+
+
+def _answer_index(question):
+    options = question.get('options') or []
+    answer = question.get('correct_answer', question.get('answer'))
+    if isinstance(answer, int) and not isinstance(answer, bool) and 0 <= answer < len(options):
+        return answer
+    if answer in options:
+        return options.index(answer)
+    return None
+
+
+def upgrade():
+    questions = op.create_table('questions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('exam_id', sa.Integer(), nullable=False),
+    sa.Column('chapter_id', sa.Integer(), nullable=True),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('question_text', sa.Text(), nullable=False),
+    sa.Column('options', sa.JSON(), nullable=False),
+    sa.Column('answer_index', sa.SmallInteger(), nullable=False),
+    sa.Column('explanation', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['exam_id'], ['exam.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('exam_id', 'position', name='uq_questions_exam_id_position')
+    )
+    with op.batch_alter_table('exam', schema=None) as batch_op:
+        batch_op.alter_column('questions', existing_type=sa.TEXT(), nullable=True)
+
+    # Copy the existing JSON question lists into rows; questions without a usable answer are skipped.
+    connection = op.get_bind()
+    exams = connection.execute(sa.text("SELECT id, questions FROM exam WHERE questions IS NOT NULL"))
+    for exam_id, raw in exams.fetchall():
+        try:
+            parsed = json.loads(raw)
+        except (TypeError, ValueError):
+            continue
+        rows = []
+        for question in parsed if isinstance(parsed, list) else []:
+            index = _answer_index(question)
+            if index is None:
+                continue
+            rows.append({
+                'exam_id': exam_id,
+                'position': len(rows) + 1,
+                'question_text': question.get('question_text') or question.get('question') or question.get('text') or '',
+                'options': question['options'],
+                'answer_index': index,
+                'explanation': question.get('explanation')
+            })
+        if rows:
+            op.bulk_insert(questions, rows)
+
+
+def downgrade():
+    with op.batch_alter_table('exam', schema=None) as batch_op:
+        batch_op.alter_column('questions', existing_type=sa.TEXT(), nullable=False)
+
+    op.drop_table('questions')
@@ -0,0 +1,28 @@
+"""Add precompressed HTTP encodings to artifact blobs
+
+Revision ID: 8f2c4a6e1d53
+Revises: 5d0a7c9e2b81
+Create Date: 2026-10-19 15:48:36.210775
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f2c4a6e1d53'
+down_revision = '5d0a7c9e2b81'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('artifact_blob', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('gzip_data', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('br_data', sa.LargeBinary(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('artifact_blob', schema=None) as batch_op:
+        batch_op.drop_column('br_data')
+        batch_op.drop_column('gzip_data')
@@ -0,0 +1,49 @@
+"""Add foreign key and access pattern indexes
+
+Revision ID: a7c2e9d4b610
+Revises: 1f3d76f0789e
+Create Date: 2026-10-19 10:12:41.118402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c2e9d4b610'
+down_revision = '1f3d76f0789e'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns). The legacy pdf-era tables, including the old
+# `questions` table, are all dropped by the initial migration, so only the
+# current tables are indexed here. The new `questions` table is created by
+# 5d0a7c9e2b81 together with its unique (exam_id, position) index.
+INDEXES = [
+    ('ix_lecture_user_id', 'lecture', ['user_id']),
+    ('ix_artifact_lecture_id_created_at', 'artifact', ['lecture_id', 'created_at']),
+    ('ix_artifact_user_id', 'artifact', ['user_id']),
+    ('ix_exam_lecture_id_created_at', 'exam', ['lecture_id', 'created_at']),
+    ('ix_exam_user_id', 'exam', ['user_id']),
+    ('ix_exam_attempt_exam_id', 'exam_attempt', ['exam_id']),
+    ('ix_exam_attempt_user_id', 'exam_attempt', ['user_id']),
+]
+
+
+def _existing_tables():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade():
+    tables = _existing_tables()
+    for name, table, columns in INDEXES:
+        if table in tables:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    tables = _existing_tables()
+    for name, table, columns in reversed(INDEXES):
+        if table in tables:
+            op.drop_index(name, table_name=table)
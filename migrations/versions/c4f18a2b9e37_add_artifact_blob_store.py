@@ -0,0 +1,83 @@
+"""Add compressed, content-addressed artifact blob store
+
+Revision ID: c4f18a2b9e37
+Revises: a7c2e9d4b610
+Create Date: 2026-10-19 11:40:03.527716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4f18a2b9e37'
+down_revision = 'a7c2e9d4b610'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+    # Databases built with create_all after this revision already have these
+    if 'artifact_dictionary' not in tables:
+        op.create_table('artifact_dictionary',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'artifact_blob' not in tables:
+        op.create_table('artifact_blob',
+        sa.Column('hash', sa.String(length=64), nullable=False),
+        sa.Column('dictionary_id', sa.Integer(), nullable=True),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['dictionary_id'], ['artifact_dictionary.id'], ),
+        sa.PrimaryKeyConstraint('hash')
+        )
+    if 'blob_hash' not in [column['name'] for column in inspector.get_columns('artifact')]:
+        with op.batch_alter_table('artifact', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('blob_hash', sa.String(length=64), nullable=True))
+            batch_op.alter_column('content', existing_type=sa.TEXT(), nullable=True)
+            batch_op.create_index('ix_artifact_blob_hash', ['blob_hash'], unique=False)
+            batch_op.create_foreign_key('fk_artifact_blob_hash', 'artifact_blob', ['blob_hash'], ['hash'])
+
+
+def _unpack_artifact_bodies():
+    # Packed artifacts have no inline content, so their bodies are decompressed
+    # back into artifact.content before the column becomes NOT NULL again.
+    # Blobs are plain zlib streams, optionally primed with a stored dictionary.
+    import zlib
+
+    connection = op.get_bind()
+    dictionaries = dict(connection.execute(sa.text('SELECT id, data FROM artifact_dictionary')).fetchall())
+    rows = connection.execute(sa.text(
+        'SELECT artifact.id, artifact_blob.data, artifact_blob.dictionary_id FROM artifact '
+        'JOIN artifact_blob ON artifact_blob.hash = artifact.blob_hash WHERE artifact.content IS NULL'
+    )).fetchall()
+    for artifact_id, data, dictionary_id in rows:
+        if dictionary_id is None:
+            decompressor = zlib.decompressobj()
+        else:
+            decompressor = zlib.decompressobj(zdict=dictionaries[dictionary_id])
+        content = (decompressor.decompress(data) + decompressor.flush()).decode('utf-8')
+        connection.execute(sa.text('UPDATE artifact SET content = :content WHERE id = :id'),
+                           {'content': content, 'id': artifact_id})
+
+    orphaned = connection.execute(sa.text('SELECT COUNT(*) FROM artifact WHERE content IS NULL')).scalar()
+    if orphaned:
+        raise RuntimeError(f'{orphaned} artifacts have neither inline content nor a blob; fix them before downgrading')
+
+
+def downgrade():
+    _unpack_artifact_bodies()
+    with op.batch_alter_table('artifact', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_artifact_blob_hash', type_='foreignkey')
+        batch_op.drop_index('ix_artifact_blob_hash')
+        batch_op.alter_column('content', existing_type=sa.TEXT(), nullable=False)
+        batch_op.drop_column('blob_hash')
+
+    op.drop_table('artifact_blob')
+    op.drop_table('artifact_dictionary')
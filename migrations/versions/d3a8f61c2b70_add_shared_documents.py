@@ -0,0 +1,84 @@
+"""Add content-addressed documents shared by lectures, and processing jobs
+
+Revision ID: d3a8f61c2b70
+Revises: 8f2c4a6e1d53
+Create Date: 2026-10-19 21:14:37.208415
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a8f61c2b70'
+down_revision = '8f2c4a6e1d53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+    # Databases built with create_all after this revision already have these
+    if 'document' not in tables:
+        op.create_table('document',
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('file_path', sa.String(length=1024), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False),
+        sa.Column('text_content', sa.Text(), nullable=True),
+        sa.Column('chapters', sa.JSON(), nullable=True),
+        sa.Column('analysis', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('sha256')
+        )
+    if 'document_artifact' not in tables:
+        op.create_table('document_artifact',
+        sa.Column('document_hash', sa.String(length=64), nullable=False),
+        sa.Column('artifact_type', sa.String(length=50), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('blob_hash', sa.String(length=64), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['document_hash'], ['document.sha256'], ),
+        sa.ForeignKeyConstraint(['blob_hash'], ['artifact_blob.hash'], ),
+        sa.PrimaryKeyConstraint('document_hash', 'artifact_type', 'title')
+        )
+        op.create_index('ix_document_artifact_blob_hash', 'document_artifact', ['blob_hash'], unique=False)
+    if 'document_hash' not in [column['name'] for column in inspector.get_columns('lecture')]:
+        with op.batch_alter_table('lecture', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('document_hash', sa.String(length=64), nullable=True))
+            batch_op.create_index('ix_lecture_document_hash', ['document_hash'], unique=False)
+            batch_op.create_foreign_key('fk_lecture_document_hash', 'document', ['document_hash'], ['sha256'])
+    if 'processing_jobs' not in tables:
+        op.create_table('processing_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('lecture_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('job_type', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('progress', sa.Integer(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('result_data', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['lecture_id'], ['lecture.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_processing_jobs_lecture_id', 'processing_jobs', ['lecture_id'], unique=False)
+        op.create_index('ix_processing_jobs_user_id', 'processing_jobs', ['user_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_processing_jobs_user_id', table_name='processing_jobs')
+    op.drop_index('ix_processing_jobs_lecture_id', table_name='processing_jobs')
+    op.drop_table('processing_jobs')
+
+    with op.batch_alter_table('lecture', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_lecture_document_hash', type_='foreignkey')
+        batch_op.drop_index('ix_lecture_document_hash')
+        batch_op.drop_column('document_hash')
+
+    op.drop_index('ix_document_artifact_blob_hash', table_name='document_artifact')
+    op.drop_table('document_artifact')
+    op.drop_table('document')
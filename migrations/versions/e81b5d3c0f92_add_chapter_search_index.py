@@ -0,0 +1,33 @@
+"""Add FTS5 chapter search index
+
+Revision ID: e81b5d3c0f92
+Revises: c4f18a2b9e37
+Create Date: 2026-10-19 13:05:27.904417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e81b5d3c0f92'
+down_revision = 'c4f18a2b9e37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 virtual tables only exist on SQLite; other databases run without search.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS chapter_search USING fts5("
+        "title, content, owner, lecture_id UNINDEXED, chapter_index UNINDEXED, "
+        "tokenize='porter unicode61')"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TABLE IF EXISTS chapter_search")
@@ -0,0 +1,84 @@
+import os
+from contextlib import contextmanager
+
+import pytest
+
+# create_app reads its configuration from the environment
+os.environ.setdefault('JWT_SECRET_KEY', 'test-secret-key-that-is-long-enough-for-hs256')
+os.environ.setdefault('SUPABASE_URL', 'http://supabase.invalid')
+os.environ.setdefault('SUPABASE_KEY', 'test-key')
+os.environ.setdefault('BCRYPT_LOG_ROUNDS', '4')
+os.environ['AUTH_DEV_BYPASS'] = '0'
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setenv('PDF_CACHE_DIR', str(tmp_path / 'pdf-cache'))
+    from backend import create_app
+    from backend.extensions import db
+    from backend.services import artifact_blobs
+    from backend.services.identity_cache import identity_cache
+    from backend.services.progress_writer import progress_writer
+
+    app = create_app()
+    app.config['TESTING'] = True
+    identity_cache.clear()
+    artifact_blobs._dictionary_cache.clear() # Ids restart with every database
+    with app.app_context():
+        db.create_all()
+        yield app
+        progress_writer.flush() # Before its tables are dropped
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def make_user(app):
+    from flask_jwt_extended import create_access_token
+    from backend.extensions import db
+    from backend.models import User
+
+    def make_user(username='alice'):
+        user = User(username=username, password='unused')
+        db.session.add(user)
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+        return user, headers
+    return make_user
+
+@pytest.fixture
+def count_queries(app):
+    """
+    Counts the SQL statements run inside a block:
+
+        with count_queries() as queries:
+            ...
+        assert queries.count == 1
+    """
+    from sqlalchemy import event
+    from backend.extensions import db
+
+    class Counter:
+        def __init__(self):
+            self.statements = []
+
+        @property
+        def count(self):
+            return len(self.statements)
+
+    @contextmanager
+    def count_queries():
+        counter = Counter()
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            counter.statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            yield counter
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+    return count_queries
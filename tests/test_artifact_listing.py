@@ -0,0 +1,112 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+def _seed(make_user, count, artifact_type='summary', inline=False):
+    from backend.extensions import db
+    from backend.models import Artifact, Lecture
+
+    user, headers = make_user()
+    lecture = Lecture(user_id=user.id, title='Physics', file_path='documents/x.pdf')
+    db.session.add(lecture)
+    db.session.flush()
+    start = datetime(2026, 1, 1)
+    rows = []
+    for i in range(count):
+        artifact = Artifact(
+            lecture_id=lecture.id, user_id=user.id, artifact_type=artifact_type,
+            created_at=start + timedelta(seconds=i)
+        )
+        if inline:
+            artifact._content = f'<div>{i}</div>' * 50
+        else:
+            artifact.content = f'<div>{i}</div>' * 50
+        rows.append(artifact)
+    db.session.add_all(rows)
+    db.session.commit()
+    return lecture, headers
+
+def _selects_body(statement):
+    statement = statement.lower()
+    return 'artifact.content' in statement or 'artifact_blob.data' in statement
+
+def test_listing_pages_through_lecture_artifacts(client, make_user):
+    lecture, headers = _seed(make_user, 5)
+
+    seen = []
+    cursor = None
+    while True:
+        url = f'/api/artifacts/pdf/{lecture.id}?limit=2&fields=id,type,lecture_id,size'
+        if cursor:
+            url += f'&cursor={cursor}'
+        data = client.get(url, headers=headers).get_json()
+        seen.extend(data['artifacts'])
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+
+    assert len(seen) == 5
+    assert len({a['id'] for a in seen}) == 5
+    assert all(a['type'] == 'summary' and a['lecture_id'] == lecture.id for a in seen)
+    assert all(a['size'] == len('<div>0</div>' * 50) for a in seen[:1])
+    assert client.get(f'/api/artifacts/pdf/{lecture.id + 1}', headers=headers).get_json()['artifacts'] == []
+
+def test_listing_rejects_unknown_fields(client, make_user):
+    lecture, headers = _seed(make_user, 1)
+    response = client.get(f'/api/artifacts/pdf/{lecture.id}?fields=id,title', headers=headers)
+    assert response.status_code == 400
+
+def test_inline_artifacts_have_no_size(client, make_user):
+    lecture, headers = _seed(make_user, 1, inline=True)
+    data = client.get(f'/api/artifacts/pdf/{lecture.id}?fields=id,size', headers=headers).get_json()
+    assert data['artifacts'][0]['size'] is None
+
+@pytest.mark.benchmark
+def test_listing_benchmark_never_loads_bodies(app, make_user, count_queries):
+    """A page of a lecture with thousands of artifacts reads only the listed columns."""
+    from backend.routes.artifacts import list_artifact_page
+
+    lecture, _ = _seed(make_user, 3000)
+    lecture_id = lecture.id
+
+    with count_queries() as queries:
+        started = time.perf_counter()
+        cursor, pages = None, 0
+        while True:
+            rows, cursor = list_artifact_page(lecture_id, ['id', 'type', 'created_at', 'size'], cursor=cursor, limit=200)
+            pages += 1
+            if not cursor:
+                break
+        elapsed = time.perf_counter() - started
+
+    assert pages == 15
+    assert queries.count == pages
+    assert not any(_selects_body(statement) for statement in queries.statements)
+    print(f'\nlisted 3000 artifacts in {pages} pages: {elapsed * 1000:.1f}ms')
+
+def test_get_artifact_serves_content_with_etag(client, make_user):
+    from backend.models import Artifact
+
+    lecture, headers = _seed(make_user, 1)
+    artifact = Artifact.query.filter_by(lecture_id=lecture.id).one()
+
+    response = client.get(f'/api/artifacts/{artifact.id}', headers=headers)
+    assert response.status_code == 200
+    body = response.get_json()['artifact']
+    assert body['content'] == '<div>0</div>' * 50
+    assert (body['type'], body['lecture_id']) == ('summary', lecture.id)
+
+    etag = response.headers['ETag']
+    cached = client.get(f'/api/artifacts/{artifact.id}', headers=dict(headers, **{'If-None-Match': etag}))
+    assert cached.status_code == 304
+
+def test_get_inline_artifact(client, make_user):
+    from backend.models import Artifact
+
+    lecture, headers = _seed(make_user, 1, inline=True)
+    artifact = Artifact.query.filter_by(lecture_id=lecture.id).one()
+
+    response = client.get(f'/api/artifacts/{artifact.id}', headers=headers)
+    assert response.get_json()['artifact']['content'] == '<div>0</div>' * 50
+    assert client.get('/api/artifacts/999999', headers=headers).status_code == 404
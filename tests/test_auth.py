@@ -0,0 +1,106 @@
+import time
+
+import pytest
+
+def test_register_and_login_issue_a_usable_token(client):
+    assert client.post('/api/auth/register', json={'username': 'bob', 'password': 'pw'}).status_code == 201
+    assert client.post('/api/auth/register', json={'username': 'bob', 'password': 'pw'}).status_code == 409
+    assert client.post('/api/auth/login', json={'username': 'bob', 'password': 'nope'}).status_code == 401
+
+    token = client.post('/api/auth/login', json={'username': 'bob', 'password': 'pw'}).get_json()['access_token']
+    assert client.get('/api/lectures', headers={'Authorization': f'Bearer {token}'}).status_code == 200
+
+def test_routes_require_a_token_without_the_dev_bypass(client):
+    assert client.get('/api/lectures').status_code == 401
+    assert client.get('/api/lectures', headers={'Authorization': 'Bearer garbage'}).status_code == 401
+
+def test_dev_bypass_is_opt_in(app, client):
+    app.config['AUTH_DEV_BYPASS'] = True
+    assert client.get('/api/lectures').status_code == 200
+
+def test_identity_cache_serves_repeat_requests_without_a_user_query(app, client, make_user, count_queries):
+    from backend.models import User
+    from backend.services.identity_cache import identity_cache
+
+    user, headers = make_user()
+    client.get('/api/lectures', headers=headers)
+    misses = identity_cache.misses
+    with count_queries() as queries:
+        assert client.get('/api/lectures', headers=headers).status_code == 200
+    assert identity_cache.misses == misses
+    assert not any('FROM user' in statement for statement in queries.statements)
+
+    # Changing the user evicts the cached identity
+    user.username = 'renamed'
+    from backend.extensions import db
+    db.session.commit()
+    client.get('/api/lectures', headers=headers)
+    assert identity_cache.misses == misses + 1
+
+def test_deleted_user_is_rejected(client, make_user):
+    from backend.extensions import db
+    user, headers = make_user()
+    db.session.delete(user)
+    db.session.commit()
+    assert client.get('/api/lectures', headers=headers).status_code == 401
+
+@pytest.mark.benchmark
+def test_auth_overhead_benchmark(app, client, make_user, count_queries):
+    """Per-request cost of login_required with a cold and a warm identity cache."""
+    from backend.services.identity_cache import identity_cache
+
+    _, headers = make_user()
+    timings = {'cold': [], 'warm': []}
+    for _ in range(200):
+        # Interleaved, so a slow stretch of the machine hits both modes alike
+        for mode in ('cold', 'warm'):
+            if mode == 'cold':
+                identity_cache.clear()
+            start = time.perf_counter()
+            client.get('/api/lectures', headers=headers)
+            timings[mode].append(time.perf_counter() - start)
+    medians = {mode: sorted(samples)[len(samples) // 2] * 1e6 for mode, samples in timings.items()}
+    print('auth overhead per request (µs, median):', {mode: round(us) for mode, us in medians.items()})
+    assert medians['warm'] < medians['cold']
+
+def _login_storm(client, username, logins):
+    from concurrent.futures import ThreadPoolExecutor
+
+    def login(_):
+        start = time.perf_counter()
+        status = client.post('/api/auth/login', json={'username': username, 'password': 'pw'}).status_code
+        return status, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(logins) as pool:
+        results = list(pool.map(login, range(logins)))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(latency for _, latency in results)
+    statuses = [status for status, _ in results]
+    return {
+        'ok req/s': round(statuses.count(200) / elapsed, 1),
+        'p95 ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000),
+        'shed': statuses.count(503),
+    }
+
+@pytest.mark.benchmark
+def test_login_storm_benchmark(app, client):
+    """Throughput and tail latency of a burst of logins, with and without the bcrypt pool's queue cap."""
+    from backend.extensions import db
+    from backend.models import User
+    from backend.services.password_hasher import password_hasher
+
+    app.config.update(BCRYPT_LOG_ROUNDS=10, PASSWORD_HASH_WORKERS=2, PASSWORD_HASH_WAIT_TIMEOUT=0.25)
+    password_hasher.init_app(app)
+    db.session.add(User(username='storm', password=password_hasher.hash('pw')))
+    db.session.commit()
+
+    results = {}
+    for mode, max_pending in (('unbounded', 10_000), ('capped', 4)):
+        app.config['PASSWORD_HASH_MAX_PENDING'] = max_pending
+        password_hasher.init_app(app)
+        results[mode] = _login_storm(client, 'storm', 48)
+    print('48 concurrent logins:', results)
+    # The cap sheds the excess with 503 instead of making every caller wait behind the queue
+    assert results['unbounded']['shed'] == 0 and results['capped']['shed'] > 0
+    assert results['capped']['p95 ms'] < results['unbounded']['p95 ms']
@@ -0,0 +1,79 @@
+import pytest
+
+@pytest.fixture
+def lecture_with_exam(app, make_user):
+    """A lecture owned by alice, with a two-chapter document and one exam, plus bob's headers."""
+    from backend.extensions import db
+    from backend.models import Document, Exam, Lecture, Question
+
+    alice, alice_headers = make_user('alice')
+    bob, bob_headers = make_user('bob')
+    db.session.add(Document(
+        sha256='a' * 64, file_path='documents/a.pdf', size=1, ref_count=1,
+        chapters=[['Qubits', 'A qubit is...'], ['Entanglement', 'Two qubits...']]
+    ))
+    lecture = Lecture(user_id=alice.id, title='Quantum', file_path='documents/a.pdf', document_hash='a' * 64)
+    db.session.add(lecture)
+    db.session.flush()
+    exam = Exam(lecture_id=lecture.id, user_id=alice.id, title='Quiz')
+    db.session.add(exam)
+    db.session.flush()
+    db.session.add_all([
+        Question(exam_id=exam.id, position=i + 1, question_text=f'Q{i}', options=['a', 'b'], answer_index=0)
+        for i in range(3)
+    ])
+    db.session.commit()
+    return {
+        'lecture_id': lecture.id, 'exam_id': exam.id, 'alice': alice.id, 'bob': bob.id,
+        'alice_headers': alice_headers, 'bob_headers': bob_headers
+    }
+
+def test_owned_exam_loads_lecture_in_one_query(lecture_with_exam, count_queries):
+    from backend.utils.authorization import get_owned_exam
+
+    data = lecture_with_exam
+    with count_queries() as queries:
+        exam = get_owned_exam(data['exam_id'], data['alice'])
+        assert exam.lecture.id == data['lecture_id']
+    assert queries.count == 1
+    assert get_owned_exam(data['exam_id'], data['bob']) is None
+
+def test_owned_exam_questions_in_one_query(lecture_with_exam, count_queries):
+    from backend.utils.authorization import get_owned_exam_questions
+
+    data = lecture_with_exam
+    with count_queries() as queries:
+        questions = get_owned_exam_questions(data['exam_id'], data['alice'], after_position=1)
+    assert queries.count == 1
+    assert [q.position for q in questions] == [2, 3]
+    assert get_owned_exam_questions(data['exam_id'], data['bob']) is None
+    assert get_owned_exam_questions(data['exam_id'], data['alice'], after_position=3) == []
+
+def test_owned_chapter_and_exam_in_one_query(lecture_with_exam, count_queries):
+    from backend.services.search_index import chapter_id
+    from backend.utils.authorization import get_owned_chapter, user_owns_exam
+
+    data = lecture_with_exam
+    with count_queries() as queries:
+        chapter, owns_exam = get_owned_chapter(chapter_id(data['lecture_id'], 1), data['alice'], exam_id=data['exam_id'])
+    assert queries.count == 1
+    assert (chapter.title, chapter.index, owns_exam) == ('Entanglement', 1, True)
+
+    assert get_owned_chapter(chapter_id(data['lecture_id'], 2), data['alice']) is None
+    assert get_owned_chapter(chapter_id(data['lecture_id'], 0), data['bob'], exam_id=data['exam_id']) == (None, False)
+    assert user_owns_exam(data['exam_id'], data['alice'])
+    assert not user_owns_exam(data['exam_id'], data['bob'])
+
+def test_exam_details_route(client, lecture_with_exam):
+    data = lecture_with_exam
+    response = client.get(f"/api/exams/{data['exam_id']}", headers=data['alice_headers'])
+    assert response.status_code == 200
+    assert response.get_json()['lecture_id'] == data['lecture_id']
+    assert client.get(f"/api/exams/{data['exam_id']}", headers=data['bob_headers']).status_code == 404
+
+def test_create_and_list_exams(client, lecture_with_exam):
+    data = lecture_with_exam
+    url = f"/api/lectures/{data['lecture_id']}/exams"
+    assert client.post(url, json={'title': 'Final'}, headers=data['alice_headers']).status_code == 201
+    assert client.post(url, json={'title': 'Final'}, headers=data['bob_headers']).status_code == 404
+    assert [exam['title'] for exam in client.get(url, headers=data['alice_headers']).get_json()] == ['Final', 'Quiz']
@@ -0,0 +1,80 @@
+import random
+import time
+
+import pytest
+
+@pytest.fixture
+def artifact(app, make_user):
+    """An artifact with a study-guide-sized body, and its owner's auth headers."""
+    from backend.extensions import db
+    from backend.models import Artifact, Lecture
+
+    rng = random.Random(37)
+    words = [f'concept{i}' for i in range(400)]
+    body = ''.join(
+        f'<section key="{i}"><h2>{" ".join(rng.choices(words, k=4))}</h2><p>{" ".join(rng.choices(words, k=40))}</p></section>\n'
+        for i in range(120)
+    )
+    user, headers = make_user()
+    lecture = Lecture(user_id=user.id, title='Physics', file_path='documents/x.pdf')
+    db.session.add(lecture)
+    db.session.flush()
+    row = Artifact(lecture_id=lecture.id, user_id=user.id, artifact_type='study_guide', content=body)
+    db.session.add(row)
+    db.session.commit()
+    return row.id, headers
+
+def test_wildcard_clients_never_get_a_private_coding(client, artifact):
+    from backend.extensions import db
+    from backend.models import ArtifactBlob
+
+    artifact_id, headers = artifact
+    ArtifactBlob.query.update({ArtifactBlob.gzip_data: None, ArtifactBlob.br_data: None}) # Only the zlib bytes stored
+    db.session.commit()
+
+    response = client.get(f'/api/artifacts/{artifact_id}/code', headers=dict(headers, **{'Accept-Encoding': '*'}))
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] in ('br', 'gzip') # Compressed on the fly, not x-zdict-<id>
+
+@pytest.mark.benchmark
+def test_compression_bandwidth_and_latency(client, artifact):
+    """Bytes sent and p95 latency per response, with and without a gzip-accepting client."""
+    artifact_id, headers = artifact
+    results = {}
+    for route in (f'/api/artifacts/{artifact_id}', f'/api/artifacts/{artifact_id}/code'):
+        for encoding in ('identity', 'gzip'):
+            latencies, sizes = [], []
+            for _ in range(100):
+                start = time.perf_counter()
+                response = client.get(route, headers=dict(headers, **{'Accept-Encoding': encoding}))
+                latencies.append(time.perf_counter() - start)
+                sizes.append(len(response.get_data()))
+            latencies.sort()
+            results[(route.split('/')[-1], encoding)] = {
+                'bytes': sizes[0], 'p95 ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2)
+            }
+    print('compression off/on:', results)
+    for route in (str(artifact_id), 'code'):
+        assert results[(route, 'gzip')]['bytes'] * 3 < results[(route, 'identity')]['bytes']
+    # Stored encodings cost nothing to serve; on-the-fly gzip of the JSON response is the one that adds CPU
+    assert results[('code', 'gzip')]['p95 ms'] < results[(str(artifact_id), 'gzip')]['p95 ms']
+
+@pytest.mark.parametrize('sendfile', [False, True])
+def test_static_files_without_a_variant_are_sent_as_they_are(tmp_path, sendfile):
+    from flask import Flask
+    from backend.utils.compression import init_compression
+    from backend.utils.static_assets import StaticManifest
+
+    (tmp_path / 'app.js').write_text('console.log("lecture");\n' * 200)
+    manifest = StaticManifest(str(tmp_path), precompress=False)
+    app = Flask(__name__)
+    app.config['USE_X_SENDFILE'] = sendfile
+    init_compression(app)
+    app.add_url_rule('/app.js', 'app_js', lambda: manifest.send(manifest.get('app.js')))
+    client = app.test_client()
+
+    response = client.get('/app.js', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    etag = response.headers['ETag']
+    assert etag == f'"{manifest.get("app.js").etag}"'
+    assert client.get('/app.js', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag}).status_code == 304
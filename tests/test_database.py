@@ -0,0 +1,63 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from backend.database import configure_engine, engine_options
+
+READERS = 4
+DURATION = 1.0
+
+def _engine(path, tuned):
+    url = f'sqlite:///{path}'
+    engine = create_engine(url, **engine_options(url))
+    if tuned:
+        configure_engine(engine)
+    with engine.begin() as connection:
+        connection.execute(text('CREATE TABLE IF NOT EXISTS jobs (id INTEGER PRIMARY KEY, progress INTEGER)'))
+        connection.execute(text('DELETE FROM jobs'))
+        connection.execute(text('INSERT INTO jobs (id, progress) VALUES ' + ', '.join(f'({i}, 0)' for i in range(1, 1001))))
+    return engine
+
+def _mixed_load(engine):
+    """Counts reads and single-row write transactions completed by READERS threads and one writer in DURATION seconds."""
+    counts = {'reads': 0, 'writes': 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def read():
+        while not stop.is_set():
+            with engine.connect() as connection:
+                connection.execute(text('SELECT SUM(progress) FROM jobs')).scalar()
+            with lock:
+                counts['reads'] += 1
+
+    def write():
+        while not stop.is_set():
+            with engine.begin() as connection:
+                connection.execute(text('UPDATE jobs SET progress = progress + 1 WHERE id = :id'),
+                                   {'id': counts['writes'] % 1000 + 1})
+            with lock:
+                counts['writes'] += 1
+
+    threads = [threading.Thread(target=read) for _ in range(READERS)] + [threading.Thread(target=write)]
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    return {name: round(count / DURATION) for name, count in counts.items()}
+
+@pytest.mark.benchmark
+def test_wal_concurrent_read_write_throughput(tmp_path):
+    """Reads and writes per second with one writer beside READERS readers, default journal vs the tuned connections."""
+    results = {
+        'default': _mixed_load(_engine(tmp_path / 'default.db', tuned=False)),
+        'tuned': _mixed_load(_engine(tmp_path / 'tuned.db', tuned=True)),
+    }
+    print(f'{READERS} readers + 1 writer, per second:', results)
+    # WAL readers never wait on the writer's commit
+    assert results['tuned']['reads'] > results['default']['reads']
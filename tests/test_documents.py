@@ -0,0 +1,231 @@
+import io
+
+import pytest
+
+from backend.extensions import db
+
+PDF_BYTES = b'%PDF-1.4\n' + b'x' * 2048
+
+class FakeStorage:
+    def __init__(self):
+        self.objects = {}
+        self.puts = 0
+
+    def put_object(self, file_path, file, content_type='application/pdf', upsert=False):
+        if isinstance(file, str):
+            with open(file, 'rb') as f:
+                file = f.read()
+        self.objects[file_path] = bytes(file)
+        self.puts += 1
+
+    def delete_file(self, file_path):
+        self.objects.pop(file_path, None)
+
+@pytest.fixture
+def storage(monkeypatch):
+    storage = FakeStorage()
+    monkeypatch.setattr('backend.routes.upload.get_storage', lambda: storage)
+    return storage
+
+def upload(client, headers, filename='lecture.pdf'):
+    return client.post('/api/upload', headers=headers, content_type='multipart/form-data',
+                       data={'file': (io.BytesIO(PDF_BYTES), filename)})
+
+def test_duplicate_uploads_share_one_document(client, make_user, storage):
+    from backend.models import Document
+    _, alice_headers = make_user('alice')
+    _, bob_headers = make_user('bob')
+
+    first = upload(client, alice_headers)
+    second = upload(client, bob_headers)
+
+    assert first.status_code == second.status_code == 201
+    assert 'deduplicated' not in first.get_json()
+    assert first.get_json()['file_path'] == second.get_json()['file_path']
+    assert storage.puts == 1
+    assert db.session.get(Document, first.get_json()['sha256']).ref_count == 2
+
+def test_gc_deletes_unreferenced_documents_only(app, client, make_user, storage):
+    from backend.models import Document, Lecture
+    from backend.services.documents import delete_unreferenced_documents
+    _, headers = make_user()
+    kept = upload(client, headers).get_json()
+    dropped = upload(client, headers, 'other.pdf').get_json()
+
+    db.session.delete(db.session.get(Lecture, dropped['id']))
+    db.session.commit()
+    assert delete_unreferenced_documents(storage) == 0 # The other lecture still holds it
+
+    db.session.delete(db.session.get(Lecture, kept['id']))
+    db.session.commit()
+    assert delete_unreferenced_documents(storage) == 1
+    assert db.session.get(Document, kept['sha256']) is None
+    assert storage.objects == {}
+
+def test_upload_waits_out_a_document_being_collected(app, monkeypatch):
+    from backend.models import Document
+    from backend.services import documents
+
+    monkeypatch.setattr(documents, 'COLLECTING_WAIT', 0)
+    monkeypatch.setattr(documents, 'ACQUIRE_ATTEMPTS', 3)
+    db.session.add(Document(sha256='a' * 64, file_path=documents.storage_path('a' * 64), size=1, ref_count=-1))
+    db.session.commit()
+
+    uploads = []
+    with pytest.raises(RuntimeError):
+        documents.acquire_document('a' * 64, 1, uploads.append)
+    db.session.rollback()
+    assert uploads == [] # Neither referenced nor stored again while claimed
+
+    class ObjectDeletingStorage(FakeStorage):
+        def delete_file(self, file_path):
+            # The claim is committed before the object goes
+            assert db.session.query(Document.ref_count).filter_by(sha256='a' * 64).scalar() == -1
+
+    assert documents.delete_unreferenced_documents(ObjectDeletingStorage()) == 1
+    document, created = documents.acquire_document('a' * 64, 1, uploads.append)
+    assert created and document.ref_count == 1
+    assert uploads == [documents.storage_path('a' * 64)]
+
+class FakeGenerator:
+    """Stands in for AIArtifactGenerator; `bodies` maps a title to its generated body, None for an LLM failure."""
+
+    def __init__(self, bodies, during_call=None):
+        self.bodies = bodies
+        self.during_call = during_call
+        self.calls = []
+
+    def _generate(self, artifact_type, content, title, fallback):
+        self.calls.append((artifact_type, title))
+        if self.during_call:
+            self.during_call()
+        body = self.bodies[title]
+        return f'<{artifact_type}>{body}' if body is not None else None
+
+    def generate_study_guide(self, content, title, fallback=True):
+        return self._generate('study_guide', content, title, fallback)
+
+    def generate_quiz(self, content, title, fallback=True):
+        return self._generate('quiz', content, title, fallback)
+
+    def generate_fallback(self, artifact_type, content, title):
+        return f'<{artifact_type}>placeholder'
+
+@pytest.fixture
+def processor(app, monkeypatch):
+    from backend.models import Document
+    from backend.services.pdf_processor import PDFProcessor
+    db.session.add(Document(sha256='b' * 64, file_path='documents/b.pdf', size=1, ref_count=2))
+    db.session.commit()
+
+    processor = PDFProcessor()
+    monkeypatch.setattr(processor, 'extract_text_from_pdf', lambda pdf_path: 'Chapter 1\nSome text')
+    return processor
+
+def test_shared_artifacts_are_keyed_by_title(processor):
+    processor.ai_generator = FakeGenerator({'mine.pdf': 'mine', 'yours.pdf': 'yours'})
+
+    for title in ('mine.pdf', 'yours.pdf', 'mine.pdf'):
+        result = processor.process_pdf_for_artifacts('documents/b.pdf', title, document_hash='b' * 64)
+        assert result['artifacts']['quiz'] == f"<quiz>{title.split('.')[0]}"
+    assert processor.ai_generator.calls == [
+        ('study_guide', 'mine.pdf'), ('quiz', 'mine.pdf'), ('study_guide', 'yours.pdf'), ('quiz', 'yours.pdf')
+    ]
+
+def test_fallback_bodies_are_not_shared(processor):
+    from backend.models import DocumentArtifact
+    processor.ai_generator = FakeGenerator({'mine.pdf': None})
+
+    result = processor.process_pdf_for_artifacts('documents/b.pdf', 'mine.pdf', document_hash='b' * 64)
+
+    assert result['artifacts']['quiz'] == '<quiz>placeholder'
+    assert DocumentArtifact.query.count() == 0 # The next lecture asks the LLM again
+
+def test_regenerate_replaces_the_shared_body(processor):
+    from backend.services.documents import get_shared_artifact
+    processor.ai_generator = FakeGenerator({'mine.pdf': 'first'})
+    processor.process_pdf_for_artifacts('documents/b.pdf', 'mine.pdf', document_hash='b' * 64)
+
+    processor.ai_generator.bodies['mine.pdf'] = 'second'
+    processor.process_pdf_for_artifacts('documents/b.pdf', 'mine.pdf', document_hash='b' * 64)
+    assert get_shared_artifact('b' * 64, 'quiz', 'mine.pdf') == '<quiz>first'
+
+    processor.process_pdf_for_artifacts('documents/b.pdf', 'mine.pdf', document_hash='b' * 64, regenerate=True)
+    assert get_shared_artifact('b' * 64, 'quiz', 'mine.pdf') == '<quiz>second'
+
+def test_no_write_lock_is_held_while_generating(processor):
+    import sqlite3
+
+    database = db.engine.url.database
+    writes = []
+
+    def write_from_another_connection():
+        connection = sqlite3.connect(database, timeout=0.2)
+        try:
+            connection.execute("UPDATE user SET username = username")
+            connection.commit()
+            writes.append(True)
+        finally:
+            connection.close()
+
+    processor.ai_generator = FakeGenerator({'mine.pdf': 'body'}, during_call=write_from_another_connection)
+    result = processor.process_pdf_for_artifacts('documents/b.pdf', 'mine.pdf', document_hash='b' * 64)
+
+    assert 'error' not in result
+    assert writes == [True, True]
+
+class FakeProcessor:
+    def __init__(self):
+        self.calls = []
+
+    def process_pdf_for_artifacts(self, pdf_path, title, document_hash=None, regenerate=False):
+        self.calls.append((pdf_path, title, document_hash))
+        return {
+            'success': True,
+            'text_content': 'Chapter 1\nText',
+            'analysis': {'complexity_level': 'beginner'},
+            'chapters': [('Chapter 1', 'Text')],
+            'artifacts': {'study_guide': '<div>guide</div>', 'quiz': '<div>quiz</div>'},
+        }
+
+def test_generation_uses_the_lecture_document(client, make_user, storage, monkeypatch):
+    from backend.models import Artifact, ProcessingJob
+    processor = FakeProcessor()
+    monkeypatch.setattr('backend.routes.artifacts.get_pdf_processor', lambda: processor)
+    user, headers = make_user()
+    lecture = upload(client, headers).get_json()
+
+    response = client.post(f"/api/artifacts/generate/{lecture['id']}", headers=headers)
+
+    assert response.status_code == 200
+    assert processor.calls == [(lecture['file_path'], 'lecture.pdf', lecture['sha256'])]
+    created = response.get_json()['artifacts_created']
+    assert [a['type'] for a in created] == ['study_guide', 'quiz']
+    assert db.session.get(Artifact, created[1]['id']).content == '<div>quiz</div>'
+    job = db.session.get(ProcessingJob, response.get_json()['job_id'])
+    assert (job.status, job.progress, job.user_id) == ('completed', 100, user.id)
+
+def test_generation_is_limited_to_the_owner(client, make_user, storage, monkeypatch):
+    monkeypatch.setattr('backend.routes.artifacts.get_pdf_processor', FakeProcessor)
+    _, alice_headers = make_user('alice')
+    _, bob_headers = make_user('bob')
+    lecture = upload(client, alice_headers).get_json()
+
+    assert client.post('/api/artifacts/generate', headers=bob_headers, json={'lecture_id': lecture['id']}).status_code == 404
+    assert client.post('/api/artifacts/generate', headers=alice_headers, json={}).status_code == 400
+    assert client.post(f"/api/artifacts/generate/{lecture['id']}").status_code == 401
+
+def test_job_events_are_limited_to_the_owner(client, make_user, storage, monkeypatch):
+    monkeypatch.setattr('backend.routes.artifacts.get_pdf_processor', FakeProcessor)
+    _, alice_headers = make_user('alice')
+    _, bob_headers = make_user('bob')
+    lecture = upload(client, alice_headers).get_json()
+    job_id = client.post(f"/api/artifacts/generate/{lecture['id']}", headers=alice_headers).get_json()['job_id']
+    url = f'/api/artifacts/processing-jobs/{job_id}/events'
+
+    for path in (url, f'/api/artifacts/processing-jobs/{job_id}', f'/api/artifacts/processing-jobs/{job_id}/status'):
+        assert client.get(path).status_code == 401
+        assert client.get(path, headers=bob_headers).status_code == 404
+    response = client.get(url, headers=alice_headers)
+    assert response.status_code == 200
+    assert '"status": "completed"' in response.get_data(as_text=True)
@@ -0,0 +1,159 @@
+import pytest
+
+@pytest.fixture
+def exam(app, make_user):
+    """An exam of alice's with two questions of three and two options; the first option is correct."""
+    from backend.extensions import db
+    from backend.models import Exam, Lecture, Question
+
+    alice, headers = make_user('alice')
+    lecture = Lecture(user_id=alice.id, title='Quantum', file_path='x.pdf')
+    db.session.add(lecture)
+    db.session.flush()
+    exam = Exam(lecture_id=lecture.id, user_id=alice.id, title='Quiz')
+    db.session.add(exam)
+    db.session.flush()
+    db.session.add_all([
+        Question(exam_id=exam.id, position=1, question_text='Q1', options=['a', 'b', 'c'], answer_index=0),
+        Question(exam_id=exam.id, position=2, question_text='Q2', options=['a', 'b'], answer_index=0),
+    ])
+    db.session.commit()
+    return {'id': exam.id, 'headers': headers}
+
+@pytest.mark.parametrize('answers', [[0, 0], {'0': 0, '1': -1}, [0], [-1, -1]])
+def test_submit_attempt_accepts_option_indices(client, exam, answers):
+    response = client.post(f"/api/exams/{exam['id']}/attempts", json={'answers': answers}, headers=exam['headers'])
+    assert response.status_code == 201
+
+@pytest.mark.parametrize('answers', [
+    [100000, 0],   # out of range (used to overflow int16 with a 500)
+    [0, 2],        # question 2 only has two options
+    [-2, 0],
+    'garbage',
+    [[0], 1],
+    [True, 0],
+    ['a', 0],
+    [0, 0, 0],     # more answers than questions
+    {'x': 0},
+    {'5': 0},
+])
+def test_submit_attempt_rejects_invalid_answers(client, exam, answers):
+    from backend.models import ExamAttempt
+
+    response = client.post(f"/api/exams/{exam['id']}/attempts", json={'answers': answers}, headers=exam['headers'])
+    assert response.status_code == 400
+    assert ExamAttempt.query.count() == 0
+
+def test_submit_attempt_scores_and_checks_ownership(client, exam, make_user):
+    response = client.post(f"/api/exams/{exam['id']}/attempts", json={'answers': [0, 1]}, headers=exam['headers'])
+    assert response.get_json()['score'] == 50.0
+
+    _, bob_headers = make_user('bob')
+    response = client.post(f"/api/exams/{exam['id']}/attempts", json={'answers': [0, 0]}, headers=bob_headers)
+    assert response.status_code == 404
+
+def test_submit_attempt_rejects_bad_start_time(client, exam):
+    response = client.post(
+        f"/api/exams/{exam['id']}/attempts", json={'answers': [0, 0], 'started_at': 'yesterday'}, headers=exam['headers']
+    )
+    assert response.status_code == 400
+
+def test_accumulator_counts_out_of_range_picks_as_unanswered():
+    import numpy as np
+    from backend.services.exam_analytics import AnalyticsAccumulator
+
+    accumulator = AnalyticsAccumulator([3, 2])
+    accumulator.add(np.array([[0, 1], [100, 5], [-7, -1]], dtype=np.int16), np.array([50.0, 0.0, 0.0]))
+    assert accumulator.option_counts.shape == (2, 4)
+    assert accumulator.option_counts.tolist() == [[2, 1, 0, 0], [2, 0, 1, 0]]
+
+def test_grade_all_rebuilds_analytics(client, exam):
+    from backend.extensions import db
+    from backend.models import ExamAttempt
+
+    url = f"/api/exams/{exam['id']}"
+    for answers in ([0, 0], [1, 0], {'0': 2}):
+        client.post(f'{url}/attempts', json={'answers': answers}, headers=exam['headers'])
+    # Stored before validation existed; counted as unanswered rather than widening the counts
+    db.session.add(ExamAttempt(exam_id=exam['id'], user_id=1, answers='[0, 100000]'))
+    db.session.commit()
+
+    summary = client.post(f'{url}/grade-all', headers=exam['headers']).get_json()
+    assert summary['graded'] == 4
+
+    analytics = client.get(f'{url}/analytics', headers=exam['headers']).get_json()
+    assert analytics['attempt_count'] == 4
+    assert analytics['questions'][0]['option_counts'] == {'0': 2, '1': 1, '2': 1}
+    assert analytics['questions'][1]['option_counts'] == {'-1': 2, '0': 2}
+    assert analytics['mean_score'] == summary['mean_score']
+
+    client.post(f'{url}/attempts', json={'answers': [0, 0]}, headers=exam['headers'])
+    assert client.get(f'{url}/analytics', headers=exam['headers']).get_json()['attempt_count'] == 5
+
+def test_rebuild_scans_without_holding_the_write_lock(client, exam, monkeypatch):
+    import sqlite3
+    from backend.extensions import db
+    from backend.models import Exam
+    from backend.services import exam_analytics
+
+    url = f"/api/exams/{exam['id']}"
+    for answers in ([0, 0], [1, 0]):
+        client.post(f'{url}/attempts', json={'answers': answers}, headers=exam['headers'])
+    submitted = []
+    add = exam_analytics.AnalyticsAccumulator.add
+
+    def submit_during_the_scan(self, answers, scores):
+        if not submitted:
+            # Fails with "database is locked" if the scan holds the write lock
+            connection = sqlite3.connect(db.engine.url.database, timeout=0.2)
+            connection.execute("INSERT INTO exam_attempt (exam_id, user_id, answers, completed_at) "
+                               "VALUES (?, 1, '[2, 1]', '2026-01-01 00:00:00')", (exam['id'],))
+            connection.commit()
+            connection.close()
+            submitted.append(True)
+        add(self, answers, scores)
+
+    monkeypatch.setattr(exam_analytics.AnalyticsAccumulator, 'add', submit_during_the_scan)
+    assert exam_analytics.rebuild_exam_analytics(db.session.get(Exam, exam['id'])) == 3
+    analytics = client.get(f'{url}/analytics', headers=exam['headers']).get_json()
+    assert analytics['questions'][0]['option_counts'] == {'0': 1, '1': 1, '2': 1}
+
+@pytest.mark.parametrize('method,route', [('POST', 'grade-all'), ('GET', 'analytics')])
+def test_exam_routes_are_limited_to_the_lecture_owner(client, exam, make_user, method, route):
+    _, bob_headers = make_user('bob')
+    response = client.open(f"/api/exams/{exam['id']}/{route}", method=method, headers=bob_headers)
+    assert response.status_code == 404
+
+def test_add_question_appends_in_order(client, exam):
+    url = f"/api/exams/{exam['id']}/questions"
+    response = client.post(url, json={'question_text': 'Q3', 'options': ['x', 'y'], 'correct_answer': 'y'}, headers=exam['headers'])
+    assert response.status_code == 201
+    questions = client.get(url, headers=exam['headers']).get_json()
+    assert [(q['position'], q['question_text'], q['correct_answer']) for q in questions][-1] == (3, 'Q3', 'y')
+
+def test_appends_retry_when_a_concurrent_append_takes_the_position(app, exam, monkeypatch):
+    from backend.extensions import db
+    from backend.models import Question
+    from backend.services import question_store
+
+    # The first read of max(position) is stale, as if another request had
+    # appended between the read and the insert.
+    real_next_position = question_store.next_position
+    reads = []
+    def stale_next_position(exam_id):
+        reads.append(exam_id)
+        return 2 if len(reads) == 1 else real_next_position(exam_id)
+    monkeypatch.setattr(question_store, 'next_position', stale_next_position)
+
+    question = question_store.append_question(exam['id'], 'Q3', ['a', 'b'], 0)
+    assert question.position == 3
+
+    reads.clear()
+    inserted = question_store.bulk_insert_questions(exam['id'], [
+        {'question_text': 'Q4', 'options': ['a', 'b'], 'correct_answer': 'a'},
+        {'question_text': 'Q5', 'options': ['a', 'b'], 'correct_answer': 'b'},
+    ])
+    db.session.commit()
+    assert inserted == 2
+    positions = [q.position for q in Question.query.filter_by(exam_id=exam['id']).order_by(Question.position)]
+    assert positions == [1, 2, 3, 4, 5]
@@ -0,0 +1,35 @@
+import time
+from datetime import datetime
+
+import pytest
+
+def test_encode_follows_the_apps_sort_keys(app):
+    from backend.utils.json_provider import encode
+
+    app.json.sort_keys = True
+    assert encode({'b': 1, 'a': {'d': 2, 'c': 3}}) == app.json.dumps({'b': 1, 'a': {'d': 2, 'c': 3}}).encode('utf-8')
+    assert encode({'b': 1, 'a': 2}) == b'{"a":2,"b":1}'
+    app.json.sort_keys = False
+    assert encode({'b': 1, 'a': 2}) == b'{"b":1,"a":2}'
+
+@pytest.mark.benchmark
+def test_serialization_throughput_benchmark(app):
+    """MB/s encoding a lecture bundle's worth of artifacts with orjson and with the stdlib provider."""
+    pytest.importorskip('orjson')
+    from flask.json.provider import DefaultJSONProvider
+
+    body = 'export default function StudyGuide() {\n  return <div className="guide">"Qubits" & gates</div>;\n}\n' * 200
+    payload = {'success': True, 'artifacts': [
+        {'id': i, 'type': 'study_guide', 'lecture_id': 1, 'content': body, 'created_at': datetime(2026, 1, 1, 12, i % 60)}
+        for i in range(100)
+    ]}
+    providers = {'orjson': app.json, 'stdlib': DefaultJSONProvider(app)}
+    throughput = {}
+    for name, provider in providers.items():
+        size = len(provider.dumps(payload))
+        start = time.perf_counter()
+        for _ in range(20):
+            provider.dumps(payload)
+        throughput[name] = round(size * 20 / (time.perf_counter() - start) / 1e6)
+    print('serialization throughput (MB/s):', throughput)
+    assert throughput['orjson'] > throughput['stdlib']
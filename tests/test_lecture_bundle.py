@@ -0,0 +1,95 @@
+import pytest
+
+@pytest.fixture
+def lecture(app, make_user):
+    """alice's lecture with two chapters, an exam and two artifacts, plus bob's headers."""
+    from backend.extensions import db
+    from backend.models import Artifact, Document, Exam, Lecture
+
+    alice, headers = make_user('alice')
+    _, bob_headers = make_user('bob')
+    db.session.add(Document(
+        sha256='b' * 64, file_path='documents/b.pdf', size=1, ref_count=1,
+        chapters=[['Qubits', 'A qubit is...'], ['Gates', 'Hadamard...']]
+    ))
+    lecture = Lecture(user_id=alice.id, title='quantum.pdf', file_path='documents/b.pdf', document_hash='b' * 64)
+    db.session.add(lecture)
+    db.session.flush()
+    db.session.add(Exam(lecture_id=lecture.id, user_id=alice.id, title='Quiz'))
+    artifacts = [
+        Artifact(lecture_id=lecture.id, user_id=alice.id, artifact_type='study_guide', content='<Guide />'),
+        Artifact(lecture_id=lecture.id, user_id=alice.id, artifact_type='interactive_quiz', content='<Quiz />'),
+    ]
+    db.session.add_all(artifacts)
+    db.session.commit()
+    return {'id': lecture.id, 'headers': headers, 'bob_headers': bob_headers, 'artifact_ids': [a.id for a in artifacts]}
+
+def test_bundle_includes_every_part_by_default(client, lecture, count_queries):
+    from backend.services.search_index import chapter_id
+
+    with count_queries() as queries:
+        response = client.get(f"/api/lectures/{lecture['id']}/bundle", headers=lecture['headers'])
+    assert response.status_code == 200
+    bundle = response.get_json()
+    assert bundle['lecture']['title'] == 'quantum.pdf'
+    assert [c['id'] for c in bundle['chapters']] == [chapter_id(lecture['id'], 0), chapter_id(lecture['id'], 1)]
+    assert [e['title'] for e in bundle['exams']] == ['Quiz']
+    assert {a['type'] for a in bundle['artifacts']} == {'study_guide', 'interactive_quiz'}
+    assert not any('content' in a for a in bundle['artifacts'])
+    # Lecture with chapters, exams and artifacts: one query each on top of the token check
+    assert len([q for q in queries.statements if q.lstrip().upper().startswith('SELECT')]) <= 4
+
+def test_bundle_checks_ownership_and_parts(client, lecture):
+    url = f"/api/lectures/{lecture['id']}/bundle"
+    assert client.get(url, headers=lecture['bob_headers']).status_code == 404
+    assert client.get(f'{url}?include=lecture,nope', headers=lecture['headers']).status_code == 400
+    assert set(client.get(f'{url}?include=exams', headers=lecture['headers']).get_json()) == {'exams'}
+
+def test_multi_get_streams_bodies_in_request_order(client, lecture):
+    first, second = lecture['artifact_ids']
+    response = client.get(f'/api/artifacts?ids={second},{first},999&fields=id,type,size,content', headers=lecture['headers'])
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [(a['id'], a['content'], a['size']) for a in data['artifacts']] == [
+        (second, '<Quiz />', len('<Quiz />')), (first, '<Guide />', len('<Guide />'))
+    ]
+    assert data['missing'] == [999]
+
+    listed = client.get(f'/api/artifacts?ids={first}&fields=id,size', headers=lecture['headers']).get_json()
+    assert listed['artifacts'] == [{'id': first, 'size': len('<Guide />')}]
+
+def test_multi_get_fails_before_streaming(client, lecture):
+    from backend.extensions import db
+    from backend.models import Artifact
+
+    first, _ = lecture['artifact_ids']
+    db.session.get(Artifact, first).blob_hash = 'f' * 64 # Points at a blob that does not exist
+    db.session.commit()
+    response = client.get(f'/api/artifacts?ids={first}&fields=id,content', headers=lecture['headers'])
+    assert response.status_code == 500
+    assert 'error' in response.get_json()
+    assert client.get(f'/api/artifacts?ids={first}&fields=title', headers=lecture['headers']).status_code == 400
+
+def test_multi_get_only_returns_the_callers_artifacts(client, lecture):
+    first, second = lecture['artifact_ids']
+    url = f'/api/artifacts?ids={first},{second}&fields=id,content'
+
+    assert client.get(url).status_code == 401
+    response = client.get(url, headers=lecture['bob_headers'])
+    assert response.status_code == 200
+    assert response.get_json()['artifacts'] == []
+    assert response.get_json()['missing'] == [first, second]
+
+def test_lectures_are_listed_from_the_callers_rows(client, lecture):
+    from backend.services.search_index import chapter_id
+
+    listed = client.get('/api/lectures', headers=lecture['headers']).get_json()
+    assert [(l['id'], l['title']) for l in listed] == [(lecture['id'], 'quantum.pdf')]
+    assert client.get('/api/lectures', headers=lecture['bob_headers']).get_json() == []
+
+    assert client.get(f"/api/lectures/{lecture['id']}", headers=lecture['headers']).get_json()['filename'] == 'quantum.pdf'
+    assert client.get(f"/api/lectures/{lecture['id']}", headers=lecture['bob_headers']).status_code == 404
+
+    chapters = client.get(f"/api/lectures/{lecture['id']}/chapters", headers=lecture['headers']).get_json()
+    assert [(c['id'], c['title']) for c in chapters] == [(chapter_id(lecture['id'], 0), 'Qubits'), (chapter_id(lecture['id'], 1), 'Gates')]
+    assert client.get(f"/api/lectures/{lecture['id']}/chapters", headers=lecture['bob_headers']).status_code == 404
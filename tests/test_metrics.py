@@ -0,0 +1,14 @@
+def test_metrics_are_closed_without_a_token(client, monkeypatch):
+    monkeypatch.delenv('METRICS_TOKEN', raising=False)
+    assert client.get('/metrics').status_code == 404
+
+    monkeypatch.setenv('METRICS_PUBLIC', '1')
+    assert client.get('/metrics').status_code == 200
+
+def test_metrics_require_the_configured_token(client, monkeypatch):
+    monkeypatch.setenv('METRICS_TOKEN', 'scrape-secret')
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'})
+    assert response.status_code == 200
+    assert b'pipeline_stage_failures_total' in response.data
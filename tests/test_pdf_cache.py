@@ -0,0 +1,54 @@
+import io
+import logging
+
+import pytest
+
+PDF_BYTES = b'%PDF-1.4\n' + b'y' * 2048
+
+class FakeStorage:
+    def put_object(self, file_path, file, content_type='application/pdf', upsert=False):
+        pass
+
+@pytest.fixture(autouse=True)
+def storage(monkeypatch):
+    monkeypatch.setattr('backend.routes.upload.get_storage', FakeStorage)
+
+def upload(client, headers):
+    return client.post('/api/upload', headers=headers, content_type='multipart/form-data',
+                       data={'file': (io.BytesIO(PDF_BYTES), 'lecture.pdf')})
+
+def no_download(storage_path, local_path):
+    raise AssertionError(f'{storage_path} was downloaded')
+
+def test_upload_prewarms_the_entry_extraction_reads(client, make_user):
+    from backend.services.pdf_cache import pdf_cache
+    _, headers = make_user()
+    lecture = upload(client, headers).get_json()
+
+    with open(pdf_cache.get(lecture['file_path'], fetch=no_download), 'rb') as f:
+        assert f.read() == PDF_BYTES
+
+def test_miss_downloads_once(app, tmp_path):
+    from backend.services.pdf_cache import pdf_cache
+    downloads = []
+
+    def fetch(storage_path, local_path):
+        downloads.append(storage_path)
+        with open(local_path, 'wb') as f:
+            f.write(PDF_BYTES)
+
+    first = pdf_cache.get('1/lecture_1700000000.pdf', fetch=fetch)
+    assert pdf_cache.get('1/lecture_1700000000.pdf', fetch=fetch) == first
+    assert downloads == ['1/lecture_1700000000.pdf']
+
+def test_prewarm_failure_is_logged_not_fatal(client, make_user, monkeypatch, caplog):
+    def put(storage_path, source):
+        raise OSError('disk full')
+    monkeypatch.setattr('backend.routes.upload.pdf_cache.put', put)
+    _, headers = make_user()
+
+    with caplog.at_level(logging.WARNING):
+        response = upload(client, headers)
+
+    assert response.status_code == 201
+    assert 'Could not pre-warm the PDF cache: disk full' in caplog.text
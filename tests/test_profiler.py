@@ -0,0 +1,35 @@
+import pytest
+
+@pytest.fixture
+def profiled_app(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setenv('PROFILING_TOKEN', 'profiling-secret')
+    monkeypatch.setenv('PROFILE_SAMPLE_RATE', '1')
+    monkeypatch.setenv('PROFILE_DIR', str(tmp_path / 'profiles'))
+    monkeypatch.setattr('backend.services.profiler._store', None)
+    from backend import create_app
+
+    app = create_app()
+    app.config['TESTING'] = True
+    return app
+
+def test_profile_ids_are_generated_server_side(profiled_app):
+    from backend.services.profiler import get_store
+
+    client = profiled_app.test_client()
+    response = client.get('/api/lectures', headers={'X-Profile': 'profiling-secret', 'X-Request-ID': 'victim'})
+    profile_id = response.headers['X-Profile-Id']
+    assert profile_id != 'victim'
+    assert 'victim' not in [profile['id'] for profile in get_store().list()]
+    assert profile_id in [profile['id'] for profile in get_store().list()]
+
+def test_profile_id_is_only_shown_to_admins(profiled_app):
+    from backend.services.profiler import get_store
+
+    client = profiled_app.test_client()
+    response = client.get('/api/lectures', headers={'X-Request-ID': 'victim'})
+    assert 'X-Profile-Id' not in response.headers
+    # Still sampled, just not announced
+    assert len(get_store().list()) == 1
+    response = client.get('/api/lectures', headers={'X-Profile': 'wrong'})
+    assert 'X-Profile-Id' not in response.headers
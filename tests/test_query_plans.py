@@ -0,0 +1,143 @@
+"""
+EXPLAIN QUERY PLAN checks for the hot read paths on a seeded SQLite database.
+
+Each test runs real code while recording its SQL, then asks SQLite how it
+would execute every SELECT and fails if any of them scans a whole table.
+"""
+import re
+from datetime import datetime, timedelta
+
+import pytest
+
+USERS = 50
+LECTURES_PER_USER = 10
+ARTIFACTS_PER_LECTURE = 10
+EXAMS_PER_LECTURE = 2
+QUESTIONS_PER_EXAM = 10
+ATTEMPTS_PER_EXAM = 10
+
+# A plan line like "SCAN artifact" without "USING ... INDEX" reads every row
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+@pytest.fixture
+def seeded(app):
+    """Fills every table the tests read with a few thousand rows, then runs ANALYZE."""
+    from backend.extensions import db
+    from backend.models import Artifact, Document, Exam, ExamAttempt, Lecture, Question, User
+
+    start = datetime(2026, 1, 1)
+    tables = {model: [] for model in (User, Document, Lecture, Artifact, Exam, Question, ExamAttempt)}
+    lecture_id = exam_id = 0
+    for user_id in range(1, USERS + 1):
+        tables[User].append({'id': user_id, 'username': f'user{user_id}', 'password': 'x'})
+        for _ in range(LECTURES_PER_USER):
+            lecture_id += 1
+            sha256 = f'{lecture_id:064x}'
+            tables[Document].append({'sha256': sha256, 'file_path': f'documents/{sha256}.pdf', 'size': 1, 'ref_count': 1})
+            tables[Lecture].append({
+                'id': lecture_id, 'user_id': user_id, 'title': 'Lecture', 'file_path': 'x.pdf',
+                'document_hash': sha256, 'created_at': start + timedelta(minutes=lecture_id)
+            })
+            for i in range(ARTIFACTS_PER_LECTURE):
+                tables[Artifact].append({
+                    'lecture_id': lecture_id, 'user_id': user_id, 'artifact_type': 'summary',
+                    'created_at': start + timedelta(seconds=i)
+                })
+            for _ in range(EXAMS_PER_LECTURE):
+                exam_id += 1
+                tables[Exam].append({'id': exam_id, 'lecture_id': lecture_id, 'user_id': user_id, 'title': 'Exam'})
+                for position in range(1, QUESTIONS_PER_EXAM + 1):
+                    tables[Question].append({
+                        'exam_id': exam_id, 'position': position, 'question_text': 'Q',
+                        'options': ['a', 'b', 'c', 'd'], 'answer_index': 0
+                    })
+                for i in range(ATTEMPTS_PER_EXAM):
+                    tables[ExamAttempt].append({
+                        'exam_id': exam_id, 'user_id': (user_id + i) % USERS + 1,
+                        'answers': '[0, 1, 2]', 'completed_at': start
+                    })
+    for model, rows in tables.items():
+        db.session.execute(model.__table__.insert(), rows)
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+    return {'user_id': USERS // 2, 'lecture_id': lecture_id // 2, 'exam_id': exam_id // 2}
+
+@pytest.fixture
+def assert_no_full_scans(app):
+    """Runs a callable, then fails if any SELECT it issued scans a whole table."""
+    from sqlalchemy import event
+    from backend.extensions import db
+
+    def check(run):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                statements.append((statement, parameters))
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            run()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        assert statements, 'nothing was queried'
+
+        for statement, parameters in statements:
+            plan = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+            scans = [row.detail for row in plan if FULL_SCAN.match(row.detail)]
+            assert not scans, f'{scans} in plan for:\n{statement}\n' + '\n'.join(row.detail for row in plan)
+    return check
+
+def test_artifact_listing_uses_index(seeded, assert_no_full_scans):
+    from backend.routes.artifacts import list_artifact_page
+
+    def run():
+        rows, cursor = list_artifact_page(seeded['lecture_id'], ['id', 'type', 'created_at', 'size'], limit=3)
+        list_artifact_page(seeded['lecture_id'], ['id', 'type'], cursor=cursor, limit=3)
+    assert_no_full_scans(run)
+
+def test_lecture_listing_uses_index(seeded, assert_no_full_scans):
+    from backend.models import Lecture
+
+    assert_no_full_scans(lambda: Lecture.query.filter_by(user_id=seeded['user_id']).order_by(Lecture.created_at.desc()).all())
+
+def test_lecture_exams_use_index(seeded, assert_no_full_scans):
+    from backend.models import Exam
+
+    assert_no_full_scans(lambda: Exam.query.filter_by(lecture_id=seeded['lecture_id']).order_by(Exam.created_at.desc()).all())
+
+def test_user_lookups_use_indexes(seeded, assert_no_full_scans):
+    from backend.models import Artifact, Exam, ExamAttempt, User
+
+    def run():
+        User.query.filter_by(username=f"user{seeded['user_id']}").first()
+        Artifact.query.filter_by(user_id=seeded['user_id']).count()
+        Exam.query.filter_by(user_id=seeded['user_id']).count()
+        ExamAttempt.query.filter_by(user_id=seeded['user_id']).count()
+    assert_no_full_scans(run)
+
+def test_exam_questions_and_attempts_use_indexes(seeded, assert_no_full_scans):
+    from backend.extensions import db
+    from backend.models import Exam
+    from backend.services.grading import AnswerKey, iter_attempt_batches
+    from backend.services.question_store import next_position
+
+    exam = db.session.get(Exam, seeded['exam_id'])
+
+    def run():
+        key = AnswerKey.from_exam(exam)
+        list(iter_attempt_batches(exam, key, batch_size=4, completed_only=True))
+        next_position(exam.id)
+    assert_no_full_scans(run)
+
+def test_document_references_use_index(seeded, assert_no_full_scans):
+    from backend.models import Lecture
+
+    assert_no_full_scans(lambda: Lecture.query.filter_by(document_hash=f"{seeded['lecture_id']:064x}").count())
+
+def test_full_scan_is_detected(seeded, assert_no_full_scans):
+    from backend.models import Lecture
+
+    with pytest.raises(AssertionError, match='SCAN lecture'):
+        assert_no_full_scans(lambda: Lecture.query.filter_by(title='Lecture').count())
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+def test_search_without_index_is_unavailable(client, make_user):
+    _, headers = make_user()
+    response = client.get('/api/search?q=qubit', headers=headers)
+    assert response.status_code == 503
+    assert 'search index' in response.get_json()['error']
+
+def test_search_finds_own_chapters_only(app, client, make_user):
+    from backend.extensions import db
+    from backend.services.search_index import ensure_index, index_chapters
+
+    alice, alice_headers = make_user('alice')
+    bob, bob_headers = make_user('bob')
+    ensure_index()
+    index_chapters(alice.id, 1, [('Qubits', 'A qubit can be in superposition.'), ('Gates', 'Hadamard gates.')])
+    db.session.commit()
+
+    results = client.get('/api/search?q=superpos*', headers=alice_headers).get_json()['results']
+    assert [(r['lecture_id'], r['chapter_index'], r['title']) for r in results] == [(1, 0, 'Qubits')]
+    assert '<mark>' in results[0]['snippet']
+    assert client.get('/api/search?q=qubit', headers=bob_headers).get_json()['results'] == []
+    assert client.get('/api/search', headers=alice_headers).status_code == 400
+
+def test_deleted_lectures_leave_the_index(app, client, make_user):
+    from backend.extensions import db
+    from backend.models import Lecture
+    from backend.services.documents import delete_unreferenced_documents
+    from backend.services.search_index import ensure_index, index_chapters
+
+    user, headers = make_user()
+    ensure_index()
+    lectures = [Lecture(user_id=user.id, title=f'{name}.pdf', file_path=f'{name}.pdf') for name in ('deleted', 'bulk')]
+    db.session.add_all(lectures)
+    db.session.flush()
+    for lecture in lectures:
+        index_chapters(user.id, lecture.id, [('Qubits', f'Qubits in {lecture.title}')])
+    db.session.commit()
+
+    db.session.delete(lectures[0])
+    db.session.commit()
+    assert [r['lecture_id'] for r in client.get('/api/search?q=qubit', headers=headers).get_json()['results']] == [lectures[1].id]
+
+    # Bulk deletes skip the ORM event; the document GC sweeps what they leave behind
+    Lecture.query.filter_by(id=lectures[1].id).delete()
+    db.session.commit()
+    delete_unreferenced_documents(storage=None)
+    assert client.get('/api/search?q=qubit', headers=headers).get_json()['results'] == []
+
+@pytest.mark.benchmark
+def test_search_latency_over_100k_chapters(app):
+    """Per-query latency of the FTS5 index against a LIKE scan of the same chapters."""
+    import random
+    from sqlalchemy import text
+    from backend.extensions import db
+    from backend.services.search_index import ensure_index, index_chapters, search_chapters
+
+    rng = random.Random(32)
+    vocabulary = [f'term{i}' for i in range(5000)]
+    ensure_index()
+    db.session.execute(text('CREATE TABLE chapter_plain (owner INTEGER, title TEXT, content TEXT)'))
+    for lecture_id in range(1, 1001): # 100 chapters each, spread over 50 users
+        chapters = [(f'Chapter {i}', ' '.join(rng.choices(vocabulary, k=80))) for i in range(100)]
+        index_chapters(lecture_id % 50, lecture_id, chapters)
+        db.session.execute(text('INSERT INTO chapter_plain VALUES (:owner, :title, :content)'),
+                           [{'owner': lecture_id % 50, 'title': t, 'content': c} for t, c in chapters])
+    db.session.commit()
+
+    queries = rng.sample(vocabulary, 50)
+    timings = {}
+    for mode in ('fts5', 'like'):
+        latencies = []
+        for word in queries:
+            start = time.perf_counter()
+            if mode == 'fts5':
+                search_chapters(7, word)
+            else:
+                db.session.execute(text(
+                    "SELECT title FROM chapter_plain WHERE owner = 7 AND (title LIKE :p OR content LIKE :p) LIMIT 20"
+                ), {'p': f'%{word}%'}).all()
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        timings[mode] = {'p50 ms': round(latencies[len(latencies) // 2] * 1000, 2),
+                         'p95 ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2)}
+    print('search over 100k chapters:', timings)
+    assert timings['fts5']['p95 ms'] < timings['like']['p95 ms']
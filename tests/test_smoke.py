@@ -0,0 +1,99 @@
+"""
+Calls every API route once against a small `seed-scale` data set, to catch
+routes that no longer match the models or fail outright.
+"""
+
+import io
+
+import pytest
+
+from backend.extensions import db
+
+SEED_ARGS = [
+    'seed-scale', '--users', '2', '--lectures-per-user', '2', '--artifacts-per-lecture', '2',
+    '--exams-per-lecture', '1', '--questions-per-exam', '3', '--attempts-per-exam', '2',
+    '--distinct-artifacts', '3',
+]
+
+class FakeStorage:
+    def put_object(self, file_path, file, content_type='application/pdf', upsert=False):
+        pass
+
+class FakeProcessor:
+    def process_pdf_for_artifacts(self, pdf_path, title, document_hash=None, regenerate=False):
+        return {
+            'success': True,
+            'analysis': {},
+            'chapters': [('Introduction', 'Text')],
+            'artifacts': {'study_guide': '<div>guide</div>', 'quiz': '<div>quiz</div>'},
+        }
+
+@pytest.fixture
+def seeded(app, client, monkeypatch):
+    """Seeds the database and returns the ids of rows owned by the first synthetic user, with its auth headers."""
+    from backend.models import Artifact, Exam, Lecture, ProcessingJob, User
+    from backend.services.search_index import ensure_index
+
+    ensure_index() # As `flask init-db` does
+    result = app.test_cli_runner().invoke(args=SEED_ARGS)
+    assert result.exit_code == 0, result.output
+    monkeypatch.setattr('backend.routes.upload.get_storage', FakeStorage)
+    monkeypatch.setattr('backend.routes.artifacts.get_pdf_processor', FakeProcessor)
+
+    user = User.query.order_by(User.id).first()
+    login = client.post('/api/auth/login', json={'username': user.username, 'password': 'password'})
+    assert login.status_code == 200
+    lecture = Lecture.query.filter_by(user_id=user.id).order_by(Lecture.id).first()
+    artifact = Artifact.query.filter_by(lecture_id=lecture.id).order_by(Artifact.id).first()
+    exam = Exam.query.filter_by(lecture_id=lecture.id).first()
+    job = ProcessingJob(lecture_id=lecture.id, user_id=user.id, job_type='artifact_generation',
+                        status='completed', progress=100)
+    db.session.add(job)
+    db.session.commit()
+
+    ids = {'lecture': lecture.id, 'artifact': artifact.id, 'exam': exam.id, 'job': job.id, 'chapter': lecture.id * 10000}
+    return ids, {'Authorization': f"Bearer {login.get_json()['access_token']}"}
+
+UPLOAD = {'file': (io.BytesIO(b'%PDF-1.4\n' + b'z' * 1024), 'lecture.pdf')}
+
+# (method, path, request kwargs, expected status)
+ROUTES = [
+    ('POST', '/api/auth/register', {'json': {'username': 'new-user', 'password': 'secret'}}, 201),
+    ('POST', '/api/upload', {'data': UPLOAD, 'content_type': 'multipart/form-data'}, 201),
+    ('GET', '/api/lectures', {}, 200),
+    ('GET', '/api/lectures/{lecture}', {}, 200),
+    ('GET', '/api/lectures/{lecture}/chapters', {}, 200),
+    ('GET', '/api/lectures/{lecture}/bundle', {}, 200),
+    ('GET', '/api/lectures/{lecture}/exams', {}, 200),
+    ('POST', '/api/lectures/{lecture}/exams', {'json': {'title': 'Midterm'}}, 201),
+    ('GET', '/api/exams/{exam}', {}, 200),
+    ('GET', '/api/exams/{exam}/questions', {}, 200),
+    ('POST', '/api/exams/{exam}/questions', {'json': {'question_text': 'Q?', 'options': ['a', 'b'], 'correct_answer': 'b'}}, 201),
+    ('POST', '/api/exams/{exam}/attempts', {'json': {'answers': [0, 1, 2]}}, 201),
+    ('POST', '/api/exams/{exam}/grade-all', {}, 200),
+    ('GET', '/api/exams/{exam}/analytics', {}, 200),
+    ('POST', '/api/ai/chapters/{chapter}/generate-questions', {'json': {'exam_id': 1}}, 404), # Seeded lectures have no document
+    ('GET', '/api/search?q=lecture', {}, 200),
+    ('POST', '/api/artifacts/generate/{lecture}', {}, 200),
+    ('GET', '/api/artifacts/pdf/{lecture}', {}, 200),
+    ('GET', '/api/artifacts?ids={artifact}&fields=id,content', {}, 200),
+    ('GET', '/api/artifacts/{artifact}', {}, 200),
+    ('GET', '/api/artifacts/{artifact}/code', {}, 200),
+    ('GET', '/api/artifacts/dictionaries/1', {}, 404),
+    ('DELETE', '/api/artifacts/{artifact}', {}, 200),
+    ('GET', '/api/artifacts/processing-jobs/{job}', {}, 200),
+    ('GET', '/api/artifacts/processing-jobs/{job}/status', {}, 200),
+    ('GET', '/api/artifacts/processing-jobs/{job}/events', {}, 200),
+    ('GET', '/api/admin/profiles', {}, 404), # Only for profiling admins
+    ('GET', '/metrics', {}, 404), # Closed without METRICS_TOKEN
+]
+
+@pytest.mark.parametrize('method,path,kwargs,status', ROUTES, ids=[f'{m} {p}' for m, p, _, _ in ROUTES])
+def test_route(client, seeded, method, path, kwargs, status):
+    ids, headers = seeded
+    if 'data' in kwargs:
+        kwargs = dict(kwargs, data={name: (io.BytesIO(f.getvalue()), filename) for name, (f, filename) in kwargs['data'].items()})
+
+    response = client.open(path.format(**ids), method=method, headers=headers, **kwargs)
+
+    assert response.status_code == status, response.get_data(as_text=True)[:500]
@@ -0,0 +1,54 @@
+"""
+Startup budget: importing the package and building the app must stay cheap,
+and must not pull in the SDKs that are only needed on first use.
+"""
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous enough for a slow CI machine; a regression that imports an SDK at
+# boot costs seconds, not milliseconds.
+IMPORT_BUDGET_US = 1_500_000
+CREATE_APP_BUDGET_S = 3.0
+# Only ever imported inside the functions that use them
+LAZY_MODULES = ('fitz', 'pdfplumber', 'anthropic', 'supabase', 'openai', 'numpy')
+
+def _run(code, *flags, **env):
+    env = dict(os.environ, PYTHONPATH=ROOT, **env)
+    return subprocess.run(
+        [sys.executable, *flags, '-c', textwrap.dedent(code)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+
+def test_import_time_budget():
+    result = _run('import backend', '-X', 'importtime')
+    # Lines look like "import time:   self [us] | cumulative | imported package"
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:'):
+            _, total, name = line.split(':', 1)[1].split('|')
+            if total.strip().isdigit():
+                cumulative[name.strip()] = int(total)
+
+    assert cumulative['backend'] < IMPORT_BUDGET_US, f"import backend took {cumulative['backend'] / 1000:.0f}ms"
+    assert [name for name in LAZY_MODULES if name in cumulative] == []
+
+def test_create_app_budget(tmp_path):
+    result = _run(f'''
+        import json, sys, time
+        started = time.perf_counter()
+        from backend import create_app
+        create_app()
+        print(json.dumps({{
+            'elapsed': time.perf_counter() - started,
+            'loaded': [name for name in {LAZY_MODULES!r} if name in sys.modules]
+        }}))
+    ''', DATABASE_URL=f"sqlite:///{tmp_path / 'startup.db'}", PDF_CACHE_DIR=str(tmp_path / 'pdf-cache'))
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert report['elapsed'] < CREATE_APP_BUDGET_S, f"create_app took {report['elapsed']:.2f}s"
+    assert report['loaded'] == []
@@ -0,0 +1,66 @@
+import io
+import os
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+UPLOADS = 8
+UPLOAD_MB = 8
+
+class FakeStorage:
+    def put_object(self, file_path, file, content_type='application/pdf', upsert=False):
+        pass # Bytes are not kept, so only the request handling itself is measured
+
+@pytest.fixture
+def bodies(tmp_path):
+    """Multipart request bodies on disk, one distinct PDF each, so building them is not measured."""
+    from werkzeug.datastructures import FileStorage
+    from werkzeug.test import encode_multipart
+
+    bodies = []
+    for i in range(UPLOADS):
+        pdf = b'%PDF-1.4\n' + bytes([i]) * (UPLOAD_MB * 1024 * 1024)
+        boundary, body = encode_multipart({'file': FileStorage(io.BytesIO(pdf), f'lecture-{i}.pdf')})
+        path = tmp_path / f'body-{i}'
+        path.write_bytes(body)
+        bodies.append((boundary, path))
+    return bodies
+
+def _peak_memory(client, headers, bodies):
+    def upload(args):
+        boundary, path = args
+        with open(path, 'rb') as body:
+            response = client.post('/api/upload', headers=headers, input_stream=body,
+                                   content_type=f'multipart/form-data; boundary={boundary}',
+                                   content_length=os.path.getsize(path))
+        assert response.status_code == 201, response.get_json()
+
+    tracemalloc.start()
+    try:
+        with ThreadPoolExecutor(UPLOADS) as pool:
+            list(pool.map(upload, bodies))
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+@pytest.mark.benchmark
+def test_peak_memory_under_concurrent_uploads(app, client, make_user, bodies, monkeypatch):
+    """Peak Python heap while UPLOADS uploads of UPLOAD_MB each are parsed at once, spooled vs held in memory."""
+    from backend.extensions import db
+    from backend.models import Document, Lecture
+
+    monkeypatch.setattr('backend.routes.upload.get_storage', FakeStorage)
+    _, headers = make_user()
+    peaks = {}
+    for mode, threshold in (('in memory', 1024 ** 3), ('spooled', None)):
+        if threshold:
+            app.config['UPLOAD_SPOOL_THRESHOLD'] = threshold
+        else:
+            app.config.pop('UPLOAD_SPOOL_THRESHOLD', None) # The 1 MB default
+        peaks[mode] = round(_peak_memory(client, headers, bodies) / 1024 ** 2, 1)
+        Lecture.query.delete()
+        Document.query.delete()
+        db.session.commit()
+    print(f'{UPLOADS} concurrent {UPLOAD_MB} MB uploads, peak MB:', peaks)
+    assert peaks['spooled'] * 2 < peaks['in memory']
@@ -0,0 +1,97 @@
+"""
+Load comparison of the gunicorn worker classes from backend/gunicorn.conf.py on
+LLM-bound requests: generation with the model call replaced by a fixed sleep.
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LLM_LATENCY = 0.25
+CONCURRENT_REQUESTS = 16
+
+class SlowProcessor:
+    def process_pdf_for_artifacts(self, pdf_path, title, document_hash=None, regenerate=False):
+        time.sleep(LLM_LATENCY) # Patched to yield under gevent, like the SDK's socket reads
+        return {'success': True, 'analysis': {}, 'chapters': [], 'artifacts': {'quiz': '<Quiz />'}}
+
+def slow_app():
+    """Gunicorn app factory: the real app with a fixed-latency stand-in for the pipeline."""
+    from backend import create_app
+    from backend.routes import artifacts
+
+    artifacts.get_pdf_processor = SlowProcessor
+    return create_app()
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def _wait_for(port, process, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        assert process.poll() is None, process.stderr.read()
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f'gunicorn did not listen on {port}')
+
+def _load(worker_class, url, headers):
+    port = _free_port()
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.path.join(ROOT, 'tests')]),
+               PORT=str(port), GUNICORN_WORKER_CLASS=worker_class, GUNICORN_WORKERS='1')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'backend/gunicorn.conf.py', 'test_workers:slow_app()'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    try:
+        _wait_for(port, process)
+
+        def call(_):
+            request = urllib.request.Request(f'http://127.0.0.1:{port}{url}', data=b'{}', headers=headers, method='POST')
+            start = time.perf_counter()
+            with urllib.request.urlopen(request, timeout=60) as response:
+                assert response.status == 200, json.load(response)
+            return time.perf_counter() - start
+
+        call(None) # Warm-up: lazy imports and the first connections are not what is measured
+        start = time.perf_counter()
+        with ThreadPoolExecutor(CONCURRENT_REQUESTS) as pool:
+            latencies = sorted(pool.map(call, range(CONCURRENT_REQUESTS)))
+        elapsed = time.perf_counter() - start
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return {
+        'req/s': round(CONCURRENT_REQUESTS / elapsed, 1),
+        'p95 ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000),
+    }
+
+@pytest.mark.benchmark
+def test_gevent_workers_serve_llm_bound_requests_concurrently(app, make_user):
+    pytest.importorskip('gunicorn')
+    pytest.importorskip('gevent')
+    from backend.extensions import db
+    from backend.models import Lecture
+
+    user, headers = make_user()
+    lecture = Lecture(user_id=user.id, title='lecture.pdf', file_path='1/lecture_1700000000.pdf')
+    db.session.add(lecture)
+    db.session.commit()
+    url = f'/api/artifacts/generate/{lecture.id}'
+    headers = dict(headers, **{'Content-Type': 'application/json'})
+
+    results = {worker_class: _load(worker_class, url, headers) for worker_class in ('sync', 'gevent')}
+    print(f'{CONCURRENT_REQUESTS} concurrent generations, one worker process:', results)
+    # A sync worker serves them one after another; gevent overlaps the waits
+    assert results['gevent']['req/s'] > 4 * results['sync']['req/s']